@@ -1,23 +1,67 @@
 # 에이전트 관련 클래스와 함수 정의
 from __future__ import annotations
 
+import asyncio
+import functools
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import TYPE_CHECKING, Annotated, Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar, TypedDict
 
 from langgraph.graph import StateGraph, MessagesState
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
 from langgraph.types import Command
-from langchain_core.messages import HumanMessage, AIMessage
-from langchain_openai import AzureChatOpenAI
+from langchain_core.documents import Document
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk, BaseMessage, RemoveMessage
+from langchain_core.runnables import RunnableLambda
 
 import config
 
 from analysis import analyze_static, detect_anti_patterns
-from vector_store import VectorStore
-#from reportlab.pdfgen import canvas
-#from reportlab.lib.pagesizes import A4
-import io
-import base64
-import streamlit as st
+from analysis_cache import AnalysisCache
+from blob_store import BlobStore
+from clone_detection import CloneIndex, find_clones
+from history import code_ref, compact_history
+from llm_analysis import (
+    INTERNAL_TAG,
+    UnitResultCache,
+    aanalyze_units,
+    analyze_units,
+    build_cot_messages,
+    reduce_report,
+    split_units,
+)
+from metrics_store import MetricsStore, format_summary
+from report import REPORT_KEY, ReportBuilder
+from response_cache import ResponseCache, strip_bypass
+
+if TYPE_CHECKING:
+    # 무거운 클라이언트 모듈은 실제로 필요할 때 접근자 안에서 import 한다
+    from langchain_openai import AzureChatOpenAI
+    from vector_store import VectorStore
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+def _once(factory: Callable[[], T]) -> Callable[[], T]:
+    """처음 호출될 때 한 번만 만들고 이후에는 같은 객체를 돌려주는 접근자로 감쌉니다."""
+    lock = threading.Lock()
+    instance: List[T] = []
+
+    @functools.wraps(factory)
+    def accessor() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return accessor
 
 @dataclass
 class Agent:
@@ -34,10 +78,14 @@ class Agent:
         """에이전트의 메모리를 업데이트합니다."""
         self.memory[key] = value
 
-    def __post_init__(self):
-        # 복잡한 속성 초기화
-        self.state_graph = StateGraph()
-        self.messages_state = MessagesState()
+    @functools.cached_property
+    def state_graph(self) -> StateGraph:
+        # 그래프는 처음 사용할 때 생성
+        return StateGraph(MessagesState)
+
+    @functools.cached_property
+    def messages_state(self) -> MessagesState:
+        return MessagesState()
 
     def process_message(self, message: str):
         """들어온 메시지를 처리하고 상태를 업데이트합니다."""
@@ -45,8 +93,7 @@ class Agent:
 
     def generate_response(self, prompt: str) -> str:
         """프롬프트를 기반으로 언어 모델을 사용해 응답을 생성합니다."""
-        llm = AzureChatOpenAI(deployment_name=config.OPENAI_DEPLOYMENT_NAME)
-        response = llm([HumanMessage(content=prompt), AIMessage(content="")])
+        response = get_llm().invoke([HumanMessage(content=prompt)])
         return response.content
 
     def analyze_code(self, code: str):
@@ -57,8 +104,7 @@ class Agent:
 
     def search_codebase(self, query: str) -> List[str]:
         """벡터스토어를 사용해 코드베이스를 검색합니다."""
-        vector_store = VectorStore()
-        results = vector_store.similarity_search(query)
+        results = get_vector_store().similarity_search(query)
         return results
 
     def run_tool(self, tool_name: str, *args, **kwargs):
@@ -76,15 +122,34 @@ class Agent:
 
 # --- 간단한 그래프 빌더 구현 ---
 
-@dataclass
-class Memory:
-    """분석 결과를 저장하기 위한 메모리"""
+class UploadedFile(TypedDict, total=False):
+    name: str  # 파일명
+    hash: str  # 내용 해시 (blob 저장소 키)
+    analysis: str  # 분석 결과 문자열
+
+
+def merge_uploaded_files(current: List[UploadedFile], updates: List[UploadedFile]) -> List[UploadedFile]:
+    """업로드 파일 목록 리듀서: 같은 이름은 필드를 덮어쓰고 새 이름은 뒤에 붙입니다.
+
+    내용 해시가 바뀐 항목은 이전 분석 결과를 버립니다.
+    """
+    merged = {f["name"]: f for f in current}
+    for f in updates:
+        old = merged.get(f["name"])
+        merged[f["name"]] = dict(f) if old is None or old.get("hash") != f.get("hash") else {**old, **f}
+    return list(merged.values())
 
-    analyses: List[Dict] = field(default_factory=list)
 
+class AnalyzerState(MessagesState):
+    # 노드는 바뀐 항목만 돌려주고 리듀서가 합치므로 체크포인트에도 변경분만 기록된다
+    uploaded_files: Annotated[List[UploadedFile], merge_uploaded_files]
 
+
+@_once
 def get_llm() -> AzureChatOpenAI:
-    """Azure OpenAI LLM 인스턴스를 반환합니다."""
+    """Azure OpenAI LLM 인스턴스를 반환합니다. 첫 호출 때 한 번만 생성됩니다."""
+    from langchain_openai import AzureChatOpenAI  # pylint: disable=import-outside-toplevel
+    from http_pool import get_async_http_client, get_http_client  # pylint: disable=import-outside-toplevel
 
     return AzureChatOpenAI(
         azure_endpoint=config.AOAI_ENDPOINT,
@@ -92,93 +157,437 @@ def get_llm() -> AzureChatOpenAI:
         azure_deployment=config.AOAI_DEPLOY_GPT4O,
         api_version=config.AOAI_API_VERSION,
         temperature=0.0,
+        http_client=get_http_client(),  # 프로세스 공용 연결 풀 (분당 한도, 동일 요청 합치기 포함)
+        http_async_client=get_async_http_client(),
     )
 
 
-vector_store = VectorStore()
-mem = Memory()
-llm = get_llm()
+@_once
+def get_vector_store() -> VectorStore:
+    """영속 벡터스토어를 반환합니다. 첫 호출 때 스냅샷을 열고 임베딩 클라이언트를 만듭니다."""
+    from vector_store import VectorStore  # pylint: disable=import-outside-toplevel
+
+    return VectorStore(path=config.VECTORSTORE_PATH)
+
+
+@_once
+def get_analysis_cache() -> AnalysisCache:
+    """분석 결과 캐시를 반환합니다."""
+    return AnalysisCache()
+
+
+@_once
+def get_blob_store() -> BlobStore:
+    """업로드 소스코드를 내용 해시로 보관하는 프로세스 공용 저장소를 반환합니다."""
+    return BlobStore()
+
+
+@_once
+def get_report_builder() -> ReportBuilder:
+    """파일별 섹션을 캐시하는 리포트 빌더를 반환합니다."""
+    return ReportBuilder()
+
+
+@_once
+def get_unit_cache() -> UnitResultCache:
+    """함수별 LLM 분석 결과 캐시를 반환합니다."""
+    return UnitResultCache()
+
+
+@_once
+def get_clone_index() -> CloneIndex:
+    """파일/함수 단위 근사 중복을 찾는 MinHash/LSH 인덱스를 반환합니다."""
+    return CloneIndex()
+
+
+@_once
+def get_response_cache() -> ResponseCache:
+    """일반 대화 응답을 세션 사이에서 공유하는 캐시를 반환합니다.
+
+    유사도 단계는 처음 쓸 때 벡터스토어와 같은 프로세스 공용 임베딩 캐시 인스턴스로 만들어집니다.
+    """
+    return ResponseCache()
+
+
+@_once
+def get_metrics_store() -> MetricsStore:
+    """파일/함수/안티패턴 지표를 열 단위로 보관하는 프로세스 공용 저장소를 반환합니다."""
+    return MetricsStore()
+
+
+def record_metrics(name: str, digest: str, analysis, anti) -> None:
+    """분석 결과를 지표 저장소에 기록합니다. 실패해도 분석 흐름은 계속합니다."""
+    try:
+        store = get_metrics_store()
+        if store.record(name, digest, analysis, anti):
+            store.save()
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("지표 저장 실패", exc_info=True)
+
+
+def format_analysis(analysis, anti) -> str:
+    """정적 분석/안티패턴 결과를 사용자에게 보여줄 한국어 문자열로 만듭니다."""
+    text = f"총 라인 수: {analysis.total_lines}\n함수 개수: {analysis.function_count}\n변수 개수: {analysis.variable_count}\n순환 복잡도: {analysis.cyclomatic_complexity}\n사유: {analysis.complexity_reasoning}"
+    if anti:
+        text += "\n안티패턴:\n" + "\n".join(f"- {a.type}: {a.details}" for a in anti)
+    return text
+
+
+def static_analysis(code: str, name: str):
+    """정적 분석과 안티패턴 검출을 수행합니다 (같은 내용은 캐시에서 조회). 다른 파일과의 클론도 덧붙입니다."""
+    digest, analysis, anti = get_analysis_cache().analyze(code)
+    return digest, analysis, anti + find_clones(get_clone_index(), name, code, analysis)
+
+
+def _use_map_reduce(code: str, analysis) -> bool:
+    """함수별 map-reduce 분석을 쓸지 정합니다 (auto: 한 프롬프트에 다 들어가지 않는 파일만)."""
+    if not analysis.functions or config.ANALYZER_MODE == "single":
+        return False
+    return config.ANALYZER_MODE == "map_reduce" or len(code) > config.CHUNK_MAX_CHARS
 
 
-def analyzer_node(state: MessagesState) -> Command[str]:
+def _report_message(report: dict) -> AIMessage:
+    return AIMessage(content="```json\n" + json.dumps(report, ensure_ascii=False, indent=2) + "\n```")
+
+
+def _similar_cases(code: str) -> List[Tuple[Document, float]]:
+    """벡터스토어에서 분석 대상과 유사한 다른 코드 청크를 (문서, 코사인 유사도)로 찾습니다. 실패해도 분석은 계속합니다.
+
+    리포트의 ``similarity_score``로 쓰이므로 순위 융합(RRF) 점수가 아닌 벡터 거리에서 구한 유사도를 돌려줍니다.
+    """
+    k = config.ANALYZER_RAG_K
+    if k <= 0:
+        return []
+    from vector_store import cosine_similarity  # pylint: disable=import-outside-toplevel
+
+    try:
+        found = get_vector_store().vector_search_with_distance(code[:config.CHUNK_MAX_CHARS], k=2 * k)
+    except Exception:  # pylint: disable=broad-except
+        logger.warning("유사 사례 검색 실패", exc_info=True)
+        return []
+    # 업로드 시 색인된 분석 대상 자신의 청크는 제외
+    return [(doc, cosine_similarity(distance)) for doc, distance in found if doc.page_content not in code][:k]
+
+
+def _analysis_target(message: BaseMessage) -> Tuple[Optional[str], str]:
+    """분석할 (코드, 파일명)을 구합니다. 코드 참조 메시지면 blob 저장소에서 원문을 읽습니다."""
+    ref = code_ref(message)
+    if ref is None:
+        return message.content, "업로드파일"
+    return get_blob_store().get(ref["hash"]), ref["name"]
+
+
+def _missing_code() -> Command[str]:
+    ai_msg = AIMessage(content="분석할 업로드 파일을 찾을 수 없습니다. 파일을 다시 업로드해 주세요.")
+    return Command(update={"messages": [ai_msg]}, goto="supervisor")
+
+
+def _record_analysis(state: AnalyzerState, name: str, digest: str, analysis_str: str, reasoning: Optional[AIMessage]) -> Command[str]:
+    """분석 결과를 업로드 파일 목록에 저장하고 안내 메시지로 supervisor에 돌아갑니다."""
+    if reasoning is not None:
+        analysis_str += f"\n\n추론 및 의사코드:\n{reasoning.content}"
+    # 업로드 파일 목록에서 해시가 같은 파일(이름이 다르게 올라온 같은 내용 포함)에 분석 결과 저장
+    files = [f for f in state.get("uploaded_files", []) if f.get("hash") == digest] or [{"name": name, "hash": digest}]
+    updated = [{**f, "analysis": analysis_str} for f in files]
+    # 안내 메시지 (LLM 추론은 스트리밍된 메시지 그대로 대화에 남긴다)
+    ai_msg = AIMessage(content=f"분석이 완료되었습니다. '{REPORT_COMMAND}' 명령을 입력하면 PDF 리포트를 다운로드할 수 있습니다.")
+    messages = [ai_msg] if reasoning is None else [reasoning, ai_msg]
+    return Command(update={"messages": messages, "uploaded_files": updated}, goto="supervisor")
+
+
+def analyzer_node(state: AnalyzerState) -> Command[str]:
     """
-    업로드된 코드를 분석하고, 분석 결과를 st.session_state.uploaded_files에 저장합니다.
+    업로드된 코드를 분석하고, 분석 결과를 그래프 상태의 업로드 파일 목록에 저장합니다.
+
+    정적 분석과 유사 사례 검색은 서로 독립적이므로 동시에 수행한 뒤 두 결과를 LLM 추론 단계에 넘깁니다.
     """
     last = state["messages"][-1]
-    if isinstance(last, HumanMessage):
-        code = last.content
-        # 분석 수행
-        analysis = analyze_static(code)
-        anti = detect_anti_patterns(code)
-        # 분석 결과 문자열 생성 (한국어)
-        analysis_str = f"총 라인 수: {analysis.total_lines}\n함수 개수: {analysis.function_count}\n변수 개수: {analysis.variable_count}\n순환 복잡도: {analysis.cyclomatic_complexity}\n사유: {analysis.complexity_reasoning}"
-        if anti:
-            analysis_str += "\n안티패턴:\n" + "\n".join(f"- {a.type}: {a.details}" for a in anti)
-        # 업로드 파일 목록(state["uploaded_files"])에 분석 결과 저장
-        found = False
-        for f in state["uploaded_files"]:
-            if f["code"] == code:
-                f["analysis"] = analysis_str
-                found = True
-        if not found:
-            state["uploaded_files"].append({"name": "업로드파일", "code": code, "analysis": analysis_str})
-        # 안내 메시지
-        ai_msg = AIMessage(content="분석이 완료되었습니다. '분석 결과 추출' 명령을 입력하면 PDF 리포트를 다운로드할 수 있습니다.")
-        return Command(update={"messages": [ai_msg]}, goto="supervisor")
-    return Command(goto="supervisor")
-
-
-def report_node(state: MessagesState) -> Command[str]:
-    # 마크다운 리포트 생성 및 다운로드 링크 제공 (외부 패키지 없이)
+    if not isinstance(last, HumanMessage):
+        return Command(goto="supervisor")
+    code, name = _analysis_target(last)
+    if code is None:
+        return _missing_code()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        static = pool.submit(static_analysis, code, name)
+        similar = pool.submit(_similar_cases, code)
+        digest, analysis, anti = static.result()
+        cases = similar.result()
+    fanout_ms = (time.perf_counter() - start) * 1000
+    record_metrics(name, digest, analysis, anti)
+    analysis_str = format_analysis(analysis, anti)
+    reasoning = None
+    if config.ANALYZER_USE_LLM and _use_map_reduce(code, analysis):
+        # 함수별로 나누어 동시에 분석한 뒤 리포트 JSON으로 합친다 (바뀐 함수만 LLM 호출)
+        results = analyze_units(get_llm(), split_units(code, analysis), get_unit_cache())
+        reasoning = _report_message(reduce_report(analysis, anti, results, cases))
+    elif config.ANALYZER_USE_LLM:
+        reasoning = get_llm().invoke(build_cot_messages(code, analysis_str, cases))
+    logger.debug("analyzer: 정적 분석+검색 %.1fms, 전체 %.1fms", fanout_ms, (time.perf_counter() - start) * 1000)
+    return _record_analysis(state, name, digest, analysis_str, reasoning)
+
+
+async def analyzer_node_async(state: AnalyzerState) -> Command[str]:
+    """``analyzer_node``의 비동기 버전입니다. 두 갈래를 이벤트 루프에서 함께 기다립니다."""
+    last = state["messages"][-1]
+    if not isinstance(last, HumanMessage):
+        return Command(goto="supervisor")
+    code, name = _analysis_target(last)
+    if code is None:
+        return _missing_code()
+    start = time.perf_counter()
+    # asyncio.to_thread는 3.9부터라 (CI는 3.8 포함) 기본 executor를 직접 쓴다
+    loop = asyncio.get_running_loop()
+    (digest, analysis, anti), cases = await asyncio.gather(
+        loop.run_in_executor(None, functools.partial(static_analysis, code, name)),
+        loop.run_in_executor(None, functools.partial(_similar_cases, code)),
+    )
+    fanout_ms = (time.perf_counter() - start) * 1000
+    record_metrics(name, digest, analysis, anti)
+    analysis_str = format_analysis(analysis, anti)
+    reasoning = None
+    if config.ANALYZER_USE_LLM and _use_map_reduce(code, analysis):
+        results = await aanalyze_units(get_llm(), split_units(code, analysis), get_unit_cache())
+        reasoning = _report_message(reduce_report(analysis, anti, results, cases))
+    elif config.ANALYZER_USE_LLM:
+        reasoning = await get_llm().ainvoke(build_cot_messages(code, analysis_str, cases))
+    logger.debug("analyzer: 정적 분석+검색 %.1fms, 전체 %.1fms", fanout_ms, (time.perf_counter() - start) * 1000)
+    return _record_analysis(state, name, digest, analysis_str, reasoning)
+
+
+def report_node(state: AnalyzerState) -> Command[str]:
+    """분석 결과를 마크다운/PDF 리포트 파일로 만들고 다운로드 안내 메시지를 남깁니다.
+
+    리포트 본문은 메시지에 넣지 않고 파일 경로만 참조하므로 대화 기록이 커지지 않습니다.
+    """
     files = state.get("uploaded_files", [])
     if not files:
         return Command(update={"messages": [AIMessage(content="분석된 파일이 없습니다.")]}, goto="supervisor")
-    buffer = io.StringIO()
-    buffer.write("# C 코드 분석 리포트\n\n")
-    for f in files:
-        buffer.write(f"## 파일명: {f['name']}\n")
-        buffer.write(f"### 분석 결과\n")
-        buffer.write(f"{f.get('analysis', '분석 결과 없음')}\n\n")
-    md_bytes = buffer.getvalue().encode("utf-8")
-    b64 = base64.b64encode(md_bytes).decode()
-    href = f'<a href="data:text/markdown;base64,{b64}" download="report.md">마크다운 리포트 다운로드</a>'
-    ai_msg = AIMessage(content=f"분석 리포트가 생성되었습니다. 아래 링크를 클릭해 마크다운(.md) 파일로 다운로드하세요.\n{href}")
+    summary = format_summary(get_metrics_store(), files=[f["name"] for f in files])
+    artifact = get_report_builder().build(files, summary=summary)
+    ai_msg = AIMessage(
+        content=f"분석 리포트가 생성되었습니다 (파일 {artifact.sections}개, 새로 작성한 섹션 {artifact.rendered}개). 아래 버튼으로 다운로드하세요.",
+        additional_kwargs={REPORT_KEY: artifact.as_dict()},
+    )
     return Command(update={"messages": [ai_msg]}, goto="supervisor")
 
 
-def supervisor_node(state: MessagesState) -> Command[str]:
-    """사용자 명령을 해석하여 다음 노드를 결정합니다."""
+def metrics_node(state: AnalyzerState) -> Command[str]:
+    """'통계 [N]' 명령에 지표 저장소의 집계와 복잡도 상위 N개 함수로 LLM 없이 답합니다."""
+    words = state["messages"][-1].content.split()
+    n = int(words[1]) if len(words) > 1 and words[1].isdigit() else 10
+    store = get_metrics_store()
+    if not store.aggregate()["files"]:
+        content = "아직 분석된 파일이 없습니다."
+    else:
+        content = format_summary(store, n)
+    return Command(update={"messages": [AIMessage(content=content)]}, goto="supervisor")
+
 
-    # 업로드 파일 목록을 state에 저장/기억
-    if "uploaded_files" not in state:
-        state["uploaded_files"] = []
+# 일반 대화 시스템 프롬프트
+CHAT_SYSTEM_PROMPT = "모든 답변은 한국어로 해주세요. 다만 코드 관련 질문은 영어로 답변할 수 있습니다."
+# 리포트 다운로드 명령 ('분석'으로 시작하지만 분석 명령이 아님)
+REPORT_COMMAND = "분석 결과 추출"
+
+
+def _route(state: AnalyzerState) -> Optional[str]:
+    """사용자 명령으로 다음 노드를 정합니다. 일반 대화면 None을 반환합니다."""
     last = state["messages"][-1]
-    if isinstance(last, HumanMessage):
-        text = last.content.strip()
-        if text.lower().startswith("업로드") or text.lower().startswith("분석"):
-            return Command(goto="analyzer")
-        if text.lower().startswith("분석 결과 추출"):
-            return Command(goto="report")
-        if text.lower().startswith("종료"):
-            return Command(goto="__end__")
-        if text.lower().startswith("질문"):
-            return Command(goto="supervisor")
-        # 일반 대화 처리: LLM 답변 생성
-        system_prompt = AIMessage(content="모든 답변은 한국어로 해주세요. 다만 코드 관련 질문은 영어로 답변할 수 있습니다.")
-        response = llm([system_prompt, last])
-        ai_msg = AIMessage(content=response.content)
-        return Command(update={"messages": [ai_msg]}, goto="supervisor")
-    return Command(goto="__end__")
-
-
-def build_graph() -> StateGraph:
-    """에이전트 노드를 연결한 그래프를 생성합니다."""
-
-    builder = StateGraph(MessagesState)
-    builder.add_node("supervisor", supervisor_node)
-    builder.add_node("analyzer", analyzer_node)
+    if not isinstance(last, HumanMessage):
+        return "__end__"
+    text = last.content.strip().lower()
+    # '분석 결과 추출'이 '분석'에 먼저 걸리지 않도록 긴 명령부터 확인
+    if text.startswith(REPORT_COMMAND):
+        return "report"
+    if text.startswith("업로드") or text.startswith("분석"):
+        return "analyzer"
+    if text.startswith("통계"):
+        return "metrics"
+    if text.startswith("종료"):
+        return "__end__"
+    # '질문'을 포함한 나머지는 일반 대화 (supervisor로 되돌리면 같은 메시지로 무한 반복된다)
+    return None
+
+
+def _chat_context(state: AnalyzerState) -> str:
+    """일반 대화 응답이 기대는 코드 문맥으로, 대화에서 마지막으로 참조한 코드의 해시를 반환합니다."""
+    for message in reversed(state["messages"]):
+        ref = code_ref(message)
+        if ref is not None:
+            return ref["hash"]
+    return ""
+
+
+def _chat_messages(prompt: str) -> List[BaseMessage]:
+    return [AIMessage(content=CHAT_SYSTEM_PROMPT), HumanMessage(content=prompt)]
+
+
+def _cached_reply(content: str) -> Command[str]:
+    return Command(update={"messages": [AIMessage(content=content)]}, goto="supervisor")
+
+
+def supervisor_node(state: AnalyzerState) -> Command[str]:
+    """사용자 명령을 해석하여 다음 노드를 결정합니다."""
+    goto = _route(state)
+    if goto is not None:
+        return Command(goto=goto)
+    # 일반 대화 처리: 같은 코드 문맥의 같은(비슷한) 질문이면 캐시된 답변, 아니면 LLM 답변 생성
+    prompt, bypass = strip_bypass(str(state["messages"][-1].content))
+    context = _chat_context(state)
+    cache = get_response_cache()
+    if not bypass:
+        cached = cache.get(prompt, context)
+        if cached is not None:
+            return _cached_reply(cached)
+    # 스트리밍된 토큰과 같은 메시지 ID를 유지하도록 응답 메시지를 그대로 기록
+    response = get_llm().invoke(_chat_messages(prompt))
+    cache.put(prompt, context, str(response.content))
+    return Command(update={"messages": [response]}, goto="supervisor")
+
+
+async def supervisor_node_async(state: AnalyzerState) -> Command[str]:
+    """``supervisor_node``의 비동기 버전입니다."""
+    goto = _route(state)
+    if goto is not None:
+        return Command(goto=goto)
+    prompt, bypass = strip_bypass(str(state["messages"][-1].content))
+    context = _chat_context(state)
+    cache = get_response_cache()
+    if not bypass:
+        # 유사도 단계는 임베딩을 호출하므로 이벤트 루프를 막지 않게 스레드에서 조회
+        cached = await asyncio.get_running_loop().run_in_executor(None, functools.partial(cache.get, prompt, context))
+        if cached is not None:
+            return _cached_reply(cached)
+    response = await get_llm().ainvoke(_chat_messages(prompt))
+    cache.put(prompt, context, str(response.content))
+    return Command(update={"messages": [response]}, goto="supervisor")
+
+
+def build_graph(checkpointer=None) -> StateGraph:
+    """에이전트 노드를 연결한 그래프를 생성합니다. ``checkpointer``를 주면 thread_id별로 상태가 저장됩니다."""
+
+    builder = StateGraph(AnalyzerState)
+    # 동기(invoke/stream)와 비동기(ainvoke/astream) 실행 모두 지원하도록 두 구현을 함께 등록
+    builder.add_node("supervisor", RunnableLambda(supervisor_node, afunc=supervisor_node_async, name="supervisor"))
+    builder.add_node("analyzer", RunnableLambda(analyzer_node, afunc=analyzer_node_async, name="analyzer"))
     builder.add_node("report", report_node)
+    builder.add_node("metrics", metrics_node)
     builder.set_entry_point("supervisor")
-    return builder.compile()
+    return builder.compile(checkpointer=checkpointer)
+
+
+@_once
+def get_graph():
+    """프로세스에서 공유하는 컴파일된 그래프를 반환합니다.
+
+    그래프 자체는 상태를 갖지 않으므로 모든 세션이 공유하고, 대화 상태는 세션마다 따로 넘깁니다.
+    """
+    return build_graph()
 
 
+@_once
+def get_checkpointer():
+    """대화 상태를 저장하는 프로세스 공용 체크포인터를 반환합니다.
+
+    ``CHECKPOINT_PATH``가 비었거나 SQLite 체크포인터 패키지가 없으면 메모리에만 둡니다.
+    """
+    from langgraph.checkpoint.memory import InMemorySaver  # pylint: disable=import-outside-toplevel
+
+    if not config.CHECKPOINT_PATH:
+        return InMemorySaver()
+    try:
+        from checkpoint_store import open_checkpointer  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        logger.warning("langgraph-checkpoint-sqlite가 없어 대화 상태를 메모리에만 저장합니다.")
+        return InMemorySaver()
+    return open_checkpointer(config.CHECKPOINT_PATH)
+
+
+@_once
+def get_session_graph():
+    """대화 상태를 thread_id별로 체크포인터에 저장하는 공유 그래프를 반환합니다.
+
+    세션은 새 메시지만 넘기고, 이전 대화와 업로드 파일 목록은 체크포인터에서 이어 읽습니다.
+    """
+    return build_graph(get_checkpointer())
+
+
+def _thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def load_thread(thread_id: str) -> Dict[str, Any]:
+    """저장된 대화 상태(messages, uploaded_files)를 반환합니다. 처음 보는 thread_id면 빈 dict."""
+    return get_session_graph().get_state(_thread_config(thread_id)).values
+
+
+def save_uploaded_files(thread_id: str, files: List[UploadedFile]) -> None:
+    """그래프 실행 없이 업로드 파일 목록의 바뀐 항목을 대화 상태에 반영합니다."""
+    if files:
+        get_session_graph().update_state(_thread_config(thread_id), {"uploaded_files": files}, as_node="supervisor")
+
+
+def _compact_thread(thread_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    """저장된 대화가 토큰 예산을 넘으면 오래된 턴을 요약으로 바꿔 다시 저장하고 새 상태를 반환합니다."""
+    messages = state.get("messages", [])
+    compacted = compact_history(messages)
+    # 요약할 턴이 없으면 메시지 수가 그대로이므로 체크포인트를 새로 쓰지 않는다
+    if len(compacted) >= len(messages):
+        return state
+    graph = get_session_graph()
+    graph.update_state(
+        _thread_config(thread_id),
+        {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *compacted]},
+        as_node="supervisor",
+    )
+    return graph.get_state(_thread_config(thread_id)).values
+
+
+def stream_reply(
+    messages: List[BaseMessage],
+    stats: Optional[Dict[str, Any]] = None,
+    thread_id: Optional[str] = None,
+) -> Iterator[str]:
+    """공유 그래프를 실행하며 사용자에게 보일 응답 텍스트를 도착하는 대로 내보냅니다.
+
+    LLM 응답은 토큰 조각 단위로, LLM을 거치지 않는 노드(분석, 리포트)의 메시지는 통째로 나옵니다.
+    ``thread_id``를 주면 ``messages``는 이번에 보낼 새 메시지만 담고, 이전 대화는 체크포인터에서 이어지며
+    실행 뒤 오래된 턴은 요약해 저장합니다.
+    ``stats``에는 첫 토큰까지의 시간(ttft_ms), 전체 시간(total_ms), 최종 그래프 상태(state)가 채워집니다.
+    """
+    stats = {} if stats is None else stats
+    start = time.perf_counter()
+    streamed = set()  # 토큰 조각으로 이미 내보낸 메시지 ID
+    last_id = None
+    if thread_id is None:
+        graph, run_config = get_graph(), None
+    else:
+        graph, run_config = get_session_graph(), _thread_config(thread_id)
+    for mode, payload in graph.stream({"messages": messages}, run_config, stream_mode=["messages", "values"]):
+        if mode == "values":
+            stats["state"] = payload
+            continue
+        message, metadata = payload
+        if INTERNAL_TAG in (metadata.get("tags") or []):
+            # 함수별 분석 같은 내부 LLM 호출은 채팅에 흘리지 않는다
+            continue
+        if not isinstance(message, AIMessage) or not isinstance(message.content, str) or not message.content:
+            continue
+        if isinstance(message, AIMessageChunk):
+            streamed.add(message.id)
+        elif message.id in streamed:
+            continue
+        if "ttft_ms" not in stats:
+            stats["ttft_ms"] = (time.perf_counter() - start) * 1000
+        elif message.id != last_id:
+            yield "\n\n"
+        last_id = message.id
+        yield message.content
+    if thread_id is not None:
+        stats["state"] = _compact_thread(thread_id, stats["state"])
+    stats["total_ms"] = (time.perf_counter() - start) * 1000
+
+
+async def arun(messages: List[BaseMessage]) -> Dict[str, Any]:
+    """공유 그래프를 비동기로 실행하고 최종 상태를 반환합니다 (``ainvoke`` 경로)."""
+    return await get_graph().ainvoke({"messages": messages})
@@ -1,7 +1,36 @@
 # 코드 정적 분석 및 안티패턴 탐지 함수 정의
-import re
-from dataclasses import dataclass
-from typing import List, Dict
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from c_lexer import (
+    DECISION_TOKENS,
+    FUNCTION_END,
+    FUNCTION_START,
+    IDENT,
+    NUMBER,
+    PUNCT,
+    DeclarationTracker,
+    ScopeTracker,
+    Token,
+    tokenize,
+)
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class FunctionMetrics:
+    name: str  # 함수 이름
+    start_line: int  # 시작 라인
+    end_line: int  # 끝 라인 (닫는 중괄호)
+    cyclomatic_complexity: int  # 함수 본문 기준 순환 복잡도
+
+    @property
+    def line_count(self) -> int:
+        """함수가 차지하는 라인 수입니다."""
+        return self.end_line - self.start_line + 1
 
 @dataclass
 class StaticAnalysisResult:
@@ -10,39 +39,326 @@ class StaticAnalysisResult:
     variable_count: int  # 변수 개수
     cyclomatic_complexity: int  # 순환 복잡도
     complexity_reasoning: str  # 복잡도 산출 근거
+    functions: List[FunctionMetrics] = field(default_factory=list)  # 함수별 지표
 
 def analyze_static(code: str) -> StaticAnalysisResult:
-    """코드의 기본 통계와 복잡도를 분석합니다."""
-    lines = code.splitlines()
-    total_lines = len(lines)
+    """코드의 기본 통계와 복잡도를 분석합니다.
 
-    func_pattern = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]*\s*\([^;]*?\)\s*{")
-    function_count = len(func_pattern.findall(code))
+    토크나이저로 소스를 한 번만 훑으며 주석, 문자열, 전처리기 라인은 제외합니다.
+    함수별 복잡도는 중괄호 짝으로 찾은 함수 본문 안의 분기만 셉니다.
+    """
+    total_lines = len(code.splitlines())
 
-    var_pattern = re.compile(r"\b(?:int|float|double|char|long|short|unsigned|signed)\s+[A-Za-z_][A-Za-z0-9_]*\s*(?:=|;)")
-    variable_count = len(var_pattern.findall(code))
+    scope = ScopeTracker()
+    decls = DeclarationTracker()
+    functions: List[FunctionMetrics] = []
+    variable_count = 0
+    decisions = 0
+    function_decisions = 0
+    for tok in tokenize(code):
+        event = scope.feed(tok)
+        if event == FUNCTION_START:
+            function_decisions = 0
+        elif event == FUNCTION_END:
+            functions.append(
+                FunctionMetrics(scope.function, scope.function_line, tok.line, function_decisions + 1)
+            )
+        elif tok.value in DECISION_TOKENS and tok.kind in (IDENT, PUNCT):
+            decisions += 1
+            function_decisions += 1
+        if decls.feed(tok, scope) is not None:
+            variable_count += 1
 
-    cyclomatic_complexity = len(re.findall(r"\b(if|for|while|case|&&|\|\|)\b", code)) + 1
+    cyclomatic_complexity = decisions + 1
     reasoning = "Cyclomatic complexity estimated from control flow statements."
+    if functions:
+        worst = max(functions, key=lambda f: f.cyclomatic_complexity)
+        reasoning += f" Most complex function: {worst.name} ({worst.cyclomatic_complexity})."
 
     return StaticAnalysisResult(
         total_lines=total_lines,
-        function_count=function_count,
+        function_count=len(functions),
         variable_count=variable_count,
         cyclomatic_complexity=cyclomatic_complexity,
         complexity_reasoning=reasoning,
+        functions=functions,
     )
 
 @dataclass
 class AntiPattern:
     type: str  # 안티패턴 종류
     details: str  # 상세 설명
+    line: int = 0  # 발견 위치 (라인, 0이면 파일 전체)
+    function: str = ""  # 발견된 함수 이름 (전역이면 빈 문자열)
+
+# --- 안티패턴 규칙 엔진 ---
+# 모든 규칙은 하나의 토큰/스코프 스트림에 콜백을 등록하므로
+# 규칙을 추가해도 소스를 다시 훑지 않는다.
+
+DECLARATION = "declaration"  # 변수 선언자 완성 이벤트
+END = "end"  # 스캔 종료 이벤트
+
+Callback = Callable[[Token, "RuleEngine"], None]
+
+class Rule(ABC):
+    """안티패턴 규칙의 기본 클래스입니다.
+
+    ``register``에서 엔진에 콜백을 등록하고, 스캔이 끝나면 ``findings``를 반환합니다.
+    콜백은 ``(토큰, 엔진)``을 받아 ``engine.scope``로 현재 스코프를 조회합니다.
+    """
+
+    name = "rule"
+
+    @abstractmethod
+    def register(self, engine: "RuleEngine") -> None:
+        """엔진에 이벤트 콜백을 등록합니다."""
+
+    def reset(self) -> None:
+        """새 스캔 전에 내부 상태를 초기화합니다."""
+
+    def findings(self) -> List[AntiPattern]:
+        """스캔 결과로 검출된 안티패턴을 반환합니다."""
+        return []
+
+class GlobalVariableRule(Rule):
+    """여러 함수에서 공유되는 (const가 아닌) 전역변수를 찾습니다."""
+
+    name = "Global Variable Misuse"
+
+    def __init__(self, min_functions: int = 2):
+        self.min_functions = min_functions
+        self.reset()
+
+    def register(self, engine):
+        engine.on_event(DECLARATION, self._on_declaration)
+        engine.on_kind(IDENT, self._on_ident)
+
+    def reset(self):
+        self._globals: Dict[str, int] = {}  # 이름 -> 선언 라인
+        self._users: Dict[str, set] = {}  # 이름 -> 사용 함수 집합
+        self._shadowed: set = set()  # (함수, 이름)
+
+    def _on_declaration(self, tok, engine):
+        scope = engine.scope
+        if scope.function is None:
+            if scope.brace_depth == 0 and not engine.declarations.const:
+                self._globals.setdefault(tok.value, tok.line)
+        elif tok.value in self._globals:
+            # 지역변수가 전역변수를 가리는 경우 해당 함수의 사용은 제외
+            self._shadowed.add((scope.function, tok.value))
+            self._users.get(tok.value, set()).discard(scope.function)
+
+    def _on_ident(self, tok, engine):
+        function = engine.scope.function
+        if function is not None and tok.value in self._globals:
+            if (function, tok.value) not in self._shadowed:
+                self._users.setdefault(tok.value, set()).add(function)
+
+    def findings(self):
+        result = []
+        for name, users in self._users.items():
+            if len(users) >= self.min_functions:
+                shown = ", ".join(sorted(users)[:5])
+                result.append(AntiPattern(
+                    self.name,
+                    f"Global variable `{name}` is used in {len(users)} functions ({shown}).",
+                    line=self._globals[name],
+                ))
+        return result
+
+class DeepNestingRule(Rule):
+    """함수 안에서 제어문 블록이 ``max_depth``보다 깊게 중첩된 곳을 찾습니다."""
+
+    name = "Deeply Nested Conditionals"
+
+    def __init__(self, max_depth: int = 3):
+        self.max_depth = max_depth
+        self.reset()
+
+    def register(self, engine):
+        engine.on_value("{", self._on_open)
+        engine.on_event(FUNCTION_END, self._on_function_end)
+
+    def reset(self):
+        self._deepest = 0
+        self._line = 0
+        self._found: List[AntiPattern] = []
+
+    def _on_open(self, tok, engine):
+        nesting = engine.scope.nesting
+        if nesting > self._deepest:
+            self._deepest = nesting
+            self._line = tok.line
+
+    def _on_function_end(self, tok, engine):
+        if self._deepest > self.max_depth:
+            function = engine.scope.function
+            self._found.append(AntiPattern(
+                self.name,
+                f"Conditionals nested {self._deepest} levels deep in `{function}`.",
+                line=self._line,
+                function=function,
+            ))
+        self._deepest = 0
+
+    def findings(self):
+        return list(self._found)
+
+class MagicNumberRule(Rule):
+    """함수 본문에 직접 쓰인 숫자 리터럴을 값별로 모아 보고합니다."""
+
+    name = "Magic Numbers"
+
+    def __init__(self, allowed=("0", "1", "2")):
+        self.allowed = frozenset(allowed)
+        self.reset()
+
+    def register(self, engine):
+        engine.on_kind(NUMBER, self._on_number)
+
+    def reset(self):
+        self._numbers: Dict[str, List] = {}  # 값 -> [횟수, 첫 라인, 첫 함수]
+
+    def _on_number(self, tok, engine):
+        function = engine.scope.function
+        if function is None or tok.value in self.allowed or engine.declarations.const:
+            return
+        entry = self._numbers.get(tok.value)
+        if entry is None:
+            self._numbers[tok.value] = [1, tok.line, function]
+        else:
+            entry[0] += 1
+
+    def findings(self):
+        return [
+            AntiPattern(self.name, f"Magic number `{value}` used {count} time(s).", line=line, function=function)
+            for value, (count, line, function) in self._numbers.items()
+        ]
+
+class LongFunctionRule(Rule):
+    """``max_lines``를 넘는 함수를 찾습니다."""
+
+    name = "Long Function"
+
+    def __init__(self, max_lines: int = 200):
+        self.max_lines = max_lines
+        self.reset()
+
+    def register(self, engine):
+        engine.on_event(FUNCTION_END, self._on_function_end)
+
+    def reset(self):
+        self._found: List[AntiPattern] = []
+
+    def _on_function_end(self, tok, engine):
+        scope = engine.scope
+        lines = tok.line - scope.function_line + 1
+        if lines > self.max_lines:
+            self._found.append(AntiPattern(
+                self.name,
+                f"Function `{scope.function}` spans {lines} lines (limit {self.max_lines}).",
+                line=scope.function_line,
+                function=scope.function,
+            ))
+
+    def findings(self):
+        return list(self._found)
+
+def default_rules() -> List[Rule]:
+    """README에 정의된 기본 안티패턴 규칙 목록을 반환합니다."""
+    return [GlobalVariableRule(), DeepNestingRule(), MagicNumberRule(), LongFunctionRule()]
+
+class RuleEngine:
+    """규칙 콜백을 하나의 토큰/스코프 스트림에 연결해 단일 패스로 실행합니다.
+
+    콜백은 토큰 종류(IDENT, NUMBER, ...), 토큰 값(``"{"`` 등) 또는
+    이벤트(FUNCTION_START, FUNCTION_END, DECLARATION, END)에 등록할 수 있습니다.
+    세 가지는 따로 보관하므로 식별자 ``number``가 NUMBER 종류 콜백을 부르는 일은 없습니다.
+    ``timings``에는 마지막 실행의 규칙별 소요 시간(초)이 기록됩니다.
+    """
+
+    def __init__(self, rules: Optional[List[Rule]] = None):
+        self.rules = default_rules() if rules is None else list(rules)
+        self.timings: Dict[str, float] = {}
+        self.scope = ScopeTracker()
+        self.declarations = DeclarationTracker()
+        self._by_kind: Dict[str, List[Tuple[str, Callback]]] = {}  # 토큰 종류 -> 콜백
+        self._by_value: Dict[str, List[Tuple[str, Callback]]] = {}  # 토큰 값 -> 콜백
+        self._by_event: Dict[str, List[Tuple[str, Callback]]] = {}  # 이벤트 -> 콜백
+        self._registering: Optional[Rule] = None
+        for rule in self.rules:
+            self._registering = rule
+            rule.register(self)
+        self._registering = None
+
+    def _add(self, table, key: str, callback: Callback) -> None:
+        owner = self._registering.name if self._registering is not None else "custom"
+        table.setdefault(key, []).append((owner, callback))
+
+    def on_kind(self, kind: str, callback: Callback) -> None:
+        """토큰 종류(IDENT, NUMBER, ...)에 콜백을 등록합니다."""
+        self._add(self._by_kind, kind, callback)
+
+    def on_value(self, value: str, callback: Callback) -> None:
+        """토큰 값(``"{"`` 등)에 콜백을 등록합니다."""
+        self._add(self._by_value, value, callback)
+
+    def on_event(self, event: str, callback: Callback) -> None:
+        """스코프/선언 이벤트(FUNCTION_START, FUNCTION_END, DECLARATION, END)에 콜백을 등록합니다."""
+        self._add(self._by_event, event, callback)
+
+    def _emit(self, handlers, tok, timings):
+        clock = time.perf_counter
+        for owner, callback in handlers:
+            start = clock()
+            callback(tok, self)
+            timings[owner] += clock() - start
+
+    def run(self, code: str) -> List[AntiPattern]:
+        """소스를 한 번 훑어 모든 규칙을 적용하고 검출 결과를 라인 순으로 반환합니다."""
+        for rule in self.rules:
+            rule.reset()
+        timings = {
+            owner: 0.0
+            for table in (self._by_kind, self._by_value, self._by_event)
+            for handlers in table.values()
+            for owner, _ in handlers
+        }
+        scope = self.scope = ScopeTracker()
+        declarations = self.declarations = DeclarationTracker()
+        by_kind, by_value, by_event = self._by_kind.get, self._by_value.get, self._by_event
+        emit = self._emit
+        last = None
+        for tok in tokenize(code):
+            last = tok
+            event = scope.feed(tok)
+            declared = declarations.feed(tok, scope)
+            handlers = by_kind(tok.kind)
+            if handlers:
+                emit(handlers, tok, timings)
+            handlers = by_value(tok.value)
+            if handlers:
+                emit(handlers, tok, timings)
+            if declared is not None and DECLARATION in by_event:
+                emit(by_event[DECLARATION], declared, timings)
+            if event is not None and event in by_event:
+                emit(by_event[event], tok, timings)
+        if last is not None and END in by_event:
+            emit(by_event[END], last, timings)
+
+        patterns: List[AntiPattern] = []
+        clock = time.perf_counter
+        for rule in self.rules:
+            start = clock()
+            patterns.extend(rule.findings())
+            timings[rule.name] = timings.get(rule.name, 0.0) + clock() - start
+        self.timings = timings
+        logger.debug("anti-pattern rule timings: %s", timings)
+        patterns.sort(key=lambda p: p.line)
+        return patterns
 
-def detect_anti_patterns(code: str) -> List[AntiPattern]:
+def detect_anti_patterns(code: str, engine: Optional[RuleEngine] = None) -> List[AntiPattern]:
     """코드에서 안티패턴을 탐지합니다."""
-    patterns: List[AntiPattern] = []
-    if re.search(r"^\s*(?:int|float|double|char)\s+[A-Za-z_][A-Za-z0-9_]*\s*(?:=|;)", code, re.MULTILINE):
-        patterns.append(AntiPattern("Global Variable Misuse", "Global variable detected."))
-    if len(re.findall(r"if\s*\([^)]*\)\s*{", code)) >= 3:
-        patterns.append(AntiPattern("Deeply Nested Conditionals", "Multiple nested if statements."))
-    return patterns
+    if engine is None:
+        engine = RuleEngine()
+    return engine.run(code)
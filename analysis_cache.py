@@ -0,0 +1,114 @@
+# 콘텐츠 해시 기반 분석 결과 캐시 (메모리 LRU + 디스크 저장)
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Callable, List, Optional, Tuple
+
+import config
+from analysis import (
+    AntiPattern,
+    FunctionMetrics,
+    StaticAnalysisResult,
+    analyze_static,
+    detect_anti_patterns,
+)
+from atomic_file import atomic_write
+
+# 분석 로직이나 결과 형식이 바뀌면 올려서 기존 디스크 캐시를 무효화한다.
+ANALYSIS_VERSION = 2
+
+AnalysisEntry = Tuple[StaticAnalysisResult, List[AntiPattern]]
+
+
+def content_hash(code: str) -> str:
+    """소스코드 내용의 SHA-256 해시를 반환합니다."""
+    return hashlib.sha256(code.encode("utf-8", "replace")).hexdigest()
+
+
+def entry_to_dict(entry: AnalysisEntry) -> dict:
+    """분석 결과를 JSON 직렬화 가능한 dict로 변환합니다."""
+    analysis, anti = entry
+    return {
+        "version": ANALYSIS_VERSION,
+        "static": asdict(analysis),
+        "anti_patterns": [asdict(a) for a in anti],
+    }
+
+
+def entry_from_dict(data: dict) -> Optional[AnalysisEntry]:
+    """``entry_to_dict``의 역변환입니다. 버전이 다르면 None을 반환합니다."""
+    if data.get("version") != ANALYSIS_VERSION:
+        return None
+    static = dict(data["static"])
+    static["functions"] = [FunctionMetrics(**f) for f in static.get("functions", [])]
+    return StaticAnalysisResult(**static), [AntiPattern(**a) for a in data["anti_patterns"]]
+
+
+class AnalysisCache:
+    """분석 결과를 콘텐츠 해시로 저장하는 캐시.
+
+    최근 항목은 크기 제한이 있는 메모리 LRU에 두고,
+    모든 항목은 ``path`` 아래에 해시별 JSON 파일로 저장합니다.
+    ``encode``/``decode``를 바꾸면 정적 분석 결과가 아닌 값(예: 함수별 LLM 분석 결과)도 같은 방식으로 저장합니다.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        encode: Callable[[Any], dict] = entry_to_dict,
+        decode: Callable[[dict], Any] = entry_from_dict,
+    ):
+        self.path = config.ANALYSIS_CACHE_PATH if path is None else path
+        self.max_entries = config.ANALYSIS_CACHE_SIZE if max_entries is None else max_entries
+        self._encode = encode
+        self._decode = decode  # 형식/버전이 맞지 않으면 None을 반환
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _file(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], digest + ".json")
+
+    def _remember(self, digest: str, entry: Any) -> None:
+        with self._lock:
+            self._entries[digest] = entry
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, digest: str) -> Any:
+        """해시에 해당하는 분석 결과를 메모리, 디스크 순으로 찾습니다."""
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self._entries.move_to_end(digest)
+                return entry
+        if not self.path:
+            return None
+        try:
+            with open(self._file(digest), "r", encoding="utf-8") as f:
+                entry = self._decode(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if entry is not None:
+            self._remember(digest, entry)
+        return entry
+
+    def put(self, digest: str, entry: Any) -> None:
+        """분석 결과를 메모리와 디스크에 저장합니다."""
+        self._remember(digest, entry)
+        if not self.path:
+            return
+        atomic_write(self._file(digest), json.dumps(self._encode(entry), ensure_ascii=False))
+
+    def analyze(self, code: str) -> Tuple[str, StaticAnalysisResult, List[AntiPattern]]:
+        """코드를 분석하되, 같은 내용을 이미 분석했다면 캐시된 결과를 반환합니다."""
+        digest = content_hash(code)
+        entry = self.get(digest)
+        if entry is None:
+            entry = (analyze_static(code), detect_anti_patterns(code))
+            self.put(digest, entry)
+        return digest, entry[0], entry[1]
@@ -0,0 +1,33 @@
+# 임시 파일에 쓴 뒤 이름을 바꿔 원자적으로 파일을 교체하는 쓰기 도우미
+import contextlib
+import os
+import threading
+from typing import IO, Callable, Iterable, Union
+
+WriteData = Union[str, bytes, Iterable[Union[str, bytes]], Callable[[IO], None]]
+
+
+def atomic_write(path: str, data: WriteData, mode: str = "w") -> None:
+    """``path``를 원자적으로 씁니다. 읽는 쪽(다른 스레드/프로세스)은 쓰다 만 파일을 보지 않습니다.
+
+    ``data``는 문자열/바이트, 그 조각들의 iterable(큰 파일을 나눠 쓸 때), 또는 열린 파일을 받아
+    직접 쓰는 함수(``np.savez`` 등)입니다. ``mode``는 ``"w"``(UTF-8 텍스트) 또는 ``"wb"``입니다.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # 같은 파일을 동시에 쓰는 스레드/프로세스끼리 임시 파일이 겹치지 않게 한다
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            if callable(data):
+                data(f)
+            elif isinstance(data, (str, bytes)):
+                f.write(data)
+            else:
+                for chunk in data:
+                    f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
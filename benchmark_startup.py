@@ -0,0 +1,102 @@
+# 콜드 스타트 성능 측정: agents 모듈 import 시간과 첫 요청(분석) 지연시간
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# 새 인터프리터에서 실행되는 측정 코드 (이미 import된 모듈의 영향을 받지 않도록 매번 새 프로세스 사용)
+_PROBE = """
+import json, time
+start = time.perf_counter()
+import agents
+imported = time.perf_counter()
+from langchain_core.messages import HumanMessage
+graph = agents.build_graph()
+built = time.perf_counter()
+graph.invoke({"messages": [HumanMessage(content=CODE)]})
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "build_graph_ms": (built - imported) * 1000,
+    "first_request_ms": (done - built) * 1000,
+}))
+"""
+
+# 첫 요청은 분석 경로를 사용한다 ('분석'으로 시작하는 메시지 -> analyzer)
+_SAMPLE_CODE = """분석
+int counter = 0;
+
+int step(int n) {
+    for (int i = 0; i < n; i++) {
+        if (i % 3 == 0 && n > 10) {
+            counter += 7;
+        }
+    }
+    return counter;
+}
+"""
+
+
+# 측정 프로세스에서 끌 영속 저장소 경로 (빈 값이면 저장소를 쓰지 않는다).
+# 캐시를 꺼서 매번 실제 분석 시간을 재고, 가짜 '업로드파일' 항목이 실제 저장소에 남지 않게 한다.
+# 첫 요청 경로에 새 영속 저장소를 추가하면 여기에도 추가해야 한다.
+_DISABLED_STORES = (
+    "ANALYSIS_CACHE_PATH",
+    "LLM_CACHE_PATH",
+    "METRICS_STORE_PATH",
+    "CLONE_INDEX_PATH",
+    "BLOB_STORE_PATH",
+    "CHECKPOINT_PATH",
+)
+
+
+def run_once(code: str) -> dict:
+    """새 프로세스에서 한 번 측정합니다."""
+    env = dict(os.environ)
+    env.update(dict.fromkeys(_DISABLED_STORES, ""))
+    # 첫 요청은 로컬 분석 경로만 잰다 (LLM 추론과 유사 사례 검색 제외)
+    env["ANALYZER_USE_LLM"] = "0"
+    env["ANALYZER_RAG_K"] = "0"
+    probe = f"CODE = {code!r}\n{_PROBE}"
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="agents import 및 첫 요청 지연시간 측정")
+    parser.add_argument("--runs", type=int, default=5, help="측정 반복 횟수")
+    parser.add_argument("--max-import-ms", type=float, default=None, help="import 중앙값이 이 값을 넘으면 실패")
+    parser.add_argument("--max-first-request-ms", type=float, default=None, help="첫 요청 중앙값이 이 값을 넘으면 실패")
+    args = parser.parse_args()
+
+    samples = [run_once(_SAMPLE_CODE) for _ in range(args.runs)]
+    report = {"runs": len(samples)}
+    for key in ("import_ms", "build_graph_ms", "first_request_ms"):
+        values = [s[key] for s in samples]
+        report[key] = {"median": statistics.median(values), "min": min(values), "max": max(values)}
+    print(json.dumps(report, indent=2))
+
+    failed = False
+    if args.max_import_ms is not None and report["import_ms"]["median"] > args.max_import_ms:
+        print(f"import 시간 회귀: {report['import_ms']['median']:.1f}ms > {args.max_import_ms}ms", file=sys.stderr)
+        failed = True
+    if args.max_first_request_ms is not None and report["first_request_ms"]["median"] > args.max_first_request_ms:
+        print(
+            f"첫 요청 지연 회귀: {report['first_request_ms']['median']:.1f}ms > {args.max_first_request_ms}ms",
+            file=sys.stderr,
+        )
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# 업로드 소스코드를 내용 해시로 보관하는 저장소 (메모리 LRU + 디스크)
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import config
+from analysis_cache import content_hash
+from atomic_file import atomic_write
+
+
+class BlobStore:
+    """텍스트를 내용 해시(SHA-256)로 저장하고 조회합니다.
+
+    같은 내용은 한 번만 저장되며, 세션 상태나 메시지에는 해시만 남깁니다.
+    메모리에는 최근 사용한 내용을 ``max_bytes``까지만 두고 나머지는 디스크에서 읽습니다.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = config.BLOB_STORE_PATH if path is None else path
+        self.max_bytes = config.BLOB_CACHE_BYTES if max_bytes is None else max_bytes
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _file(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], digest + ".txt")
+
+    def _remember(self, digest: str, text: str) -> None:
+        with self._lock:
+            if digest not in self._entries:
+                self._bytes += len(text)
+            self._entries[digest] = text
+            self._entries.move_to_end(digest)
+            # 디스크에 있는 항목만 내보낼 수 있으므로 경로가 없으면 최신 하나는 남긴다
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._bytes -= len(old)
+
+    def put(self, text: str) -> str:
+        """텍스트를 저장하고 내용 해시를 반환합니다."""
+        digest = content_hash(text)
+        if self.path and not os.path.exists(self._file(digest)):
+            # 바이너리로 써서 CRLF 등 줄바꿈을 그대로 보존한다 (다시 읽은 내용의 해시가 키와 같아야 한다)
+            atomic_write(self._file(digest), text.encode("utf-8", "replace"), "wb")
+        self._remember(digest, text)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """해시에 해당하는 텍스트를 반환합니다. 없으면 None."""
+        with self._lock:
+            text = self._entries.get(digest)
+            if text is not None:
+                self._entries.move_to_end(digest)
+                return text
+        if not self.path:
+            return None
+        try:
+            with open(self._file(digest), "rb") as f:
+                text = f.read().decode("utf-8", "replace")
+        except OSError:
+            return None
+        self._remember(digest, text)
+        return text
+
+    def __contains__(self, digest: str) -> bool:
+        with self._lock:
+            if digest in self._entries:
+                return True
+        return bool(self.path) and os.path.exists(self._file(digest))
@@ -0,0 +1,242 @@
+# C 소스코드 단일 패스 토크나이저 및 스코프 추적기
+import re
+from typing import Iterator, List, NamedTuple, Optional
+
+# 토큰 종류
+IDENT = "ident"
+NUMBER = "number"
+STRING = "string"
+CHAR = "char"
+PUNCT = "punct"
+PREPROC = "preproc"
+
+# 스코프 이벤트
+FUNCTION_START = "function_start"
+FUNCTION_END = "function_end"
+
+KEYWORDS = frozenset(
+    """auto break case char const continue default do double else enum extern
+    float for goto if inline int long register restrict return short signed
+    sizeof static struct switch typedef union unsigned void volatile while
+    _Bool _Complex _Imaginary _Alignas _Alignof _Atomic _Noreturn
+    _Static_assert _Thread_local""".split()
+)
+
+# 순환 복잡도에 더해지는 분기 토큰
+DECISION_TOKENS = frozenset(["if", "for", "while", "case", "&&", "||", "?"])
+
+# 중첩 블록으로 취급하는 제어문 키워드
+CONTROL_KEYWORDS = frozenset(["if", "else", "for", "while", "do", "switch"])
+
+# 모든 정규식은 역추적 없이 토큰 길이에 비례해 매칭되도록 작성한다.
+# 토큰 앞의 공백은 패턴 안에서 소비해 파이썬 루프를 도는 매치 수를 줄인다.
+_TOKEN_RE = re.compile(
+    r"""
+    ^[ \t]*(?P<preproc>\#(?:\\\r?\n|[^\n])*)
+    | [ \t\r\f\v]*
+    (?:
+      (?P<nl>\n)
+      | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+      | (?P<string>"(?:\\.|[^"\\\n])*"?)
+      | (?P<char>'(?:\\.|[^'\\\n])*'?)
+      | (?P<number>\.?[0-9](?:[eEpP][+-]|[A-Za-z0-9_.])*)
+      | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<punct>\.\.\.|<<=|>>=|->|\+\+|--|<<|>>|&&|\|\||\#\#|[-+*/%&|^!=<>]=|\S)
+    )
+    """,
+    re.VERBOSE | re.DOTALL | re.MULTILINE,
+)
+
+
+class Token(NamedTuple):
+    kind: str  # 토큰 종류 (IDENT, NUMBER, ...)
+    value: str  # 토큰 원문
+    line: int  # 시작 라인 (1부터)
+
+
+def tokenize(code: str, keep_preprocessor: bool = False) -> Iterator[Token]:
+    """소스를 한 번만 읽으며 주석과 공백을 건너뛴 토큰을 생성합니다.
+
+    전처리기 라인(연속 라인 포함)은 기본적으로 건너뛰며,
+    ``keep_preprocessor``가 참이면 PREPROC 토큰 하나로 반환합니다.
+    """
+    line = 1
+    make = tuple.__new__  # NamedTuple 생성자보다 빠른 생성 경로
+    for m in _TOKEN_RE.finditer(code):
+        kind = m.lastgroup
+        if kind == "nl":
+            line += 1
+        elif kind == "comment":
+            line += m.group(kind).count("\n")
+        elif kind == "preproc":
+            text = m.group(kind)
+            if keep_preprocessor:
+                yield make(Token, (PREPROC, text, line))
+            line += text.count("\n")
+        elif kind is not None:
+            yield make(Token, (kind, m.group(kind), line))
+
+
+class ScopeTracker:
+    """토큰을 하나씩 받아 괄호 깊이, 현재 함수, 제어문 중첩을 추적합니다."""
+
+    def __init__(self):
+        self.brace_depth = 0  # 중괄호 깊이
+        self.paren_depth = 0  # 소괄호 깊이
+        self.function: Optional[str] = None  # 현재 함수 이름
+        self.function_line = 0  # 현재 함수 시작 라인
+        self.nesting = 0  # 현재 열린 제어문 블록 수
+        self._stack: List[str] = []  # 열린 중괄호 종류
+        self._candidate: Optional[str] = None  # 함수 정의 후보 이름
+        self._candidate_line = 0
+        self._after_params = False
+        self._control = False
+        self._prev: Optional[Token] = None
+        self._leaving = False
+
+    def feed(self, tok: Token) -> Optional[str]:
+        """토큰을 반영하고 함수 경계라면 FUNCTION_START/FUNCTION_END를 반환합니다.
+
+        FUNCTION_END 이벤트 시점에는 ``function`` 속성이 아직 끝난 함수를 가리킵니다.
+        """
+        if self._leaving:
+            self._leaving = False
+            self.function = None
+            self.function_line = 0
+        prev, self._prev = self._prev, tok
+        kind, value = tok.kind, tok.value
+        if kind == IDENT:
+            if value in CONTROL_KEYWORDS:
+                self._control = True
+            if self.brace_depth == 0 and self.paren_depth == 0:
+                self._after_params = False
+            return None
+        if kind != PUNCT:
+            if self.brace_depth == 0 and self.paren_depth == 0:
+                self._after_params = False
+            return None
+
+        if value == "(":
+            if self.brace_depth == 0 and self.paren_depth == 0:
+                if prev is not None and prev.kind == IDENT and prev.value not in KEYWORDS:
+                    self._candidate = prev.value
+                    self._candidate_line = prev.line
+                else:
+                    self._candidate = None
+            self.paren_depth += 1
+        elif value == ")":
+            if self.paren_depth:
+                self.paren_depth -= 1
+            if self.brace_depth == 0 and self.paren_depth == 0:
+                self._after_params = self._candidate is not None
+        elif value == "{":
+            if self.brace_depth == 0 and self._after_params:
+                self._stack.append("function")
+                self.function = self._candidate
+                self.function_line = self._candidate_line
+                self.brace_depth += 1
+                self._after_params = False
+                self._candidate = None
+                self._control = False
+                return FUNCTION_START
+            if self._control:
+                self._stack.append("control")
+                self.nesting += 1
+            else:
+                self._stack.append("block")
+            self._control = False
+            self.brace_depth += 1
+        elif value == "}":
+            self._control = False
+            if not self._stack:
+                # 조건부 컴파일로 중괄호 짝이 맞지 않는 경우 무시
+                return None
+            opened = self._stack.pop()
+            self.brace_depth -= 1
+            if opened == "control":
+                self.nesting -= 1
+            elif opened == "function":
+                self.paren_depth = 0
+                self._leaving = True
+                return FUNCTION_END
+        elif value == ";":
+            if self.paren_depth == 0:
+                self._control = False
+                if self.brace_depth == 0:
+                    self._candidate = None
+                    self._after_params = False
+        elif self.brace_depth == 0 and self.paren_depth == 0:
+            self._after_params = False
+        return None
+
+
+# 변수 선언으로 인식하는 기본 타입 키워드
+TYPE_KEYWORDS = frozenset(
+    ["int", "float", "double", "char", "long", "short", "unsigned", "signed", "_Bool"]
+)
+_DECL_MODIFIERS = frozenset(
+    ["const", "volatile", "static", "extern", "register", "auto", "restrict", "*"]
+)
+
+
+class DeclarationTracker:
+    """기본 타입 변수 선언자를 토큰 스트림에서 찾아냅니다.
+
+    ``int a = 1, b[3];`` 처럼 한 문장의 여러 선언자를 모두 인식하며,
+    함수 매개변수는 제외하고 ``for (int i = 0; ...)`` 초기화는 포함합니다.
+    """
+
+    def __init__(self):
+        self._state = 0  # 0: 대기, 1: 타입 뒤, 2: 이름 뒤, 3: 초기화식
+        self._name: Optional[Token] = None
+        self._paren = 0
+        self._brace = 0
+        self.const = False  # 현재 선언문에 const 한정자가 있는지
+
+    def feed(self, tok: Token, scope: ScopeTracker) -> Optional[Token]:
+        """선언자가 완성되면 변수 이름 토큰을 반환합니다.
+
+        ``scope``는 이 토큰을 이미 반영한 상태여야 합니다.
+        """
+        value = tok.value
+        state = self._state
+        if state == 0:
+            if tok.kind == IDENT and value in TYPE_KEYWORDS:
+                self._state = 1
+                self._paren = scope.paren_depth
+                self._brace = scope.brace_depth
+            elif value == "const":
+                self.const = True
+            elif value in (";", "{", "}"):
+                self.const = False
+            return None
+        if state == 1:
+            if tok.kind == IDENT and value not in KEYWORDS:
+                self._name = tok
+                self._state = 2
+            elif value in TYPE_KEYWORDS or value in _DECL_MODIFIERS:
+                if value == "const":
+                    self.const = True
+            else:
+                self._state = 0
+            return None
+        if state == 2:
+            self._state = 0
+            in_parens = self._paren > 0
+            if value == "=" or (not in_parens and value in (";", ",", "[")):
+                if value != ";":
+                    self._state = 3
+                elif not in_parens:
+                    self.const = False
+                return self._name
+            return None
+        # state == 3: 초기화식/배열 크기를 건너뛴다
+        if scope.paren_depth == self._paren and scope.brace_depth == self._brace:
+            if value == ",":
+                self._state = 0 if self._paren else 1
+            elif value == ";":
+                self._state = 0
+                self.const = False
+        elif scope.brace_depth < self._brace or scope.paren_depth < self._paren:
+            self._state = 0
+        return None
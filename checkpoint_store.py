@@ -0,0 +1,195 @@
+# 그래프 대화 상태를 변경분만 기록하는 SQLite 체크포인터
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+MESSAGES_CHANNEL = "messages"
+MESSAGE_REFS = "message_refs"  # 메시지 채널 값: 메시지 해시 목록(JSON)
+_SQL_VARS = 500  # IN 절 하나에 넣을 최대 변수 수
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_values (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS thread_messages (
+    thread_id TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    type TEXT,
+    value BLOB,
+    PRIMARY KEY (thread_id, digest)
+);
+"""
+
+
+class DeltaSqliteSaver(SqliteSaver):
+    """채널 값을 체크포인트마다 통째로 쓰지 않고 바뀐 채널만 버전별로 기록하는 ``SqliteSaver``.
+
+    메시지 채널은 메시지 하나를 한 번만 저장하고 체크포인트에는 메시지 해시 목록만 남기므로,
+    한 턴의 기록 비용은 대화 길이가 아니라 새 메시지 수에 비례합니다.
+    비동기 메서드는 동기 구현을 기본 executor 스레드에서 실행합니다 (``ainvoke``/``astream`` 경로용).
+    """
+
+    def setup(self) -> None:
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def _channel_rows(self, thread_id: str, ns: str, checkpoint: Checkpoint, new_versions: ChannelVersions):
+        values = checkpoint["channel_values"]
+        rows: List[Tuple] = []
+        messages: List[Tuple] = []
+        for channel, version in new_versions.items():
+            if channel not in values:
+                continue
+            value = values[channel]
+            if channel == MESSAGES_CHANNEL and isinstance(value, list):
+                digests = []
+                for message in value:
+                    type_, blob = self.serde.dumps_typed(message)
+                    digest = hashlib.sha1(blob).hexdigest()
+                    digests.append(digest)
+                    messages.append((thread_id, digest, type_, blob))
+                rows.append((thread_id, ns, channel, str(version), MESSAGE_REFS, json.dumps(digests).encode("utf-8")))
+            else:
+                rows.append((thread_id, ns, channel, str(version), *self.serde.dumps_typed(value)))
+        return rows, messages
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = str(config["configurable"]["thread_id"])
+        ns = config["configurable"].get("checkpoint_ns", "")
+        rows, messages = self._channel_rows(thread_id, ns, checkpoint, new_versions)
+        # 값을 먼저 써서 체크포인트가 없는 값을 가리키는 일이 없게 한다
+        with self.cursor() as cur:
+            cur.executemany("INSERT OR IGNORE INTO thread_messages VALUES (?, ?, ?, ?)", messages)
+            cur.executemany("INSERT OR REPLACE INTO channel_values VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return super().put(config, {**checkpoint, "channel_values": {}}, metadata, new_versions)
+
+    def _load_messages(self, cur: sqlite3.Cursor, thread_id: str, digests: List[str]) -> list:
+        found: Dict[str, Any] = {}
+        unique = list(dict.fromkeys(digests))
+        for start in range(0, len(unique), _SQL_VARS):
+            part = unique[start:start + _SQL_VARS]
+            cur.execute(
+                f"SELECT digest, type, value FROM thread_messages WHERE thread_id = ? AND digest IN ({','.join('?' * len(part))})",
+                (thread_id, *part),
+            )
+            for digest, type_, blob in cur.fetchall():
+                found[digest] = self.serde.loads_typed((type_, blob))
+        return [found[d] for d in digests if d in found]
+
+    def _attach_values(self, cur: sqlite3.Cursor, tup: Optional[CheckpointTuple]) -> Optional[CheckpointTuple]:
+        """체크포인트의 채널 버전에 해당하는 값을 채워 넣습니다."""
+        if tup is None or tup.checkpoint.get("channel_values"):
+            return tup
+        thread_id = str(tup.config["configurable"]["thread_id"])
+        ns = tup.config["configurable"].get("checkpoint_ns", "")
+        values: Dict[str, Any] = {}
+        for channel, version in tup.checkpoint["channel_versions"].items():
+            cur.execute(
+                "SELECT type, value FROM channel_values WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                (thread_id, ns, channel, str(version)),
+            )
+            row = cur.fetchone()
+            if row is None:
+                continue
+            type_, blob = row
+            if type_ == MESSAGE_REFS:
+                values[channel] = self._load_messages(cur, thread_id, json.loads(blob))
+            else:
+                values[channel] = self.serde.loads_typed((type_, blob))
+        tup.checkpoint["channel_values"] = values
+        return tup
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        tup = super().get_tuple(config)
+        with self.cursor(transaction=False) as cur:
+            return self._attach_values(cur, tup)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,  # pylint: disable=redefined-builtin
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        # 부모 구현은 순회하는 동안 연결 락을 잡고 있으므로 먼저 모두 읽은 뒤 값을 채운다
+        tuples = list(super().list(config, filter=filter, before=before, limit=limit))
+        with self.cursor(transaction=False) as cur:
+            for tup in tuples:
+                yield self._attach_values(cur, tup)
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM channel_values WHERE thread_id = ?", (str(thread_id),))
+            cur.execute("DELETE FROM thread_messages WHERE thread_id = ?", (str(thread_id),))
+
+    @staticmethod
+    async def _in_executor(func, *args):
+        # Python 3.8에는 asyncio.to_thread가 없다
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await self._in_executor(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,  # pylint: disable=redefined-builtin
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        tuples = await self._in_executor(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for tup in tuples:
+            yield tup
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await self._in_executor(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        await self._in_executor(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._in_executor(self.delete_thread, thread_id)
+
+
+def open_checkpointer(path: str) -> DeltaSqliteSaver:
+    """``path``의 SQLite 파일을 여러 스레드(세션)가 함께 쓰는 체크포인터로 엽니다."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 연결은 SqliteSaver의 락으로 보호되므로 스레드 사이에 공유한다
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # NORMAL은 WAL 모드에서만 전원이 꺼져도 마지막 커밋을 잃지 않으므로 WAL을 먼저 켠다
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return DeltaSqliteSaver(conn)
@@ -0,0 +1,168 @@
+# C 소스코드를 함수/최상위 선언 단위로 나누는 청커와 증분 인덱싱
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+import config
+from analysis_cache import content_hash
+from c_lexer import FUNCTION_END, ScopeTracker, tokenize
+from clone_detection import FILE_KEY_PREFIX, CloneIndex
+from vector_store import ProgressCallback, VectorStore, document_id
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Chunk:
+    text: str  # 청크 원문
+    kind: str  # "function" 또는 "declarations"
+    name: str  # 파일 안에서 유일한 청크 이름 (함수명 등)
+    start_line: int  # 시작 라인
+    end_line: int  # 끝 라인
+    hash: str  # 원문 내용 해시
+
+def _top_level_items(code: str) -> List[Tuple[str, str, int, int]]:
+    """최상위 항목 (종류, 함수명, 시작 라인, 끝 라인) 목록을 한 번의 토큰 스캔으로 구합니다."""
+    items = []
+    scope = ScopeTracker()
+    start: Optional[int] = None
+    last_line = 0
+    for tok in tokenize(code):
+        if start is None:
+            start = tok.line
+        last_line = tok.line
+        event = scope.feed(tok)
+        if event == FUNCTION_END:
+            items.append(("function", scope.function, start, tok.line))
+            start = None
+        elif tok.value == ";" and scope.brace_depth == 0 and scope.paren_depth == 0:
+            items.append(("declarations", "", start, tok.line))
+            start = None
+    if start is not None:
+        items.append(("declarations", "", start, last_line))
+    return items
+
+def chunk_c_source(code: str, max_chars: Optional[int] = None) -> List[Chunk]:
+    """C 소스를 함수 하나씩, 그리고 연속된 최상위 선언 묶음으로 나눕니다.
+
+    항목 사이의 주석과 전처리기 라인은 뒤따르는 청크에 붙습니다.
+    ``max_chars``를 넘는 함수는 라인 단위로 여러 조각으로 나눕니다.
+    """
+    max_chars = config.CHUNK_MAX_CHARS if max_chars is None else max_chars
+    lines = code.splitlines(keepends=True)
+    # [종류, 이름, 시작, 끝] — 라인 범위는 빈틈 없이 파일 전체를 덮는다
+    spans: List[List] = []
+    for kind, name, _, end in _top_level_items(code):
+        if spans and end <= spans[-1][3]:
+            # 한 줄에 여러 항목이 있으면 앞 청크에 합친다
+            if kind == "function" and spans[-1][0] != "function":
+                spans[-1][0], spans[-1][1] = kind, name
+            continue
+        first = spans[-1][3] + 1 if spans else 1
+        prev = spans[-1] if spans else None
+        if (
+            kind == "declarations"
+            and prev is not None
+            and prev[0] == "declarations"
+            and sum(len(l) for l in lines[prev[2] - 1:end]) <= max_chars
+        ):
+            prev[3] = end
+            continue
+        spans.append([kind, name, first, end])
+    if spans and spans[-1][3] < len(lines):
+        spans[-1][3] = len(lines)
+
+    chunks: List[Chunk] = []
+    seen = {}
+    for kind, name, start, end in spans:
+        for part_start, part_end in _split_lines(lines, start, end, max_chars):
+            text = "".join(lines[part_start - 1:part_end])
+            if not text.strip():
+                continue
+            digest = content_hash(text)
+            label = name if kind == "function" else f"<declarations {digest[:8]}>"
+            if part_start != start:
+                label = f"{label}#{part_start - start + 1}"
+            # 같은 이름이 또 나오면 (#ifdef 분기 등) 번호를 붙여 파일 안에서 유일하게 만든다
+            count = seen.get(label, 0)
+            seen[label] = count + 1
+            if count:
+                label = f"{label}~{count + 1}"
+            chunks.append(Chunk(text, kind, label, part_start, part_end, digest))
+    return chunks
+
+def _split_lines(lines: List[str], start: int, end: int, max_chars: int) -> List[Tuple[int, int]]:
+    """라인 범위를 ``max_chars`` 이하 조각들로 나눕니다."""
+    parts = []
+    part_start, size = start, 0
+    for number in range(start, end + 1):
+        length = len(lines[number - 1])
+        if size and size + length > max_chars:
+            parts.append((part_start, number - 1))
+            part_start, size = number, 0
+        size += length
+    parts.append((part_start, end))
+    return parts
+
+def chunk_documents(file_name: str, code: str, **metadata) -> List[Document]:
+    """청크를 벡터스토어용 Document 목록으로 변환합니다."""
+    return [
+        Document(
+            page_content=chunk.text,
+            metadata={"file": file_name, "function": chunk.name, "kind": chunk.kind, "hash": chunk.hash, **metadata},
+        )
+        for chunk in chunk_c_source(code)
+    ]
+
+def _split_clones(
+    clones: CloneIndex, file_name: str, code: str, docs: List[Document]
+) -> Tuple[List[Document], List[Tuple[Document, str]]]:
+    """청크를 임베딩할 것과 (다른 파일에 이미 있는 것과 거의 같아) 원본 벡터를 재사용할 (청크, 원본 문서 ID)로 나누고,
+    모든 청크 서명을 클론 인덱스에 기록합니다."""
+    sig = clones.signature(code)
+    if sig is not None:
+        clones.add(FILE_KEY_PREFIX + file_name, file_name, "", sig)
+    kept = []
+    aliases = []
+    for doc in docs:
+        meta = doc.metadata
+        sig = clones.signature(doc.page_content) if meta["kind"] == "function" else None
+        if sig is None:
+            kept.append(doc)
+            continue
+        threshold = config.CLONE_SKIP_THRESHOLD
+        matches = clones.query(sig, threshold, exclude_file=file_name, indexed_only=True) if threshold > 0 else []
+        clones.add(document_id(file_name, meta["function"], meta["hash"]), file_name, meta["function"], sig)
+        if matches:
+            aliases.append((doc, matches[0].key))
+        else:
+            kept.append(doc)
+    if aliases:
+        logger.info("%s: 다른 파일과 중복인 청크 %d개는 원본 벡터를 재사용", file_name, len(aliases))
+    return kept, aliases
+
+def index_source(
+    store: VectorStore,
+    file_name: str,
+    code: str,
+    on_progress: Optional[ProgressCallback] = None,
+    clones: Optional[CloneIndex] = None,
+    **metadata,
+) -> Tuple[int, int]:
+    """파일을 청크 단위로 증분 인덱싱하고 (새로 임베딩한 수, 삭제한 수)를 반환합니다.
+
+    내용 해시가 같은 청크는 다시 임베딩하지 않고, 더 이상 없는 청크는 삭제합니다.
+    ``clones``가 주어지면 다른 파일에 이미 있는 근사 중복 함수는 임베딩하지 않고 원본 벡터를 복사해 색인합니다.
+    """
+    docs = chunk_documents(file_name, code, **metadata)
+    live = {document_id(file_name, d.metadata["function"], d.metadata["hash"]) for d in docs}
+    stale = [doc_id for doc_id in store.ids({"file": file_name}) if doc_id not in live]
+    removed = store.delete(stale)
+    if clones is not None:
+        clones.remove(k for k in clones.keys(file_name) if k not in live and not k.startswith(FILE_KEY_PREFIX))
+        docs, aliases = _split_clones(clones, file_name, code, docs)
+    added = store.upsert(docs, on_progress=on_progress)
+    if clones is not None and aliases:
+        added += store.upsert_aliases(aliases)
+    return added, removed
@@ -0,0 +1,234 @@
+# MinHash/LSH 기반 유사 코드(클론) 탐지: 정규화한 토큰 shingle로 파일/함수 단위 근사 중복을 찾는다
+import os
+import threading
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+import config
+from analysis import AntiPattern, StaticAnalysisResult
+from atomic_file import atomic_write
+from c_lexer import CHAR, IDENT, KEYWORDS, NUMBER, STRING, tokenize
+
+# 서명 형식(정규화, 해시 함수, 시드)이 바뀌면 올린다 (버전이 다른 인덱스는 읽지 않는다)
+CLONE_VERSION = 1
+CLONE_TYPE = "Code Clone"  # 분석 결과에 추가되는 안티패턴 종류
+FILE_KEY_PREFIX = "file:"  # 파일 전체 서명의 키 접두사
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_SEED = 1  # 저장된 서명과 같은 순열을 쓰도록 고정
+_BLOCK = 4096  # 서명 계산 때 한 번에 처리할 shingle 수
+
+# 식별자/리터럴은 종류만 남겨 이름만 바꾼 복사본도 같은 shingle이 되게 한다
+_PLACEHOLDERS = {IDENT: "$id", NUMBER: "$num", STRING: "$str", CHAR: "$chr"}
+
+
+def normalized_tokens(code: str) -> List[str]:
+    """주석/공백/전처리기를 뺀 토큰열에서 식별자와 리터럴을 종류 표시로 바꿉니다 (키워드와 구두점은 유지)."""
+    out = []
+    for tok in tokenize(code):
+        if tok.kind == IDENT and tok.value in KEYWORDS:
+            out.append(tok.value)
+        else:
+            out.append(_PLACEHOLDERS.get(tok.kind, tok.value))
+    return out
+
+
+def shingles(tokens: List[str], size: int) -> np.ndarray:
+    """연속한 ``size``개 토큰 묶음의 32비트 해시 집합을 반환합니다."""
+    if len(tokens) < size:
+        return np.zeros(0, dtype=np.uint64)
+    joined = [" ".join(tokens[i:i + size]).encode("utf-8") for i in range(len(tokens) - size + 1)]
+    return np.unique(np.fromiter((zlib.crc32(s) for s in joined), dtype=np.uint64, count=len(joined)))
+
+
+@dataclass
+class CloneMatch:
+    key: str  # 인덱스 키 (청크 문서 ID 또는 "file:파일명")
+    file: str  # 파일명
+    function: str  # 함수/청크 이름 (파일 전체면 빈 문자열)
+    similarity: float  # 추정 Jaccard 유사도
+
+
+class CloneIndex:
+    """MinHash 서명을 밴드로 나눈 LSH 버킷에 넣어 근사 중복 후보를 상수 시간에 찾는 인덱스.
+
+    서명은 ``num_perm``개의 해시 최솟값이며, 밴드 하나가 통째로 같은 항목만 후보가 되고
+    후보는 서명 일치 비율(추정 Jaccard 유사도)로 다시 거릅니다.
+    ``indexed``가 거짓인 항목은 벡터스토어에 벡터가 없는 청크입니다 (이전 버전에서 중복이라 임베딩을 건너뛴 청크).
+    """
+
+    def __init__(self, path: Optional[str] = None, num_perm: Optional[int] = None, bands: Optional[int] = None):
+        self.path = config.CLONE_INDEX_PATH if path is None else path
+        self.num_perm = num_perm or config.CLONE_NUM_PERM
+        self.bands = bands or config.CLONE_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError(f"num_perm({self.num_perm})은 bands({self.bands})의 배수여야 합니다.")
+        self.rows = self.num_perm // self.bands
+        # 32비트 입력에 32비트 계수를 곱하므로 uint64에서 넘치지 않는다
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(1, 1 << 32, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=self.num_perm, dtype=np.uint64)
+        self._lock = threading.Lock()
+        self._reset()
+        if self.path and os.path.exists(self.path):
+            self.load()
+
+    def _reset(self) -> None:
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._meta: Dict[str, Tuple[str, str, bool]] = {}  # 키 -> (파일명, 함수명, 임베딩 여부)
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)
+        self._by_file: Dict[str, Set[str]] = defaultdict(set)
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, code: str) -> Optional[np.ndarray]:
+        """코드의 MinHash 서명을 계산합니다. 토큰이 ``CLONE_MIN_TOKENS``보다 적으면 None (짧은 코드는 우연히 겹치기 쉽다)."""
+        tokens = normalized_tokens(code)
+        if len(tokens) < config.CLONE_MIN_TOKENS:
+            return None
+        hashes = shingles(tokens, config.CLONE_SHINGLE_SIZE)
+        if not len(hashes):
+            return None
+        sig = np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        # 큰 파일에서도 (num_perm x shingle 수) 행렬을 한 번에 만들지 않도록 나눠 계산한다
+        for start in range(0, len(hashes), _BLOCK):
+            block = hashes[start:start + _BLOCK]
+            np.minimum(sig, ((np.outer(self._a, block) + self._b[:, None]) % _MERSENNE_PRIME).min(axis=1), out=sig)
+        return sig
+
+    def _bands(self, sig: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, sig[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _remove(self, key: str) -> None:
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        for band in self._bands(sig):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+        file = self._meta.pop(key)[0]
+        self._by_file[file].discard(key)
+        if not self._by_file[file]:
+            del self._by_file[file]
+        self._dirty = True
+
+    def add(self, key: str, file: str, function: str, sig: np.ndarray, indexed: bool = True) -> None:
+        """서명을 인덱스에 넣습니다. 같은 키가 있으면 바꿉니다."""
+        with self._lock:
+            self._remove(key)
+            self._signatures[key] = sig
+            self._meta[key] = (file, function, indexed)
+            self._by_file[file].add(key)
+            for band in self._bands(sig):
+                self._buckets[band].add(key)
+            self._dirty = True
+
+    def remove(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def keys(self, file: str) -> List[str]:
+        """파일에 속한 키 목록을 반환합니다."""
+        with self._lock:
+            return list(self._by_file.get(file, ()))
+
+    def query(
+        self,
+        sig: np.ndarray,
+        threshold: Optional[float] = None,
+        exclude_file: Optional[str] = None,
+        whole_file: bool = False,
+        indexed_only: bool = False,
+    ) -> List[CloneMatch]:
+        """유사도가 ``threshold`` 이상인 항목을 유사도 내림차순으로 반환합니다.
+
+        ``whole_file``이면 파일 전체 서명끼리, 아니면 함수/청크 서명끼리만 비교합니다.
+        """
+        threshold = config.CLONE_THRESHOLD if threshold is None else threshold
+        with self._lock:
+            candidates: Set[str] = set()
+            for band in self._bands(sig):
+                candidates.update(self._buckets.get(band, ()))
+            matches = []
+            for key in candidates:
+                file, function, indexed = self._meta[key]
+                if file == exclude_file or key.startswith(FILE_KEY_PREFIX) != whole_file or (indexed_only and not indexed):
+                    continue
+                similarity = float(np.count_nonzero(self._signatures[key] == sig)) / self.num_perm
+                if similarity >= threshold:
+                    matches.append(CloneMatch(key, file, function, similarity))
+        matches.sort(key=lambda m: (-m.similarity, m.key))
+        return matches
+
+    def save(self, path: Optional[str] = None) -> None:
+        """서명과 메타데이터를 .npz 파일 하나에 원자적으로 저장합니다 (LSH 버킷은 읽을 때 다시 만든다)."""
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            if not self._dirty and path == self.path and os.path.exists(path):
+                return
+            keys = list(self._signatures)
+            meta = [self._meta[k] for k in keys]
+            data = {
+                "version": np.array([CLONE_VERSION, self.num_perm]),
+                "keys": np.array(keys, dtype=str),
+                "files": np.array([m[0] for m in meta], dtype=str),
+                "functions": np.array([m[1] for m in meta], dtype=str),
+                "indexed": np.array([m[2] for m in meta], dtype=bool),
+                "signatures": np.array([self._signatures[k] for k in keys], dtype=np.uint64).reshape(len(keys), self.num_perm),
+            }
+            atomic_write(path, lambda f: np.savez(f, **data), "wb")
+            self._dirty = False
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """저장된 인덱스를 읽습니다. 버전이나 서명 길이가 다르면 비운 채로 두고 False를 반환합니다."""
+        path = path or self.path
+        with np.load(path) as data:
+            if data["version"].tolist() != [CLONE_VERSION, self.num_perm]:
+                with self._lock:
+                    self._reset()
+                return False
+            rows = zip(data["keys"].tolist(), data["files"].tolist(), data["functions"].tolist(), data["indexed"].tolist(), data["signatures"])
+            rows = list(rows)
+        with self._lock:
+            self._reset()
+        for key, file, function, indexed, sig in rows:
+            self.add(key, file, function, sig, indexed)
+        self._dirty = False
+        return True
+
+
+def find_clones(index: CloneIndex, name: str, code: str, analysis: StaticAnalysisResult) -> List[AntiPattern]:
+    """다른 파일에 있는 유사 코드를 파일 전체와 함수 단위로 찾아 "Code Clone" 안티패턴으로 반환합니다."""
+    findings = []
+    sig = index.signature(code)
+    if sig is not None:
+        for match in index.query(sig, exclude_file=name, whole_file=True)[:1]:
+            findings.append(AntiPattern(CLONE_TYPE, f"파일 전체가 {match.file}와(과) 유사합니다 (유사도 {match.similarity:.2f})."))
+    lines = code.splitlines(keepends=True)
+    for f in analysis.functions:
+        sig = index.signature("".join(lines[f.start_line - 1:f.end_line]))
+        if sig is None:
+            continue
+        for match in index.query(sig, exclude_file=name)[:1]:
+            findings.append(
+                AntiPattern(
+                    CLONE_TYPE,
+                    f"함수 {f.name}이(가) {match.file}의 {match.function}와(과) 유사합니다 (유사도 {match.similarity:.2f}).",
+                    f.start_line,
+                    f.name,
+                )
+            )
+    return findings
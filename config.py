@@ -6,5 +6,72 @@ AOAI_API_KEY = os.getenv("AOAI_API_KEY")  # Azure OpenAI API 키
 AOAI_DEPLOY_GPT4O = os.getenv("AOAI_DEPLOY_GPT4O")  # GPT-4O 배포 이름
 AOAI_DEPLOY_EMBED_3_LARGE = os.getenv("AOAI_DEPLOY_EMBED_3_LARGE")  # 임베딩 모델 배포 이름
 AOAI_API_VERSION = os.getenv("AOAI_API_VERSION", "2024-02-01")  # API 버전
+EMBED_DIMENSIONS = int(os.getenv("EMBED_DIMENSIONS", "0")) or None  # 임베딩 차원 축소 (text-embedding-3 계열, 미설정 시 모델 기본값)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "32"))  # 프로세스 공용 HTTP 연결 풀 최대 연결 수
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "16"))  # 재사용을 위해 열어 둘 유휴 연결 수
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "120"))  # Azure OpenAI 요청 타임아웃 (초)
 
 VECTORSTORE_PATH = os.getenv("VECTORSTORE_PATH", "vectorstore")  # 벡터스토어 경로
+VECTORSTORE_COMPACT_BYTES = int(os.getenv("VECTORSTORE_COMPACT_BYTES", str(64 * 1024 * 1024)))  # 압축을 시작하는 최소 로그 크기
+VECTORSTORE_COMPACT_RATIO = float(os.getenv("VECTORSTORE_COMPACT_RATIO", "0.5"))  # 스냅샷 대비 로그 크기 비율
+VECTORSTORE_INDEX_MODE = os.getenv("VECTORSTORE_INDEX_MODE", "flat")  # flat, ivf_flat, ivf_pq, hnsw
+VECTORSTORE_FP16 = os.getenv("VECTORSTORE_FP16", "0") == "1"  # 벡터를 float16으로 저장
+VECTORSTORE_TRAIN_THRESHOLD = int(os.getenv("VECTORSTORE_TRAIN_THRESHOLD", "50000"))  # IVF 학습을 시작하는 문서 수
+VECTORSTORE_NPROBE = int(os.getenv("VECTORSTORE_NPROBE", "16"))  # IVF 검색 시 살펴볼 리스트 수
+VECTORSTORE_HNSW_M = int(os.getenv("VECTORSTORE_HNSW_M", "32"))  # HNSW 노드당 이웃 수
+VECTORSTORE_HNSW_EF_SEARCH = int(os.getenv("VECTORSTORE_HNSW_EF_SEARCH", "64"))  # HNSW 검색 후보 수
+
+ANALYSIS_CACHE_PATH = os.getenv("ANALYSIS_CACHE_PATH", "analysis_cache")  # 분석 결과 캐시 경로
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "256"))  # 메모리에 유지할 분석 결과 수
+METRICS_STORE_PATH = os.getenv("METRICS_STORE_PATH", "metrics/metrics.npz")  # 파일/함수/안티패턴 지표 저장 파일
+METRICS_COMPACT_BYTES = int(os.getenv("METRICS_COMPACT_BYTES", str(4 * 1024 * 1024)))  # 지표 로그를 스냅샷에 합치기 시작하는 최소 크기
+METRICS_COMPACT_RATIO = float(os.getenv("METRICS_COMPACT_RATIO", "0.5"))  # 스냅샷 대비 지표 로그 크기 비율
+CLONE_INDEX_PATH = os.getenv("CLONE_INDEX_PATH", "clone_index/clones.npz")  # MinHash 클론 인덱스 저장 파일
+CLONE_NUM_PERM = int(os.getenv("CLONE_NUM_PERM", "128"))  # MinHash 서명 길이 (CLONE_BANDS의 배수)
+CLONE_BANDS = int(os.getenv("CLONE_BANDS", "32"))  # LSH 밴드 수 (많을수록 낮은 유사도도 후보가 됨)
+CLONE_SHINGLE_SIZE = int(os.getenv("CLONE_SHINGLE_SIZE", "5"))  # shingle 하나의 토큰 수
+CLONE_MIN_TOKENS = int(os.getenv("CLONE_MIN_TOKENS", "40"))  # 이보다 짧은 코드는 클론 비교에서 제외
+CLONE_THRESHOLD = float(os.getenv("CLONE_THRESHOLD", "0.8"))  # 분석 결과에 클론으로 보고할 최소 유사도
+CLONE_SKIP_THRESHOLD = float(os.getenv("CLONE_SKIP_THRESHOLD", "0.9"))  # 이 유사도 이상이면 임베딩을 건너뜀 (0이면 사용 안 함)
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache")  # 임베딩 캐시 경로
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "200000"))  # 디스크에 유지할 임베딩 벡터 수
+
+BLOB_STORE_PATH = os.getenv("BLOB_STORE_PATH", "blob_store")  # 업로드 소스코드 저장 경로 (내용 해시별 파일)
+BLOB_CACHE_BYTES = int(os.getenv("BLOB_CACHE_BYTES", str(64 * 1024 * 1024)))  # 메모리에 유지할 소스코드 크기
+REPORT_PATH = os.getenv("REPORT_PATH", "reports")  # 리포트 파일과 파일별 섹션 캐시 경로
+REPORT_MAX_BYTES = int(os.getenv("REPORT_MAX_BYTES", str(200 * 1024 * 1024)))  # 리포트 경로 최대 크기 (넘으면 오래 쓰지 않은 파일부터 삭제, 0이면 제한 없음)
+UPLOAD_WORKERS = int(os.getenv("UPLOAD_WORKERS", "4"))  # 업로드 파일 분석/인덱싱 백그라운드 작업 수
+UPLOAD_MAX_FILE_BYTES = int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(20 * 1024 * 1024)))  # zip 안에서 받아들일 파일 최대 크기
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "4000"))  # 원문으로 유지할 최근 대화의 토큰 예산
+HISTORY_KEEP_LAST = int(os.getenv("HISTORY_KEEP_LAST", "4"))  # 예산과 상관없이 유지할 최근 메시지 수
+MESSAGE_PREVIEW_CHARS = int(os.getenv("MESSAGE_PREVIEW_CHARS", "1500"))  # 이보다 긴 메시지는 접어서 표시
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "checkpoints/graph.sqlite")  # 대화 상태(SQLite) 파일 (비우면 메모리에만 저장)
+CODE_PAGE_LINES = int(os.getenv("CODE_PAGE_LINES", "200"))  # 코드 보기 한 페이지의 라인 수
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "512"))  # 일반 대화 응답 캐시 항목 수
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))  # 캐시된 응답 유효 시간 (초)
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.95"))  # 비슷한 질문으로 볼 최소 코사인 유사도 (0이면 정확 일치만)
+RESPONSE_CACHE_BYPASS = os.getenv("RESPONSE_CACHE_BYPASS", "!새로")  # 질문 앞에 붙이면 캐시를 건너뛰고 새로 답변
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))  # 임베딩 요청 1건당 문서 수
+EMBED_MAX_CONCURRENCY = int(os.getenv("EMBED_MAX_CONCURRENCY", "4"))  # 동시 임베딩 요청 수
+EMBED_RPM = int(os.getenv("EMBED_RPM", "720"))  # 임베딩 배포의 분당 요청 한도 (0이면 제한 없음)
+EMBED_TPM = int(os.getenv("EMBED_TPM", "120000"))  # 임베딩 배포의 분당 토큰 한도 (0이면 제한 없음)
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "6"))  # 429·일시적 오류 시 재시도 횟수 (SDK 자체 재시도는 끔)
+EMBED_QUERY_MAX_RETRIES = int(os.getenv("EMBED_QUERY_MAX_RETRIES", "2"))  # 검색 쿼리 임베딩의 429·일시적 오류 재시도 횟수
+LLM_RPM = int(os.getenv("LLM_RPM", "450"))  # 채팅 배포의 분당 요청 한도 (0이면 제한 없음)
+LLM_TPM = int(os.getenv("LLM_TPM", "80000"))  # 채팅 배포의 분당 토큰 한도 (0이면 제한 없음)
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1024"))  # max_tokens가 없을 때 채팅 요청에 미리 잡는 출력 토큰 수
+RATE_LIMIT_INTERACTIVE_RESERVE = float(os.getenv("RATE_LIMIT_INTERACTIVE_RESERVE", "0.2"))  # batch 요청이 쓰지 않고 사용자 요청용으로 남겨 둘 한도 비율
+RATE_LIMIT_COALESCE = os.getenv("RATE_LIMIT_COALESCE", "1") == "1"  # 동시에 들어온 같은 요청을 한 번만 보냄
+
+CHUNK_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "6000"))  # 청크 하나의 최대 글자 수
+
+ANALYZER_RAG_K = int(os.getenv("ANALYZER_RAG_K", "3"))  # 분석 시 참고할 유사 사례 수 (0이면 검색 생략)
+ANALYZER_USE_LLM = os.getenv("ANALYZER_USE_LLM", "1") == "1"  # 분석 결과를 LLM으로 추론/의사코드 생성
+ANALYZER_MODE = os.getenv("ANALYZER_MODE", "auto")  # single: 파일 전체 한 번, map_reduce: 함수별 분석 후 합침, auto: 큰 파일만 map_reduce
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))  # 함수별 LLM 분석 동시 호출 수
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache")  # 함수별 LLM 분석 결과 캐시 경로
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))  # 메모리에 유지할 함수별 분석 결과 수
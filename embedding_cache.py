@@ -0,0 +1,248 @@
+# 디스크 기반 임베딩 캐시 (메모리 매핑 float32 배열 + 추가 전용 인덱스 로그)
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+import config
+from atomic_file import atomic_write
+
+_INITIAL_ROWS = 1024
+_INVALID = "-"  # 인덱스 로그에서 슬롯 무효화를 뜻하는 키
+_FILES = ("meta.json", "index.log", "vectors.f32")
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(model: str, text: str) -> str:
+    """(모델, 텍스트) 쌍의 캐시 키를 반환합니다."""
+    h = hashlib.sha256()
+    h.update(model.encode("utf-8"))
+    h.update(b"\0")
+    h.update(text.encode("utf-8", "replace"))
+    return h.hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 모델을 감싸 결과 벡터를 디스크에 캐시하는 래퍼.
+
+    벡터는 ``vectors.f32``에 (슬롯 수 x 차원) float32 배열로 메모리 매핑해 저장하고,
+    키와 슬롯의 대응은 ``index.log``에 한 줄씩 추가 기록합니다 (``- 슬롯`` 줄은 슬롯 무효화).
+    저장 슬롯 수는 ``max_entries``로 제한되며, 가득 차면 CLOCK 방식으로
+    최근에 쓰이지 않은 항목부터 덮어씁니다.
+    """
+
+    def __init__(self, model: Embeddings, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.model = model
+        self.model_name = str(getattr(model, "model", None) or getattr(model, "deployment", "") or type(model).__name__)
+        if getattr(model, "dimensions", None):
+            # 차원을 줄인 임베딩은 같은 텍스트라도 다른 벡터이므로 키를 분리
+            self.model_name += f":{model.dimensions}"
+        self.path = config.EMBEDDING_CACHE_PATH if path is None else path
+        self.max_entries = config.EMBEDDING_CACHE_SIZE if max_entries is None else max_entries
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0  # 캐시 적중으로 절약한 추정 토큰 수
+        self.miss_seconds = 0.0  # 캐시 미스로 모델 호출에 쓴 시간
+        self._lock = threading.Lock()
+        self._slots: Dict[str, int] = {}  # 키 -> 슬롯
+        self._keys: List[Optional[str]] = []  # 슬롯 -> 키
+        self._referenced = bytearray()  # CLOCK 참조 비트
+        self._hand = 0
+        self._dim = 0
+        self._vectors: Optional[np.memmap] = None
+        self._log_lines = 0
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+
+    # --- 저장소 관리 ---
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        try:
+            with open(self._file("meta.json"), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        if meta.get("model") != self.model_name:
+            return
+        try:
+            self._open(int(meta["dim"]))
+        except (OSError, ValueError, KeyError):
+            # 벡터 파일이 없거나 잘렸으면 (또는 로그가 없으면) 빈 캐시로 다시 시작한다
+            logger.warning("임베딩 캐시 파일이 손상되어 비우고 다시 시작합니다: %s", self.path, exc_info=True)
+            self._reset()
+
+    def _reset(self) -> None:
+        self._slots = {}
+        self._keys = []
+        self._referenced = bytearray()
+        self._hand = 0
+        self._dim = 0
+        self._vectors = None
+        self._log_lines = 0
+        for name in _FILES:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(self._file(name))
+
+    def _open(self, dim: int) -> None:
+        self._dim = dim
+        rows = os.path.getsize(self._file("vectors.f32")) // (4 * self._dim)
+        if rows == 0:
+            raise ValueError("벡터 파일이 비어 있습니다.")
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(rows, self._dim))
+        rows = min(rows, self.max_entries)
+        keys: Dict[int, str] = {}
+        last = -1
+        with open(self._file("index.log"), "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 2:
+                    continue
+                key, slot = parts[0], int(parts[1])
+                self._log_lines += 1
+                if slot >= rows:
+                    continue
+                old = keys.pop(slot, None)
+                if old is not None and self._slots.get(old) == slot:
+                    del self._slots[old]
+                if key == _INVALID:
+                    continue
+                keys[slot] = key
+                self._slots[key] = slot
+                last = slot
+        # 파일 용량이 아니라 실제로 쓴 슬롯까지만 목록을 만들어야 남은 슬롯을 다시 나눠 줄 수 있다
+        used = max(keys, default=-1) + 1
+        self._keys = [keys.get(slot) for slot in range(used)]
+        self._referenced = bytearray(used)
+        self._hand = last + 1
+
+    def _create(self, dim: int) -> None:
+        self._dim = dim
+        with open(self._file("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "dim": dim}, f)
+        open(self._file("index.log"), "w", encoding="utf-8").close()
+        rows = min(_INITIAL_ROWS, self.max_entries)
+        with open(self._file("vectors.f32"), "wb") as f:
+            f.truncate(rows * dim * 4)
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(rows, dim))
+
+    def _grow(self) -> None:
+        rows = min(len(self._vectors) * 2, self.max_entries)
+        self._vectors.flush()
+        with open(self._file("vectors.f32"), "r+b") as f:
+            f.truncate(rows * self._dim * 4)
+        self._vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r+", shape=(rows, self._dim))
+
+    def _allocate(self) -> int:
+        """새 벡터를 쓸 슬롯을 고릅니다. 가득 찼다면 CLOCK으로 희생 슬롯을 고릅니다."""
+        if len(self._keys) < self.max_entries:
+            if len(self._keys) >= len(self._vectors):
+                self._grow()
+            self._keys.append(None)
+            self._referenced.append(0)
+            return len(self._keys) - 1
+        size = len(self._keys)
+        while True:
+            slot = self._hand % size
+            self._hand = slot + 1
+            if self._referenced[slot]:
+                self._referenced[slot] = 0
+                continue
+            old = self._keys[slot]
+            if old is not None:
+                self._slots.pop(old, None)
+            return slot
+
+    def _compact_log(self) -> None:
+        """인덱스 로그가 살아있는 항목보다 너무 길어지면 현재 상태로 다시 씁니다."""
+        # 마지막으로 쓴 슬롯이 끝에 오도록 기록해 재시작 시 CLOCK 위치를 보존
+        order = sorted(self._slots.items(), key=lambda kv: (kv[1] - self._hand) % len(self._keys))
+        atomic_write(self._file("index.log"), (f"{key} {slot}\n" for key, slot in order))
+        self._log_lines = len(self._slots)
+
+    def _store(self, keys: List[str], vectors: List[List[float]]) -> None:
+        if self._vectors is None:
+            self._create(len(vectors[0]))
+        placed = []
+        invalidated = []
+        for key, vector in zip(keys, vectors):
+            if key in self._slots:
+                continue
+            slot = self._allocate()
+            if self._keys[slot] is not None:
+                invalidated.append(f"{_INVALID} {slot}\n")
+            self._keys[slot] = key
+            self._slots[key] = slot
+            self._referenced[slot] = 1
+            placed.append((slot, key, vector))
+        # 재사용하는 슬롯은 벡터를 덮어쓰기 전에 무효화를 기록해, 중간에 멈춰도 이전 키가 새 벡터를 가리키지 않게 한다
+        if invalidated:
+            with open(self._file("index.log"), "a", encoding="utf-8") as f:
+                f.writelines(invalidated)
+        for slot, _, vector in placed:
+            self._vectors[slot] = vector
+        self._vectors.flush()
+        lines = [f"{key} {slot}\n" for slot, key, _ in placed]
+        with open(self._file("index.log"), "a", encoding="utf-8") as f:
+            f.writelines(lines)
+        self._log_lines += len(invalidated) + len(lines)
+        if self._log_lines > 4 * max(len(self._slots), 1):
+            self._compact_log()
+
+    # --- Embeddings 인터페이스 ---
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """캐시에 없는 텍스트만 모델로 임베딩하고 결과를 캐시합니다."""
+        keys = [embedding_key(self.model_name, t) for t in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                slot = self._slots.get(key)
+                if slot is None:
+                    missing.setdefault(key, []).append(i)
+                    continue
+                self._referenced[slot] = 1
+                results[i] = self._vectors[slot].tolist()
+                self.hits += 1
+                self.saved_tokens += len(texts[i]) // 4
+        if missing:
+            order = list(missing)
+            start = time.perf_counter()
+            vectors = self.model.embed_documents([texts[missing[k][0]] for k in order])
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.misses += len(order)
+                self.miss_seconds += elapsed
+                self._store(order, vectors)
+            for key, vector in zip(order, vectors):
+                for i in missing[key]:
+                    results[i] = list(vector)
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        """쿼리 임베딩도 문서 임베딩과 같은 캐시를 사용합니다."""
+        return self.embed_documents([text])[0]
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중/미스 횟수와 절약한 지연시간·토큰 추정치를 반환합니다."""
+        per_miss = self.miss_seconds / self.misses if self.misses else 0.0
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._slots),
+            "saved_seconds": self.hits * per_miss,
+            "saved_tokens": self.saved_tokens,
+        }
@@ -1,6 +1,15 @@
 # 임베딩 모델 관련 함수 정의
+import os
+import threading
+from typing import Dict, Optional
+
 from langchain_openai import AzureOpenAIEmbeddings
 import config
+from embedding_cache import CachedEmbeddings
+from http_pool import get_async_http_client, get_http_client
+
+_lock = threading.Lock()
+_cached_models: Dict[str, CachedEmbeddings] = {}  # 캐시 경로 -> 공유 인스턴스
 
 # Azure OpenAI 임베딩 모델을 반환합니다.
 def get_embedding_model() -> AzureOpenAIEmbeddings:
@@ -9,4 +18,19 @@ def get_embedding_model() -> AzureOpenAIEmbeddings:
         api_key=config.AOAI_API_KEY,
         model=config.AOAI_DEPLOY_EMBED_3_LARGE,
         openai_api_version=config.AOAI_API_VERSION,
+        dimensions=config.EMBED_DIMENSIONS,
+        http_client=get_http_client(),  # 프로세스 공용 연결 풀 (분당 한도, 동일 요청 합치기 포함)
+        http_async_client=get_async_http_client(),
+        max_retries=0,  # 재시도는 VectorStore가 call_with_backoff로 맡는다 (배치 색인과 검색 쿼리 모두)
     )
+
+# 디스크 캐시로 감싼 임베딩 모델을 반환합니다. VectorStore의 기본 임베딩 모델입니다.
+# 같은 캐시 파일을 여러 인스턴스가 따로 고쳐 쓰면 슬롯이 엇갈리므로 경로마다 프로세스에서 하나만 만든다.
+def get_cached_embedding_model(path: Optional[str] = None) -> CachedEmbeddings:
+    path = config.EMBEDDING_CACHE_PATH if path is None else path
+    key = os.path.abspath(path)
+    with _lock:
+        model = _cached_models.get(key)
+        if model is None:
+            model = _cached_models[key] = CachedEmbeddings(get_embedding_model(), path=path)
+    return model
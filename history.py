@@ -0,0 +1,71 @@
+# 대화 기록 관리: 코드 참조 메시지와 토큰 예산 기반 기록 압축
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+import config
+from rate_limit import estimate_tokens
+
+CODE_REF_KEY = "code_ref"  # 메시지가 참조하는 업로드 코드 {"hash": 내용 해시, "name": 파일명}
+SUMMARY_KEY = "history_summary"  # 압축된 이전 대화 요약 메시지 표시
+
+
+def code_ref_message(digest: str, name: str, command: str = "분석") -> HumanMessage:
+    """코드 원문 대신 blob 해시를 담은 사용자 메시지를 만듭니다."""
+    return HumanMessage(content=f"{command} [{name}]", additional_kwargs={CODE_REF_KEY: {"hash": digest, "name": name}})
+
+
+def code_ref(message: BaseMessage) -> Optional[dict]:
+    """메시지가 참조하는 코드 {"hash", "name"}을 반환합니다. 없으면 None."""
+    return message.additional_kwargs.get(CODE_REF_KEY)
+
+
+def is_summary(message: BaseMessage) -> bool:
+    return bool(message.additional_kwargs.get(SUMMARY_KEY))
+
+
+def _summary_line(message: BaseMessage, width: int = 120) -> str:
+    role = "사용자" if isinstance(message, HumanMessage) else "응답"
+    ref = code_ref(message)
+    if ref is not None:
+        text = f"{message.content} (코드 {ref['hash'][:8]})"
+    else:
+        text = " ".join(str(message.content).split())
+    if len(text) > width:
+        text = text[:width] + "…"
+    return f"- {role}: {text}"
+
+
+def compact_history(
+    messages: List[BaseMessage],
+    budget: Optional[int] = None,
+    keep_last: Optional[int] = None,
+) -> List[BaseMessage]:
+    """최근 메시지는 토큰 예산 안에서 그대로 두고, 그 이전 턴은 한 줄씩 요약한 메시지 하나로 합칩니다.
+
+    최근 ``keep_last``개는 예산과 상관없이 유지하며, 요약 자체도 예산의 4분의 1을 넘지 않도록
+    가장 오래된 줄부터 버립니다.
+    """
+    budget = config.HISTORY_TOKEN_BUDGET if budget is None else budget
+    keep_last = config.HISTORY_KEEP_LAST if keep_last is None else keep_last
+    previous: List[str] = []
+    if messages and is_summary(messages[0]):
+        previous = messages[0].content.splitlines()[1:]
+        messages = messages[1:]
+
+    used = 0
+    split = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        used += estimate_tokens(str(messages[i].content))
+        if used > budget and len(messages) - i > keep_last:
+            break
+        split = i
+    if split == 0 and not previous:
+        return list(messages)
+
+    lines = previous + [_summary_line(m) for m in messages[:split]]
+    summary_budget = max(1, budget // 4)
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > summary_budget:
+        lines.pop(0)
+    summary = AIMessage(content="이전 대화 요약:\n" + "\n".join(lines), additional_kwargs={SUMMARY_KEY: True})
+    return [summary] + list(messages[split:])
@@ -0,0 +1,387 @@
+# Azure OpenAI 채팅/임베딩 클라이언트가 함께 쓰는 프로세스 단위 HTTP 연결 풀
+#
+# 모든 채팅/임베딩 요청은 이 풀의 전송 계층을 지나므로 여기서 배포별 분당 한도를 함께 지키고,
+# 동시에 들어온 같은 요청은 실제 호출 한 번으로 합친다.
+import asyncio
+import hashlib
+import json
+import threading
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+import config
+from rate_limit import CHAT, EMBED, estimate_tokens, get_limiter, retry_after
+
+_lock = threading.Lock()
+_client: Optional[httpx.Client] = None
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _request_kind(request: httpx.Request) -> Optional[str]:
+    """한도를 적용할 요청이면 종류(CHAT, EMBED)를, 아니면 None을 반환합니다."""
+    if request.method != "POST":
+        return None
+    path = request.url.path
+    if path.endswith("/embeddings"):
+        return EMBED
+    if path.endswith("/chat/completions"):
+        return CHAT
+    return None
+
+
+def request_tokens(kind: str, body: bytes) -> int:
+    """요청 본문에서 이 요청이 쓸 토큰 수를 추정합니다 (채팅은 예상 출력 토큰 포함)."""
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return estimate_tokens(body.decode("utf-8", errors="replace"))
+    if kind == EMBED:
+        items = payload.get("input", [])
+        if isinstance(items, str) or (items and isinstance(items[0], int)):
+            items = [items]
+        # 토큰 ID 배열로 보낸 입력은 길이가 곧 토큰 수
+        return sum(len(i) if isinstance(i, list) else estimate_tokens(str(i)) for i in items)
+    text = []
+    for message in payload.get("messages", []):
+        content = message.get("content") or ""
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        text.append(content)
+    output = payload.get("max_completion_tokens") or payload.get("max_tokens") or config.LLM_EXPECTED_OUTPUT_TOKENS
+    return estimate_tokens("\n".join(text)) + output
+
+
+class _Flight:
+    """진행 중인 요청 하나의 응답 헤더와 본문 조각을 모아, 같은 요청을 기다리는 호출자에게 그대로 흘려줍니다."""
+
+    def __init__(self, on_done: Callable[[], None]):
+        self._cond = threading.Condition()
+        self._on_done = on_done
+        self.response: Optional[Tuple[int, List[Tuple[str, str]]]] = None  # (상태 코드, 헤더)
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+    def start(self, status: int, headers: List[Tuple[str, str]]) -> None:
+        with self._cond:
+            self.response = (status, headers)
+            self._cond.notify_all()
+
+    def append(self, chunk: bytes) -> None:
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def _close(self, error: Optional[BaseException]) -> None:
+        with self._cond:
+            if self.done or self.error is not None:
+                return
+            if error is None:
+                self.done = True
+            else:
+                self.error = error
+            self._cond.notify_all()
+        self._on_done()
+
+    def finish(self) -> None:
+        self._close(None)
+
+    def fail(self, error: BaseException) -> None:
+        self._close(error)
+
+    def wait_response(self) -> Tuple[int, List[Tuple[str, str]]]:
+        with self._cond:
+            self._cond.wait_for(lambda: self.response is not None or self.error is not None)
+            if self.response is None:
+                raise self.error
+            return self.response
+
+    def follow(self) -> Iterator[bytes]:
+        """처음부터 지금까지 받은 조각을 돌려주고, 이후 조각은 도착하는 대로 돌려줍니다."""
+        sent = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: len(self.chunks) > sent or self.done or self.error is not None)
+                batch = self.chunks[sent:]
+                sent = len(self.chunks)
+                if not batch and self.error is not None:
+                    raise httpx.ReadError(f"공유한 요청이 중단되었습니다: {self.error}")
+                if not batch:
+                    return
+            yield from batch
+
+
+class _TeeStream(httpx.SyncByteStream):
+    """원 응답 본문을 읽는 대로 호출자에게 넘기면서 같은 요청을 기다리는 호출자들과 공유합니다."""
+
+    def __init__(self, upstream: httpx.Response, flight: _Flight):
+        self._upstream = upstream
+        self._flight = flight
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            for chunk in self._upstream.stream:
+                self._flight.append(chunk)
+                yield chunk
+        except BaseException as exc:
+            self._flight.fail(exc)
+            raise
+        self._flight.finish()
+
+    def close(self) -> None:
+        self._upstream.close()
+        # 끝까지 읽기 전에 닫혔으면 기다리던 호출자는 오류를 받고 각자 재시도한다
+        self._flight.fail(httpx.ReadError("응답을 끝까지 읽기 전에 닫혔습니다."))
+
+
+class _FollowStream(httpx.SyncByteStream):
+    def __init__(self, flight: _Flight):
+        self._flight = flight
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self._flight.follow()
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """배포별 공유 제한기로 요청을 내보내고, 진행 중인 같은 요청(메서드, URL, 본문)은 한 번만 보냅니다.
+
+    합쳐진 요청은 스트리밍 응답도 원 요청과 같은 속도로 조각을 받습니다.
+    429 응답을 받으면 ``retry-after``만큼 같은 배포의 모든 요청을 멈춥니다.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, coalesce: bool = True):
+        self._transport = transport
+        self._coalesce = coalesce
+        self._inflight: Dict[Tuple[str, str, bytes], _Flight] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0  # 합쳐서 보내지 않은 요청 수
+
+    def _send(self, kind: str, request: httpx.Request, body: bytes) -> httpx.Response:
+        limiter = get_limiter(kind)
+        limiter.acquire(request_tokens(kind, body))
+        response = self._transport.handle_request(request)
+        if response.status_code == 429:
+            limiter.pause(retry_after(response.headers) or 1.0)
+        return response
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        kind = _request_kind(request)
+        if kind is None:
+            return self._transport.handle_request(request)
+        body = request.read()
+        if not self._coalesce:
+            return self._send(kind, request, body)
+
+        key = (request.method, str(request.url), hashlib.sha256(body).digest())
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight(lambda: self._release(key))
+            else:
+                self.coalesced += 1
+        if not leader:
+            status, headers = flight.wait_response()
+            return httpx.Response(status, headers=headers, stream=_FollowStream(flight), request=request)
+        try:
+            response = self._send(kind, request, body)
+        except BaseException as exc:
+            flight.fail(exc)
+            raise
+        flight.start(response.status_code, response.headers.multi_items())
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_TeeStream(response, flight),
+            request=request,
+            extensions=response.extensions,
+        )
+
+    def _release(self, key: Tuple[str, str, bytes]) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _AsyncFlight:
+    """``_Flight``의 비동기 버전입니다. 한 이벤트 루프 안에서만 쓰므로 루프의 Condition으로 기다립니다."""
+
+    def __init__(self, on_done: Callable[[], None]):
+        self._cond = asyncio.Condition()
+        self._on_done = on_done
+        self.response: Optional[Tuple[int, List[Tuple[str, str]]]] = None  # (상태 코드, 헤더)
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+    async def start(self, status: int, headers: List[Tuple[str, str]]) -> None:
+        async with self._cond:
+            self.response = (status, headers)
+            self._cond.notify_all()
+
+    async def append(self, chunk: bytes) -> None:
+        async with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    async def _close(self, error: Optional[BaseException]) -> None:
+        async with self._cond:
+            if self.done or self.error is not None:
+                return
+            if error is None:
+                self.done = True
+            else:
+                self.error = error
+            self._cond.notify_all()
+        self._on_done()
+
+    async def finish(self) -> None:
+        await self._close(None)
+
+    async def fail(self, error: BaseException) -> None:
+        await self._close(error)
+
+    async def wait_response(self) -> Tuple[int, List[Tuple[str, str]]]:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.response is not None or self.error is not None)
+            if self.response is None:
+                raise self.error
+            return self.response
+
+    async def follow(self) -> AsyncIterator[bytes]:
+        """처음부터 지금까지 받은 조각을 돌려주고, 이후 조각은 도착하는 대로 돌려줍니다."""
+        sent = 0
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: len(self.chunks) > sent or self.done or self.error is not None)
+                batch = self.chunks[sent:]
+                sent = len(self.chunks)
+                if not batch and self.error is not None:
+                    raise httpx.ReadError(f"공유한 요청이 중단되었습니다: {self.error}")
+                if not batch:
+                    return
+            for chunk in batch:
+                yield chunk
+
+
+class _AsyncTeeStream(httpx.AsyncByteStream):
+    def __init__(self, upstream: httpx.Response, flight: _AsyncFlight):
+        self._upstream = upstream
+        self._flight = flight
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._upstream.stream:
+                await self._flight.append(chunk)
+                yield chunk
+        except BaseException as exc:
+            await self._flight.fail(exc)
+            raise
+        await self._flight.finish()
+
+    async def aclose(self) -> None:
+        await self._upstream.aclose()
+        await self._flight.fail(httpx.ReadError("응답을 끝까지 읽기 전에 닫혔습니다."))
+
+
+class _AsyncFollowStream(httpx.AsyncByteStream):
+    def __init__(self, flight: _AsyncFlight):
+        self._flight = flight
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._flight.follow()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """``RateLimitedTransport``의 비동기 버전입니다. 한도를 기다리는 동안 이벤트 루프를 막지 않습니다.
+
+    같은 요청 합치기는 이벤트 루프 단위로 합니다 (루프가 다른 요청은 응답 스트림을 공유할 수 없다).
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, coalesce: bool = True):
+        self._transport = transport
+        self._coalesce = coalesce
+        self._inflight: Dict[Tuple[int, str, str, bytes], _AsyncFlight] = {}
+        self._lock = threading.Lock()  # 여러 스레드의 이벤트 루프가 같은 클라이언트를 쓸 수 있다
+        self.coalesced = 0  # 합쳐서 보내지 않은 요청 수
+
+    async def _send(self, kind: str, request: httpx.Request, body: bytes) -> httpx.Response:
+        limiter = get_limiter(kind)
+        await limiter.aacquire(request_tokens(kind, body))
+        response = await self._transport.handle_async_request(request)
+        if response.status_code == 429:
+            limiter.pause(retry_after(response.headers) or 1.0)
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        kind = _request_kind(request)
+        if kind is None:
+            return await self._transport.handle_async_request(request)
+        body = await request.aread()
+        if not self._coalesce:
+            return await self._send(kind, request, body)
+
+        key = (id(asyncio.get_running_loop()), request.method, str(request.url), hashlib.sha256(body).digest())
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _AsyncFlight(lambda: self._release(key))
+            else:
+                self.coalesced += 1
+        if not leader:
+            status, headers = await flight.wait_response()
+            return httpx.Response(status, headers=headers, stream=_AsyncFollowStream(flight), request=request)
+        try:
+            response = await self._send(kind, request, body)
+        except BaseException as exc:
+            await flight.fail(exc)
+            raise
+        await flight.start(response.status_code, response.headers.multi_items())
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_AsyncTeeStream(response, flight),
+            request=request,
+            extensions=response.extensions,
+        )
+
+    def _release(self, key: Tuple[int, str, str, bytes]) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=config.HTTP_MAX_CONNECTIONS, max_keepalive_connections=config.HTTP_MAX_KEEPALIVE)
+
+
+def get_http_client() -> httpx.Client:
+    """프로세스에서 하나만 만드는 keep-alive HTTP 클라이언트를 반환합니다.
+
+    모든 세션의 채팅/임베딩 요청이 같은 연결 풀을 재사용하므로 TLS 핸드셰이크가
+    세션 수만큼 반복되지 않고, 같은 분당 한도를 함께 나눠 씁니다.
+    """
+    global _client  # pylint: disable=global-statement
+    if _client is None:
+        with _lock:
+            if _client is None:
+                transport = RateLimitedTransport(httpx.HTTPTransport(limits=_limits()), coalesce=config.RATE_LIMIT_COALESCE)
+                _client = httpx.Client(transport=transport, timeout=config.HTTP_TIMEOUT)
+    return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """비동기 호출(ainvoke 등)용 공유 HTTP 클라이언트를 반환합니다."""
+    global _async_client  # pylint: disable=global-statement
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                transport = AsyncRateLimitedTransport(httpx.AsyncHTTPTransport(limits=_limits()), coalesce=config.RATE_LIMIT_COALESCE)
+                _async_client = httpx.AsyncClient(transport=transport, timeout=config.HTTP_TIMEOUT)
+    return _async_client
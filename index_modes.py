@@ -0,0 +1,116 @@
+# 코퍼스 크기에 맞춘 FAISS 인덱스 종류 선택 (flat / IVF-Flat / IVF-PQ / HNSW)
+import math
+import time
+from typing import Dict, Optional
+
+import faiss
+import numpy as np
+
+import config
+
+FLAT = "flat"
+IVF_FLAT = "ivf_flat"
+IVF_PQ = "ivf_pq"
+HNSW = "hnsw"
+INDEX_MODES = (FLAT, IVF_FLAT, IVF_PQ, HNSW)
+
+
+def effective_mode(mode: str, count: int, threshold: Optional[int] = None) -> str:
+    """코퍼스가 학습 임계치보다 작으면 정확한 flat 인덱스를 사용합니다."""
+    if mode not in INDEX_MODES:
+        raise ValueError(f"지원하지 않는 인덱스 모드입니다: {mode}")
+    threshold = config.VECTORSTORE_TRAIN_THRESHOLD if threshold is None else threshold
+    if mode in (IVF_FLAT, IVF_PQ) and count < threshold:
+        return FLAT
+    return mode
+
+
+def _nlist(count: int) -> int:
+    # 리스트당 최소 39개의 학습 벡터가 있도록 제한
+    return max(1, min(int(4 * math.sqrt(count)), count // 39))
+
+
+def _pq_subquantizers(dim: int) -> int:
+    # 서브벡터 하나가 약 32차원이 되도록 하되 차원을 나누어떨어지게 한다
+    m = max(1, dim // 32)
+    while dim % m:
+        m -= 1
+    return m
+
+
+def build_index(vectors: np.ndarray, mode: str, fp16: bool = False) -> faiss.Index:
+    """벡터로 모드에 맞는 인덱스를 만들고 (필요하면 학습한 뒤) 모두 추가합니다.
+
+    ``fp16``이면 벡터를 float16 스칼라 양자화로 저장해 메모리를 절반으로 줄입니다
+    (IVF-PQ는 이미 압축되므로 무시됩니다).
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dim = vectors.shape
+    mode = effective_mode(mode, count)
+    if mode == FLAT:
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16) if fp16 else faiss.IndexFlatL2(dim)
+    elif mode == HNSW:
+        m = config.VECTORSTORE_HNSW_M
+        index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_fp16, m) if fp16 else faiss.IndexHNSWFlat(dim, m)
+    else:
+        quantizer = faiss.IndexFlatL2(dim)
+        nlist = _nlist(count)
+        if mode == IVF_PQ:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, _pq_subquantizers(dim), 8)
+        elif fp16:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dim, nlist, faiss.ScalarQuantizer.QT_fp16)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        index.own_fields = True
+        quantizer.this.disown()
+    if not index.is_trained:
+        sample = vectors
+        limit = 256 * max(1, getattr(index, "nlist", 1))
+        if count > limit:
+            sample = vectors[np.random.default_rng(0).choice(count, limit, replace=False)]
+        index.train(sample)
+    index.add(vectors)
+    configure_search(index)
+    return index
+
+
+def configure_search(index: faiss.Index) -> None:
+    """검색 시점 파라미터(nprobe, efSearch)를 설정에 맞춥니다."""
+    try:
+        faiss.extract_index_ivf(index).nprobe = config.VECTORSTORE_NPROBE
+    except RuntimeError:
+        pass
+    hnsw = getattr(index, "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = config.VECTORSTORE_HNSW_EF_SEARCH
+
+
+def recall_report(index: faiss.Index, vectors: np.ndarray, k: int = 10, sample: int = 100) -> Dict[str, float]:
+    """코퍼스 벡터 일부를 쿼리로 써서 정확한 검색 대비 recall@k와 지연시간을 측정합니다.
+
+    ``vectors``는 ``index``에 추가된 원본 벡터(같은 순서)여야 합니다.
+    """
+    vectors = np.asarray(vectors)
+    count = len(vectors)
+    if count == 0:
+        return {"queries": 0, "k": k, "recall": 1.0, "exact_ms": 0.0, "approx_ms": 0.0}
+    k = min(k, count)
+    rows = np.random.default_rng(0).choice(count, min(sample, count), replace=False)
+    queries = np.ascontiguousarray(vectors[rows], dtype=np.float32)
+
+    start = time.perf_counter()
+    _, exact = faiss.knn(queries, np.ascontiguousarray(vectors, dtype=np.float32), k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    _, approx = index.search(queries, k)
+    approx_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approx.tolist(), exact.tolist()))
+    return {
+        "queries": len(queries),
+        "k": k,
+        "recall": hits / (len(queries) * k),
+        "exact_ms": exact_ms,
+        "approx_ms": approx_ms,
+    }
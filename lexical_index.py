@@ -0,0 +1,159 @@
+# 식별자 토큰 기반 BM25 역색인 (벡터 검색과 함께 쓰는 어휘 검색)
+import json
+import math
+import re
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from atomic_file import atomic_write
+
+# 저장 형식이 바뀌면 올린다 (버전이 다른 파일은 읽지 않고 원문에서 다시 색인)
+LEXICAL_VERSION = 1
+
+_IDENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# camelCase / PascalCase / 숫자 경계에서 식별자를 나눈다 (HTTPServer -> HTTP, Server)
+_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+def split_identifier(name: str) -> List[str]:
+    """snake_case와 camelCase 식별자를 소문자 부분 단어로 나눕니다."""
+    parts = []
+    for piece in name.split("_"):
+        parts.extend(p.lower() for p in _PART_RE.findall(piece))
+    return [p for p in parts if len(p) > 1]
+
+
+def identifier_terms(text: str) -> List[str]:
+    """텍스트의 식별자마다 전체 이름과 분해된 부분 단어를 색인어로 반환합니다."""
+    terms = []
+    for name in _IDENT_RE.findall(text):
+        full = name.lower()
+        terms.append(full)
+        parts = split_identifier(name)
+        if len(parts) > 1 or (parts and parts[0] != full):
+            terms.extend(parts)
+    return terms
+
+
+def term_counts(text: str) -> Dict[str, int]:
+    """텍스트의 색인어별 빈도를 반환합니다."""
+    return dict(Counter(identifier_terms(text)))
+
+
+def is_code_identifier(token: str) -> bool:
+    """밑줄, 숫자, 중간 대문자가 있어 코드 식별자로 보이는 토큰인지 확인합니다."""
+    return bool(_IDENT_RE.fullmatch(token)) and (
+        "_" in token or any(c.isdigit() for c in token) or any(c.isupper() for c in token[1:])
+    )
+
+
+class BM25Index:
+    """문서 ID 단위로 추가/삭제할 수 있는 메모리 BM25 역색인."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}  # 색인어 -> {문서 ID: 빈도}
+        self._lengths: Dict[str, int] = {}  # 문서 ID -> 색인어 수
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, term: str) -> bool:
+        return term.lower() in self._postings
+
+    def add(self, doc_id: str, text: str, counts: Optional[Dict[str, int]] = None) -> None:
+        """문서를 색인합니다. 같은 ID가 있으면 교체합니다. ``counts``(색인어 빈도)를 주면 원문을 다시 나누지 않습니다."""
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+        if counts is None:
+            counts = term_counts(text)
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[doc_id] = tf
+        length = sum(counts.values())
+        self._lengths[doc_id] = length
+        self._total_length += length
+
+    def add_many(self, docs: Iterable[Tuple[str, str]]) -> None:
+        """(문서 ID, 텍스트) 쌍을 한꺼번에 색인합니다."""
+        for doc_id, text in docs:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id: str, text: Optional[str] = None) -> None:
+        """문서를 색인에서 제거합니다. 원문을 주면 해당 색인어만 찾아 지웁니다."""
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        terms = set(identifier_terms(text)) if text is not None else list(self._postings)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None and postings.pop(doc_id, None) is not None and not postings:
+                del self._postings[term]
+
+    def save(self, path: str, tag: str = "") -> None:
+        """역색인과 문서 길이 통계를 JSON 파일 하나에 원자적으로 저장합니다.
+
+        ``tag``는 함께 저장한 스냅샷을 식별하는 값으로, 읽을 때 다르면 파일을 쓰지 않습니다.
+        """
+        ids = list(self._lengths)
+        index = {doc_id: i for i, doc_id in enumerate(ids)}
+        postings = {}
+        for term, docs in self._postings.items():
+            # 문서 ID 대신 번호를 써서 [번호, 빈도, 번호, 빈도, ...]로 평탄하게 저장
+            flat = []
+            for doc_id, tf in docs.items():
+                flat.extend((index[doc_id], tf))
+            postings[term] = flat
+        data = {"version": LEXICAL_VERSION, "tag": tag, "k1": self.k1, "b": self.b,
+                "ids": ids, "lengths": [self._lengths[d] for d in ids], "postings": postings}
+        atomic_write(path, json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+
+    @classmethod
+    def load(cls, path: str, tag: str = "") -> Optional["BM25Index"]:
+        """``save``로 저장한 색인을 읽습니다. 파일이 없거나 버전/``tag``가 다르면 None."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != LEXICAL_VERSION or data.get("tag") != tag:
+            return None
+        index = cls(data["k1"], data["b"])
+        ids = data["ids"]
+        index._lengths = dict(zip(ids, data["lengths"]))
+        index._total_length = sum(data["lengths"])
+        index._postings = {
+            term: {ids[flat[i]]: flat[i + 1] for i in range(0, len(flat), 2)}
+            for term, flat in data["postings"].items()
+        }
+        return index
+
+    def search(self, query: str, k: int = 10, allow: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, float]]:
+        """쿼리 색인어로 BM25 점수 상위 ``k``개의 (문서 ID, 점수)를 반환합니다."""
+        count = len(self._lengths)
+        if not count:
+            return []
+        avg_length = self._total_length / count or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(identifier_terms(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                if allow is not None and not allow(doc_id):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """여러 순위 목록을 역순위 합(RRF)으로 합쳐 (ID, 점수) 내림차순으로 반환합니다."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
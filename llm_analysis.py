@@ -0,0 +1,255 @@
+# LLM 기반 코드 분석: 파일 단위 Chain-of-Thought 프롬프트와 함수 단위 map-reduce 분석
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+import config
+from analysis import AntiPattern, StaticAnalysisResult
+from analysis_cache import AnalysisCache, content_hash
+
+# 함수 단위 프롬프트나 결과 형식이 바뀌면 올려서 기존 캐시를 무효화한다.
+UNIT_PROMPT_VERSION = 1
+# 채팅 화면으로 스트리밍하지 않을 내부 LLM 호출에 붙이는 태그
+INTERNAL_TAG = "internal"
+
+SYSTEM_PROMPT = (
+    "당신은 C 소스코드 유지보수성 분석 전문가입니다. 모든 답변은 한국어로 작성하되 코드와 식별자는 원문을 유지하세요."
+)
+
+COT_TEMPLATE = """아래 C 코드를 단계별로 추론하며 분석하세요.
+
+1. 정적 분석: 주어진 지표(라인 수, 함수 수, 순환 복잡도)로 코드 복잡성을 추론합니다.
+2. 안티패턴: 검출된 안티패턴의 영향과 리팩토링 난이도를 추론합니다.
+3. 유사 사례: 참고 코드가 있으면 적용할 수 있는 리팩토링 패턴을 설명합니다.
+4. 의사코드: 위 추론을 종합해 유지보수성을 높인 구조의 의사코드를 작성합니다.
+
+## 정적 분석 결과
+{analysis}
+
+## 유사 사례 (벡터스토어 검색)
+{similar}
+
+## 분석 대상 코드
+```c
+{code}
+```"""
+
+
+def format_similar(results: Sequence[Tuple[Document, float]], max_chars: int = 1500) -> str:
+    """검색된 유사 청크를 프롬프트에 넣을 텍스트로 만듭니다."""
+    if not results:
+        return "(참고할 유사 사례 없음)"
+    parts = []
+    for doc, score in results:
+        meta = doc.metadata
+        parts.append(
+            f"- {meta.get('file', '')}:{meta.get('function', '')} (유사도 {score:.3f})\n```c\n{doc.page_content[:max_chars]}\n```"
+        )
+    return "\n".join(parts)
+
+
+def build_cot_messages(code: str, analysis: str, similar: Sequence[Tuple[Document, float]]) -> List[BaseMessage]:
+    """CoT 분석 단계의 LLM 입력 메시지를 만듭니다. 코드는 청크 최대 길이로 자릅니다."""
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(
+            content=COT_TEMPLATE.format(
+                analysis=analysis,
+                similar=format_similar(similar),
+                code=code[:config.CHUNK_MAX_CHARS],
+            )
+        ),
+    ]
+
+
+# --- 함수 단위 map-reduce 분석 ---
+
+UNIT_TEMPLATE = """아래 C 함수 하나를 분석하고 다른 설명 없이 JSON 객체 하나로만 답하세요.
+키:
+- "summary": 함수의 역할 요약
+- "complexity_reasoning": 복잡도 지표에 근거한 추론
+- "anti_patterns": [{{"type": 안티패턴 종류, "details": 근거}}] (없으면 빈 배열)
+- "refactoring": 구체적인 리팩토링 제안
+- "pseudocode": 유지보수성을 높인 구조의 의사코드 (문자열)
+
+함수: {name} (라인 {start}-{end}, 순환 복잡도 {complexity})
+```c
+{code}
+```"""
+
+
+@dataclass
+class AnalysisUnit:
+    name: str  # 함수 이름
+    start_line: int  # 시작 라인
+    end_line: int  # 끝 라인
+    cyclomatic_complexity: int  # 함수 순환 복잡도
+    text: str  # 함수 원문
+    hash: str  # 원문 내용 해시 (결과 캐시 키)
+
+
+def split_units(code: str, static: StaticAnalysisResult) -> List[AnalysisUnit]:
+    """정적 분석이 찾은 함수 범위로 코드를 함수 단위 분석 단위로 나눕니다."""
+    lines = code.splitlines(keepends=True)
+    units = []
+    for fn in static.functions:
+        text = "".join(lines[fn.start_line - 1:fn.end_line])
+        units.append(AnalysisUnit(fn.name, fn.start_line, fn.end_line, fn.cyclomatic_complexity, text, content_hash(text)))
+    return units
+
+
+def parse_json_object(text: str) -> dict:
+    """LLM 응답에서 JSON 객체를 꺼냅니다. 실패하면 원문을 요약으로 담은 dict를 반환합니다."""
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            data = json.loads(text[start:end + 1])
+            if isinstance(data, dict):
+                return data
+        except ValueError:
+            pass
+    return {"summary": text.strip()}
+
+
+class UnitResultCache:
+    """함수 단위 LLM 분석 결과 캐시 (``AnalysisCache``와 같은 메모리 LRU + 디스크 JSON).
+
+    키는 함수 원문 해시, 프롬프트 버전, 모델 배포 이름으로 정해지므로
+    바뀐 함수만 다시 LLM에 보내게 됩니다.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self._store = AnalysisCache(
+            config.LLM_CACHE_PATH if path is None else path,
+            config.LLM_CACHE_SIZE if max_entries is None else max_entries,
+            encode=dict,
+            decode=dict,
+        )
+
+    @staticmethod
+    def key(unit: AnalysisUnit) -> str:
+        return content_hash(f"{UNIT_PROMPT_VERSION}\0{config.AOAI_DEPLOY_GPT4O}\0{unit.hash}")
+
+    def get(self, unit: AnalysisUnit) -> Optional[dict]:
+        return self._store.get(self.key(unit))
+
+    def put(self, unit: AnalysisUnit, result: dict) -> None:
+        self._store.put(self.key(unit), result)
+
+
+def _unit_messages(unit: AnalysisUnit) -> List[BaseMessage]:
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(
+            content=UNIT_TEMPLATE.format(
+                name=unit.name,
+                start=unit.start_line,
+                end=unit.end_line,
+                complexity=unit.cyclomatic_complexity,
+                code=unit.text[:config.CHUNK_MAX_CHARS],
+            )
+        ),
+    ]
+
+
+def _with_location(unit: AnalysisUnit, result: dict) -> dict:
+    # 캐시된 결과는 함수 위치가 바뀌었을 수 있으므로 현재 위치를 덧붙인다
+    return dict(
+        result,
+        function=unit.name,
+        start_line=unit.start_line,
+        end_line=unit.end_line,
+        cyclomatic_complexity=unit.cyclomatic_complexity,
+    )
+
+
+def analyze_units(llm, units: Sequence[AnalysisUnit], cache: Optional[UnitResultCache] = None, max_concurrency: Optional[int] = None) -> List[dict]:
+    """함수 단위로 LLM 분석을 동시에 수행합니다 (동시 호출 수는 ``max_concurrency``로 제한).
+
+    캐시에 있는 함수는 호출하지 않으며, 결과는 ``units`` 순서대로 반환합니다.
+    """
+    results: List[Optional[dict]] = [cache.get(u) if cache is not None else None for u in units]
+    todo = [i for i, r in enumerate(results) if r is None]
+    if todo:
+        workers = max(1, min(max_concurrency or config.LLM_MAX_CONCURRENCY, len(todo)))
+
+        def run(i: int) -> dict:
+            response = llm.invoke(_unit_messages(units[i]), config={"tags": [INTERNAL_TAG]})
+            return parse_json_object(response.content)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for i, result in zip(todo, pool.map(run, todo)):
+                results[i] = result
+                if cache is not None:
+                    cache.put(units[i], result)
+    return [_with_location(u, r) for u, r in zip(units, results)]
+
+
+async def aanalyze_units(llm, units: Sequence[AnalysisUnit], cache: Optional[UnitResultCache] = None, max_concurrency: Optional[int] = None) -> List[dict]:
+    """``analyze_units``의 비동기 버전입니다. 세마포어로 동시 호출 수를 제한합니다."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or config.LLM_MAX_CONCURRENCY))
+
+    async def run(unit: AnalysisUnit) -> dict:
+        result = cache.get(unit) if cache is not None else None
+        if result is None:
+            async with semaphore:
+                response = await llm.ainvoke(_unit_messages(unit), config={"tags": [INTERNAL_TAG]})
+            result = parse_json_object(response.content)
+            if cache is not None:
+                cache.put(unit, result)
+        return _with_location(unit, result)
+
+    return list(await asyncio.gather(*(run(u) for u in units)))
+
+
+def reduce_report(
+    static: StaticAnalysisResult,
+    anti: Sequence[AntiPattern],
+    unit_results: Sequence[dict],
+    similar: Sequence[Tuple[Document, float]] = (),
+) -> Dict:
+    """함수별 분석 결과를 README의 분석 리포트 JSON 형식으로 합칩니다."""
+    # 복잡한 함수의 추론과 제안을 앞에 둔다
+    ranked = sorted(unit_results, key=lambda r: r.get("cyclomatic_complexity", 0), reverse=True)
+    reasoning = [static.complexity_reasoning]
+    reasoning += [f"{r['function']}: {r['complexity_reasoning']}" for r in ranked[:3] if r.get("complexity_reasoning")]
+
+    anti_patterns = [{"type": a.type, "details": a.details} for a in anti]
+    seen = {(a["type"], a["details"]) for a in anti_patterns}
+    for r in unit_results:
+        for item in r.get("anti_patterns") or []:
+            if not isinstance(item, dict) or not item.get("type"):
+                continue
+            entry = {"type": str(item["type"]), "details": f"{r['function']}: {item.get('details', '')}"}
+            if (entry["type"], entry["details"]) not in seen:
+                seen.add((entry["type"], entry["details"]))
+                anti_patterns.append(entry)
+
+    case_reference = {"similarity_score": 0.0, "reference_summary": "", "adaptation_suggestion": ""}
+    if similar:
+        doc, score = similar[0]
+        case_reference["similarity_score"] = score
+        case_reference["reference_summary"] = f"{doc.metadata.get('file', '')}:{doc.metadata.get('function', '')}"
+    case_reference["adaptation_suggestion"] = "\n".join(
+        f"{r['function']}: {r['refactoring']}" for r in ranked[:3] if r.get("refactoring")
+    )
+
+    return {
+        "static_analysis": {
+            "total_lines": static.total_lines,
+            "function_count": static.function_count,
+            "variable_count": static.variable_count,
+            "cyclomatic_complexity": static.cyclomatic_complexity,
+            "complexity_reasoning": "\n".join(reasoning),
+        },
+        "anti_patterns": anti_patterns,
+        "case_reference": case_reference,
+        "pseudocode": "\n\n".join(
+            f"// {r['function']}\n{r['pseudocode']}" for r in unit_results if r.get("pseudocode")
+        ),
+    }
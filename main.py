@@ -1,58 +1,256 @@
 # Streamlit 기반 C 코드 분석기 메인 엔트리포인트
+import functools
+import os
+import uuid
+from typing import Optional
+
 import streamlit as st
-from langchain_core.messages import HumanMessage, AIMessage
-from agents import build_graph
+from langchain_core.messages import HumanMessage
+import config
+import upload_jobs
+from agents import REPORT_COMMAND, get_blob_store, load_thread, save_uploaded_files, stream_reply
+from history import code_ref, code_ref_message, is_summary
+from report import REPORT_KEY, read_artifact
 
 st.set_page_config(page_title="C Code Analyzer", page_icon="💻")
 st.title("💻 C Code Analyzer")
 
-if "graph" not in st.session_state:
-    st.session_state.graph = build_graph()
-    st.session_state.messages = []
-    st.session_state.uploaded_name = None
-    st.session_state.uploaded_code = None
-    st.session_state.uploaded_files = []  # 파일 목록: [{name, code, analysis, report_pdf}]
+# 그래프/클라이언트/벡터스토어는 프로세스 전체가 공유하고, 세션에는 대화 상태만 둔다
+# 소스코드 원문은 blob 저장소에 두고 세션 상태와 메시지에는 내용 해시만 남긴다
+# 대화 상태는 URL의 thread 값을 키로 체크포인터에 저장되므로 새로고침이나 재시작 뒤에도 이어진다
+if "messages" not in st.session_state:
+    thread_id = st.session_state.get("thread_id") or st.query_params.get("thread") or uuid.uuid4().hex
+    st.query_params["thread"] = thread_id
+    saved = load_thread(thread_id)
+    st.session_state.thread_id = thread_id
+    st.session_state.messages = list(saved.get("messages", []))
+    st.session_state.uploaded_files = [dict(f) for f in saved.get("uploaded_files", [])]  # 파일 목록: [{name, hash, analysis}]
+    last_file = st.session_state.uploaded_files[-1] if st.session_state.uploaded_files else {}
+    st.session_state.uploaded_name = last_file.get("name")
+    st.session_state.uploaded_hash = last_file.get("hash")
+    st.session_state.viewing = None  # 사이드바에서 선택한 파일 인덱스
+    st.session_state.jobs = []  # 백그라운드 분석/인덱싱 작업 목록
+    st.session_state.seen_uploads = set()  # 이미 처리한 업로드 file_id
+
+# 작업 단계 표시 이름
+JOB_LABELS = {
+    upload_jobs.QUEUED: "대기",
+    upload_jobs.ANALYZING: "분석 중",
+    upload_jobs.INDEXING: "인덱싱 중",
+    upload_jobs.DONE: "완료",
+    upload_jobs.FAILED: "실패",
+}
+
+
+def sync_jobs() -> int:
+    """끝난 작업의 분석 결과를 파일 목록에 반영하고 남은 작업 수를 반환합니다."""
+    by_hash = {f["hash"]: f for f in st.session_state.uploaded_files}
+    updated = []
+    for job in st.session_state.jobs:
+        entry = by_hash.get(job.hash)
+        if job.finished and job.analysis and entry is not None and "analysis" not in entry:
+            entry["analysis"] = job.analysis
+            updated.append(entry)
+    save_uploaded_files(st.session_state.thread_id, updated)
+    return upload_jobs.pending(st.session_state.jobs)
+
+
+# 전체 실행마다 한 번만 작업 결과를 반영하고, 남은 작업이 있을 때만 진행 영역을 주기적으로 갱신한다
+pending_jobs = sync_jobs()
+poll_interval = 1.0 if pending_jobs else None
+
+
+@st.fragment(run_every=poll_interval)
+def upload_progress():
+    """업로드 파일별 분석/인덱싱 진행 상황 (작업이 남아 있는 동안 1초마다 이 영역만 다시 그림)."""
+    jobs = st.session_state.jobs
+    remaining = sync_jobs()
+    for job in jobs:
+        label = f"{job.name} · {JOB_LABELS[job.status]}"
+        if job.status == upload_jobs.FAILED:
+            st.caption(f"❌ {label}: {job.detail}")
+        elif job.finished:
+            st.caption(f"✅ {label} ({job.detail})")
+        else:
+            st.progress(job.progress, text=label)
+    if jobs and not remaining and st.session_state.get("jobs_running"):
+        # 모두 끝나면 전체를 한 번 다시 그려 파일 목록을 갱신하고 주기적 갱신을 멈춘다
+        st.session_state.jobs_running = False
+        st.rerun()
+
+
+def show_code(digest: str, key: str):
+    """blob 저장소의 코드를 페이지 단위로 보여줍니다."""
+    code = get_blob_store().get(digest)
+    if code is None:
+        st.caption("코드를 찾을 수 없습니다.")
+        return
+    lines = code.splitlines()
+    pages = max(1, -(-len(lines) // config.CODE_PAGE_LINES))
+    page = st.number_input("페이지", 1, pages, 1, key=f"{key}_page") if pages > 1 else 1
+    start = (page - 1) * config.CODE_PAGE_LINES
+    st.caption(f"라인 {start + 1}-{min(start + config.CODE_PAGE_LINES, len(lines))} / {len(lines)}")
+    st.code("\n".join(lines[start:start + config.CODE_PAGE_LINES]), language="c")
+
+
+def show_report(report: dict, key: str):
+    """리포트 파일 다운로드 버튼을 표시합니다. 파일은 버튼을 누를 때만 읽습니다."""
+    for label, path, mime in (
+        ("마크다운 리포트 다운로드", report.get("markdown_path"), "text/markdown"),
+        ("PDF 리포트 다운로드", report.get("pdf_path"), "application/pdf"),
+    ):
+        if path and os.path.exists(path):
+            st.download_button(
+                label,
+                data=functools.partial(read_artifact, path),
+                file_name=os.path.basename(path),
+                mime=mime,
+                key=f"{key}_{mime}",
+                on_click="ignore",
+            )
+
+
+def show_message(m, key: str):
+    """메시지를 표시합니다. 코드와 긴 본문은 펼칠 때만 렌더링합니다."""
+    ref = code_ref(m)
+    report = m.additional_kwargs.get(REPORT_KEY)
+    content = str(m.content)
+    if report is not None:
+        st.write(content)
+        show_report(report, key)
+    elif ref is not None:
+        st.write(content)
+        if st.toggle("코드 보기", key=f"{key}_code"):
+            show_code(ref["hash"], key)
+    elif is_summary(m):
+        with st.expander("이전 대화 요약"):
+            st.write(content)
+    elif len(content) > config.MESSAGE_PREVIEW_CHARS:
+        if st.toggle("전체 보기", key=f"{key}_full"):
+            st.write(content)
+        else:
+            st.write(content[:config.MESSAGE_PREVIEW_CHARS] + " …")
+    else:
+        st.write(content)
+
 
 # --- 왼쪽 사이드바: 업로드 파일 목록 ---
+if st.sidebar.button("새 대화"):
+    # 이전 대화는 체크포인터에 남고 URL의 thread 값으로 다시 열 수 있다
+    st.session_state.clear()
+    st.session_state.thread_id = uuid.uuid4().hex
+    st.rerun()
 st.sidebar.header("업로드된 파일 목록")
 if st.session_state.uploaded_files:
     for idx, f in enumerate(st.session_state.uploaded_files):
         if st.sidebar.button(f["name"], key=f"file_{idx}"):
-            # 파일 클릭 시 해당 코드/분석 결과를 대화창에 표시
-            st.session_state.messages.append(HumanMessage(content=f"[파일: {f['name']} 내용]\n" + f["code"]))
-            if "analysis" in f:
-                st.session_state.messages.append(AIMessage(content=f"[분석 결과: {f['name']}]\n" + f["analysis"]))
+            # 파일 클릭 시 대화 기록에 덧붙이지 않고 별도 영역에 코드/분석 결과를 표시
+            st.session_state.viewing = idx
             st.rerun()
 else:
     st.sidebar.write("아직 업로드된 파일이 없습니다.")
+if st.session_state.jobs:
+    with st.sidebar:
+        st.subheader("분석/인덱싱 진행 상황")
+        upload_progress()
+if st.session_state.get("last_latency"):
+    ttft, total = st.session_state.last_latency
+    st.sidebar.caption(f"마지막 응답: 첫 토큰 {ttft:.0f}ms / 전체 {total:.0f}ms")
+
+# --- 선택한 파일 보기 ---
+viewing = st.session_state.get("viewing")
+if viewing is not None and viewing < len(st.session_state.uploaded_files):
+    f = st.session_state.uploaded_files[viewing]
+    with st.container(border=True):
+        st.subheader(f"📄 {f['name']}")
+        if "analysis" in f:
+            with st.expander("분석 결과", expanded=True):
+                st.write(f["analysis"])
+        show_code(f["hash"], f"view_{f['hash']}")
+        if st.button("닫기", key="close_view"):
+            st.session_state.viewing = None
+            st.rerun()
+
+
+def upload_command(text: str) -> Optional[dict]:
+    """'분석', '분석 <파일명>', '업로드' 명령이면 분석할 업로드 파일 항목을, 아니면 None을 반환합니다.
+
+    파일명을 생략하면 마지막으로 업로드한 파일을 고릅니다. '분석 결과 추출' 같은 다른 명령이나
+    업로드 목록에 없는 이름은 그대로 그래프로 넘깁니다 (코드 원문 대신 blob 해시를 참조).
+    """
+    command = text.strip()
+    if command.startswith(REPORT_COMMAND):
+        return None
+    last = {"name": st.session_state.uploaded_name, "hash": st.session_state.uploaded_hash} if st.session_state.uploaded_hash else None
+    if command in ("분석", "업로드"):
+        return last
+    head, _, target = command.partition(" ")
+    target = target.strip()
+    if head != "분석" or not target:
+        return None
+    return next(
+        (f for f in st.session_state.uploaded_files if f["name"] == target or f["name"].endswith("/" + target)),
+        None,
+    )
+
 
 # --- 대화 메시지 영역 ---
-for m in st.session_state.messages:
+for idx, m in enumerate(st.session_state.messages):
     role = "user" if isinstance(m, HumanMessage) else "assistant"
     with st.chat_message(role):
-        st.write(m.content)
+        show_message(m, f"msg_{m.id or idx}")
 
 # --- 채팅 입력창 ---
 if prompt := st.chat_input("메시지를 입력하세요"):
     sanitized = prompt.encode("utf-8", "replace").decode("utf-8", "replace")
-    # '분석' 또는 '업로드' 키워드로 업로드된 파일 분석
-    if (sanitized.strip().startswith("분석") or sanitized.strip().startswith("업로드")) and st.session_state.uploaded_code:
-        st.session_state.messages.append(HumanMessage(content=st.session_state.uploaded_code))
-    else:
-        st.session_state.messages.append(HumanMessage(content=sanitized))
-    result = st.session_state.graph.invoke({"messages": st.session_state.messages})
-    st.session_state.messages = result["messages"]
+    entry = upload_command(sanitized)
+    message = HumanMessage(content=sanitized) if entry is None else code_ref_message(entry["hash"], entry["name"])
+    with st.chat_message("user"):
+        st.write(message.content)
+    # 새 메시지만 넘기고 이전 대화는 체크포인터에서 이어 읽는다. 토큰이 도착하는 대로 출력하고,
+    # 완료되면 (오래된 턴을 요약해 저장한) 최종 상태를 세션에 반영한다
+    stats = {}
+    with st.chat_message("assistant"):
+        st.write_stream(stream_reply([message], stats, thread_id=st.session_state.thread_id))
+    st.session_state.messages = list(stats["state"]["messages"])
+    st.session_state.uploaded_files = [dict(f) for f in stats["state"].get("uploaded_files", [])]
+    if "ttft_ms" in stats:
+        st.session_state.last_latency = (stats["ttft_ms"], stats["total_ms"])
     st.rerun()
 
 # --- 파일 업로드 UI를 화면 하단에 고정 ---
 with st.container():
     st.markdown("---")
-    uploaded_file = st.file_uploader("C 소스코드 업로드 (분석하려면 '분석' 또는 '업로드' 입력)", type=["c", "h"])
-    if uploaded_file is not None:
-        code = uploaded_file.read().decode("utf-8", errors="replace")
-        st.session_state.uploaded_name = uploaded_file.name
-        st.session_state.uploaded_code = code
-        # 파일 목록에 추가 (중복 방지)
-        if not any(f["name"] == uploaded_file.name for f in st.session_state.uploaded_files):
-            st.session_state.uploaded_files.append({"name": uploaded_file.name, "code": code})
-        st.success(f"{uploaded_file.name} 업로드 완료! '분석' 또는 '업로드' 입력 시 분석됩니다.")
+    uploaded = st.file_uploader(
+        "C 소스코드 또는 zip 업로드 (여러 개 가능, 업로드 즉시 분석/인덱싱)",
+        type=["c", "h", "zip"],
+        accept_multiple_files=True,
+    )
+    changed = []
+    for uploaded_file in uploaded or []:
+        if uploaded_file.file_id in st.session_state.seen_uploads:
+            continue
+        st.session_state.seen_uploads.add(uploaded_file.file_id)
+        for name, code in upload_jobs.iter_upload_sources(uploaded_file.name, uploaded_file.getvalue()):
+            digest = get_blob_store().put(code)
+            st.session_state.uploaded_name = name
+            st.session_state.uploaded_hash = digest
+            # 파일 목록에 추가 (같은 이름으로 다시 올리면 내용만 교체, 분석 결과와는 내용 해시로 연결)
+            entry = next((f for f in st.session_state.uploaded_files if f["name"] == name), None)
+            if entry is not None and entry["hash"] == digest:
+                continue
+            if entry is None:
+                entry = {"name": name, "hash": digest}
+                st.session_state.uploaded_files.append(entry)
+            else:
+                entry["hash"] = digest
+                entry.pop("analysis", None)
+            changed.append(entry)
+            # 정적 분석과 바뀐 청크의 인덱싱은 백그라운드에서 수행해 채팅이 막히지 않게 한다
+            st.session_state.jobs.append(upload_jobs.submit(name, digest, code))
+    if changed:
+        save_uploaded_files(st.session_state.thread_id, changed)
+        st.session_state.jobs_running = True
+        st.rerun()
+    if st.session_state.uploaded_name:
+        st.success(f"마지막 업로드: {st.session_state.uploaded_name}. '분석 [파일명]' 입력 시 LLM 분석을, '통계 [N]' 입력 시 프로젝트 지표 요약을 보여줍니다.")
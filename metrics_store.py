@@ -0,0 +1,350 @@
+# 분석 결과를 열(column) 단위 배열로 보관하는 지표 저장소와 프로젝트 단위 집계 질의
+import os
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+import config
+import segment_log
+from analysis import AntiPattern, StaticAnalysisResult
+from atomic_file import atomic_write
+
+# 저장 형식이 바뀌면 올린다 (버전이 다른 파일은 읽지 않는다)
+METRICS_VERSION = 1
+
+# 열 이름과 array 타입 코드
+FILE_COLUMNS = {"total_lines": "l", "function_count": "l", "variable_count": "l", "complexity": "l", "updated": "d", "current": "b"}
+FUNCTION_COLUMNS = {"file": "l", "name": "l", "start_line": "l", "end_line": "l", "complexity": "l"}
+FINDING_COLUMNS = {"file": "l", "type": "l", "function": "l", "line": "l"}
+SORT_KEYS = ("complexity", "lines")
+
+
+class _Table:
+    """열마다 ``array.array`` 하나를 두는 추가 전용 테이블. 질의 때는 복사 없이 numpy 뷰로 읽습니다."""
+
+    def __init__(self, columns: Dict[str, str]):
+        self.columns = {name: array(code) for name, code in columns.items()}
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())))
+
+    def append(self, **values) -> None:
+        for name, column in self.columns.items():
+            column.append(values[name])
+
+    def view(self, name: str) -> np.ndarray:
+        column = self.columns[name]
+        return np.frombuffer(column, dtype=column.typecode) if len(column) else np.zeros(0, dtype=column.typecode)
+
+    def keep(self, mask: np.ndarray) -> None:
+        """``mask``가 참인 행만 남깁니다."""
+        for name, column in self.columns.items():
+            self.columns[name] = array(column.typecode, self.view(name)[mask].tobytes())
+
+    def arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {f"{prefix}.{name}": self.view(name) for name in self.columns}
+
+    def restore(self, prefix: str, data) -> None:
+        for name, column in self.columns.items():
+            self.columns[name] = array(column.typecode, data[f"{prefix}.{name}"].astype(column.typecode).tobytes())
+
+
+class MetricsStore:
+    """파일/함수/안티패턴 지표를 열 단위 배열에 저장하고 집계, 상위 N, 필터 질의를 제공합니다.
+
+    같은 파일을 다시 기록하면 이전 행은 ``current``가 꺼진 채 남아 복잡도 추이 질의에 쓰이고,
+    이전 버전의 함수/안티패턴 행은 스냅샷을 다시 쓸 때 정리합니다. 문자열은 한 번만 저장하고 번호로 참조합니다.
+    ``save``는 새 기록만 ``<경로>.log`` 세그먼트 로그에 추가하고, 로그가 스냅샷에 비해 커지면
+    ``compact``로 .npz 스냅샷에 합칩니다.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = config.METRICS_STORE_PATH if path is None else path
+        self._lock = threading.Lock()
+        self._reset()
+        if self.path and (os.path.exists(self.path) or os.path.exists(self._log_path())):
+            self.load()
+
+    def _log_path(self, path: Optional[str] = None) -> str:
+        return (path or self.path) + ".log"
+
+    def _reset(self) -> None:
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._names = array("l")  # 파일 행별 파일명 번호
+        self._hashes: List[str] = []  # 파일 행별 내용 해시
+        self._current: Dict[str, int] = {}  # 파일명 -> 현재 파일 행
+        self.files = _Table(FILE_COLUMNS)
+        self.functions = _Table(FUNCTION_COLUMNS)
+        self.findings = _Table(FINDING_COLUMNS)
+        self._pending: List[segment_log.Record] = []  # 로그에 아직 기록하지 않은 새 기록
+        self._log_bytes = 0
+
+    def _intern(self, text: str) -> int:
+        idx = self._string_ids.get(text)
+        if idx is None:
+            idx = self._string_ids[text] = len(self._strings)
+            self._strings.append(text)
+        return idx
+
+    def record(self, name: str, digest: str, analysis: StaticAnalysisResult, anti: Sequence[AntiPattern]) -> bool:
+        """파일 하나의 분석 결과를 기록합니다. 같은 내용이 이미 현재 버전이면 아무것도 하지 않고 False를 반환합니다."""
+        entry = {
+            "v": METRICS_VERSION,
+            "name": name,
+            "hash": digest,
+            "updated": time.time(),
+            "file": [analysis.total_lines, analysis.function_count, analysis.variable_count, analysis.cyclomatic_complexity],
+            "functions": [[f.name, f.start_line, f.end_line, f.cyclomatic_complexity] for f in analysis.functions],
+            "findings": [[a.type, a.function, a.line] for a in anti],
+        }
+        with self._lock:
+            if not self._apply(entry):
+                return False
+            self._pending.append((entry, None))
+            return True
+
+    def _apply(self, entry: dict) -> bool:
+        """기록 하나를 열에 추가합니다 (``record``와 로그 재생에서 같이 씀)."""
+        name = entry["name"]
+        old = self._current.get(name)
+        if old is not None:
+            if self._hashes[old] == entry["hash"]:
+                return False
+            self.files.columns["current"][old] = 0
+        row = len(self.files)
+        total_lines, function_count, variable_count, complexity = entry["file"]
+        self.files.append(
+            total_lines=total_lines,
+            function_count=function_count,
+            variable_count=variable_count,
+            complexity=complexity,
+            updated=entry["updated"],
+            current=1,
+        )
+        self._names.append(self._intern(name))
+        self._hashes.append(entry["hash"])
+        self._current[name] = row
+        for function, start_line, end_line, function_complexity in entry["functions"]:
+            self.functions.append(
+                file=row, name=self._intern(function), start_line=start_line, end_line=end_line, complexity=function_complexity
+            )
+        for kind, function, line in entry["findings"]:
+            self.findings.append(file=row, type=self._intern(kind), function=self._intern(function), line=line)
+        return True
+
+    def _file_mask(self, files: Optional[Iterable[str]]) -> np.ndarray:
+        """현재 버전(이면서 ``files``에 속한) 파일 행 마스크."""
+        current = self.files.view("current").astype(bool)
+        if files is not None:
+            selected = np.zeros(len(self.files), dtype=bool)
+            selected[np.array([self._current[n] for n in files if n in self._current], dtype=int)] = True
+            current &= selected
+        return current
+
+    def _rows(self, table: _Table, files: Optional[Iterable[str]]) -> np.ndarray:
+        """현재 버전(이면서 ``files``에 속한) 파일에 딸린 행 마스크."""
+        owner = table.view("file")
+        return self._file_mask(files)[owner] if len(owner) else np.zeros(0, dtype=bool)
+
+    def _file_name(self, row: int) -> str:
+        return self._strings[self._names[row]]
+
+    def top_functions(self, n: int = 20, key: str = "complexity", files: Optional[Iterable[str]] = None) -> List[Dict]:
+        """복잡도(또는 라인 수) 기준 상위 ``n``개 함수를 반환합니다."""
+        files = None if files is None else list(files)
+        if key not in SORT_KEYS:
+            raise ValueError(f"정렬 기준은 {SORT_KEYS} 중 하나여야 합니다: {key}")
+        with self._lock:
+            rows = np.flatnonzero(self._rows(self.functions, files))
+            if not len(rows) or n <= 0:
+                return []
+            start = self.functions.view("start_line")[rows]
+            end = self.functions.view("end_line")[rows]
+            complexity = self.functions.view("complexity")[rows]
+            score = complexity if key == "complexity" else end - start + 1
+            # 전체 정렬 대신 상위 n개만 골라 정렬한다
+            if len(rows) > n:
+                part = np.argpartition(-score, n - 1)[:n]
+            else:
+                part = np.arange(len(rows))
+            order = part[np.lexsort((rows[part], -score[part]))]
+            owner = self.functions.view("file")
+            names = self.functions.view("name")
+            return [
+                {
+                    "file": self._file_name(owner[rows[i]]),
+                    "function": self._strings[names[rows[i]]],
+                    "start_line": int(start[i]),
+                    "end_line": int(end[i]),
+                    "complexity": int(complexity[i]),
+                    "lines": int(end[i] - start[i] + 1),
+                }
+                for i in order
+            ]
+
+    def aggregate(self, files: Optional[Iterable[str]] = None) -> Dict:
+        """현재 버전 파일들의 합계/평균/최댓값과 안티패턴 종류별 개수를 반환합니다."""
+        files = None if files is None else list(files)
+        with self._lock:
+            current = self._file_mask(files)
+            fn_rows = self._rows(self.functions, files)
+            fn_complexity = self.functions.view("complexity")[fn_rows]
+            types = self.findings.view("type")[self._rows(self.findings, files)]
+            return {
+                "files": int(current.sum()),
+                "total_lines": int(self.files.view("total_lines")[current].sum()),
+                "functions": int(self.files.view("function_count")[current].sum()),
+                "variables": int(self.files.view("variable_count")[current].sum()),
+                "avg_function_complexity": float(fn_complexity.mean()) if len(fn_complexity) else 0.0,
+                "max_function_complexity": int(fn_complexity.max()) if len(fn_complexity) else 0,
+                "anti_patterns": {self._strings[t]: int(c) for t, c in Counter(types.tolist()).most_common()},
+            }
+
+    def find(self, type: Optional[str] = None, file: Optional[str] = None) -> List[Dict]:  # pylint: disable=redefined-builtin
+        """현재 버전의 안티패턴을 종류나 파일명으로 걸러 반환합니다."""
+        with self._lock:
+            mask = self._rows(self.findings, None if file is None else [file])
+            if type is not None:
+                type_id = self._string_ids.get(type)
+                mask &= self.findings.view("type") == (-1 if type_id is None else type_id)
+            owner, kinds = self.findings.view("file"), self.findings.view("type")
+            functions, lines = self.findings.view("function"), self.findings.view("line")
+            return [
+                {
+                    "file": self._file_name(owner[i]),
+                    "type": self._strings[kinds[i]],
+                    "function": self._strings[functions[i]],
+                    "line": int(lines[i]),
+                }
+                for i in np.flatnonzero(mask)
+            ]
+
+    def files_over(self, complexity: int) -> List[Dict]:
+        """파일 전체 순환 복잡도가 ``complexity`` 이상인 현재 파일을 복잡도 내림차순으로 반환합니다."""
+        with self._lock:
+            values = self.files.view("complexity")
+            rows = np.flatnonzero(self.files.view("current").astype(bool) & (values >= complexity))
+            rows = rows[np.argsort(-values[rows], kind="stable")]
+            return [{"file": self._file_name(r), "complexity": int(values[r])} for r in rows]
+
+    def trend(self, name: str) -> List[Dict]:
+        """파일의 버전별 (기록 시각, 순환 복잡도, 라인 수) 추이를 오래된 순으로 반환합니다."""
+        with self._lock:
+            name_id = self._string_ids.get(name)
+            if name_id is None:
+                return []
+            rows = np.flatnonzero(np.frombuffer(self._names, dtype="l") == name_id)
+            updated = self.files.view("updated")
+            complexity, lines = self.files.view("complexity"), self.files.view("total_lines")
+            return [
+                {"updated": float(updated[r]), "hash": self._hashes[r], "complexity": int(complexity[r]), "total_lines": int(lines[r])}
+                for r in rows
+            ]
+
+    def _compact(self) -> None:
+        """이전 버전 파일의 함수/안티패턴 행을 버립니다 (파일 행은 추이 질의를 위해 남긴다)."""
+        current = self.files.view("current").astype(bool)
+        for table in (self.functions, self.findings):
+            keep = current[table.view("file")] if len(table) else np.zeros(0, dtype=bool)
+            if not keep.all():
+                table.keep(keep)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """새 기록만 세그먼트 로그 끝에 추가합니다 (기록 수에 비례하는 비용).
+
+        로그가 스냅샷에 비해 커지면 ``compact``로 합칩니다. 다른 경로를 주면 그 경로에 스냅샷 전체를 씁니다.
+        """
+        if path and path != self.path:
+            with self._lock:
+                self._write_snapshot(path)
+            return
+        if not self.path:
+            return
+        with self._lock:
+            if self._pending:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._log_bytes += segment_log.append_records(self._log_path(), self._pending)
+                self._pending = []
+            snapshot_bytes = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            threshold = max(config.METRICS_COMPACT_BYTES, snapshot_bytes * config.METRICS_COMPACT_RATIO)
+            if self._log_bytes > threshold:
+                self._compact_locked()
+
+    def compact(self) -> None:
+        """모든 열을 .npz 스냅샷에 원자적으로 다시 쓰고 세그먼트 로그를 비웁니다."""
+        if not self.path:
+            return
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self) -> None:
+        self._write_snapshot(self.path)
+        # 스냅샷에 모두 들어갔으므로 아직 로그에 쓰지 않은 기록도 버린다
+        self._pending = []
+        if os.path.exists(self._log_path()):
+            segment_log.truncate(self._log_path())
+        self._log_bytes = 0
+
+    def _write_snapshot(self, path: str) -> None:
+        self._compact()
+        data = {"version": np.array(METRICS_VERSION), "strings": np.array(self._strings, dtype=str)}
+        data["file.name"] = np.frombuffer(self._names, dtype="l")
+        data["file.hash"] = np.array(self._hashes, dtype=str)
+        data.update(self.files.arrays("file"))
+        data.update(self.functions.arrays("function"))
+        data.update(self.findings.arrays("finding"))
+        atomic_write(path, lambda f: np.savez(f, **data), "wb")
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """저장된 스냅샷을 읽고 세그먼트 로그의 기록을 재생합니다. 스냅샷 버전이 다르면 비운 채로 두고 False를 반환합니다."""
+        path = path or self.path
+        with self._lock:
+            self._reset()
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    if int(data["version"]) != METRICS_VERSION:
+                        return False
+                    self._strings = data["strings"].tolist()
+                    self._string_ids = {s: i for i, s in enumerate(self._strings)}
+                    self._names = array("l", data["file.name"].astype("l").tobytes())
+                    self._hashes = data["file.hash"].tolist()
+                    self.files.restore("file", data)
+                    self.functions.restore("function", data)
+                    self.findings.restore("finding", data)
+                # 로그 재생이 열에 추가하므로 열을 가리키는 numpy 뷰를 남겨 두지 않는다
+                self._current = {self._file_name(r): int(r) for r in np.flatnonzero(self.files.view("current"))}
+            records, valid = segment_log.read_records(self._log_path(path))
+            for entry, _ in records:
+                if entry.get("v") == METRICS_VERSION:
+                    self._apply(entry)
+            if path == self.path:
+                if os.path.exists(self._log_path()):
+                    # 기록 중 중단되어 잘린 레코드가 있으면 잘라내 이후 추가가 이어지도록 한다
+                    segment_log.truncate(self._log_path(), valid)
+                self._log_bytes = valid
+            return True
+
+
+def format_summary(store: MetricsStore, n: int = 10, files: Optional[Iterable[str]] = None) -> str:
+    """집계와 상위 함수 목록을 마크다운으로 만듭니다 (LLM 없이 답하는 통계 응답과 리포트 요약에 사용)."""
+    files = None if files is None else list(files)
+    stats = store.aggregate(files)
+    lines = [
+        "## 프로젝트 요약",
+        f"- 파일 수: {stats['files']}",
+        f"- 총 라인 수: {stats['total_lines']}",
+        f"- 함수 수: {stats['functions']} (평균 복잡도 {stats['avg_function_complexity']:.1f}, 최대 {stats['max_function_complexity']})",
+        f"- 변수 수: {stats['variables']}",
+    ]
+    if stats["anti_patterns"]:
+        lines.append("- 안티패턴: " + ", ".join(f"{k} {v}건" for k, v in stats["anti_patterns"].items()))
+    top = store.top_functions(n, files=files)
+    if top:
+        lines += ["", f"### 복잡도 상위 {len(top)}개 함수", "| 파일 | 함수 | 라인 | 복잡도 |", "|---|---|---|---|"]
+        lines += [f"| {t['file']} | {t['function']} | {t['start_line']}-{t['end_line']} | {t['complexity']} |" for t in top]
+    return "\n".join(lines) + "\n\n"
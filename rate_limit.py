@@ -0,0 +1,215 @@
+# Azure OpenAI 호출용 요청/토큰 분당 한도 제한기(우선순위 포함)와 재시도 도우미
+import asyncio
+import contextlib
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, TypeVar
+
+import config
+
+T = TypeVar("T")
+
+# 요청 우선순위: 사용자가 기다리는 요청(interactive)이 백그라운드 작업(batch)보다 먼저 한도를 받는다
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# 한도 종류 (배포별로 프로세스에서 하나씩 공유)
+CHAT = "chat"
+EMBED = "embed"
+
+_priority: ContextVar[str] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+@contextlib.contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """이 블록 안에서 보내는 Azure 요청의 우선순위를 정합니다 (스레드/태스크별로 유지)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 텍스트의 토큰 수를 대략 추정합니다 (4글자당 1토큰)."""
+    return len(text) // 4 + 1
+
+
+class RateLimiter:
+    """분당 요청 수(RPM)와 분당 토큰 수(TPM)를 함께 지키는 토큰 버킷.
+
+    두 버킷 모두 1분 동안 한도만큼 채워지며, 0 이하의 한도는 제한 없음으로 취급합니다.
+    batch 요청은 버킷의 ``reserve`` 비율을 남겨 두고, interactive 요청이 기다리는 동안에는
+    들어가지 않으므로 백그라운드 작업이 한도를 다 써도 사용자 요청은 곧바로 나갈 수 있습니다.
+    429 응답을 받으면 ``pause``로 모든 호출자를 함께 멈춰 제각각 재시도하지 않게 합니다.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0, reserve: float = 0.0):
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self.reserve = reserve
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._interactive_waiting = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm > 0:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm > 0:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+    def _wait_time(self, tokens: int, priority: str = INTERACTIVE, now: float = 0.0) -> float:
+        """지금 요청을 보낼 수 있으면 0, 아니면 기다려야 할 초를 반환합니다."""
+        wait = max(0.0, self._paused_until - now)
+        reserve = self.reserve if priority == BATCH else 0.0
+        if priority == BATCH and self._interactive_waiting:
+            wait = max(wait, 0.05)
+        if self.rpm > 0:
+            need = 1 + reserve * self.rpm
+            if self._requests < need:
+                wait = max(wait, (need - self._requests) * 60.0 / self.rpm)
+        if self.tpm > 0:
+            # 한도보다 큰 요청은 (남겨 둘 몫을 뺀) 버킷이 가득 찼을 때 통과시킨다
+            need = min(tokens, self.tpm * (1 - reserve)) + reserve * self.tpm
+            if self._tokens < need:
+                wait = max(wait, (need - self._tokens) * 60.0 / self.tpm)
+        return wait
+
+    def _try_acquire(self, tokens: int, priority: str) -> float:
+        """예산을 확보하면 0을, 아니면 기다릴 시간을 반환합니다."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = self._wait_time(tokens, priority, now)
+            if wait <= 0:
+                if self.rpm > 0:
+                    self._requests -= 1
+                if self.tpm > 0:
+                    self._tokens -= tokens
+            return wait
+
+    @contextlib.contextmanager
+    def _waiting(self, priority: str) -> Iterator[None]:
+        if priority != INTERACTIVE:
+            yield
+            return
+        with self._lock:
+            self._interactive_waiting += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._interactive_waiting -= 1
+
+    def acquire(self, tokens: int = 0, priority: Optional[str] = None) -> None:
+        """요청 1건과 ``tokens``개의 토큰 예산을 확보할 때까지 기다립니다 (우선순위 기본값은 현재 문맥)."""
+        priority = priority or current_priority()
+        wait = self._try_acquire(tokens, priority)
+        if wait <= 0:
+            return
+        with self._waiting(priority):
+            while wait > 0:
+                # batch는 interactive 요청이 새로 오면 양보하도록 짧게 나눠 기다린다
+                time.sleep(min(wait, 0.25) if priority == BATCH else wait)
+                wait = self._try_acquire(tokens, priority)
+
+    async def aacquire(self, tokens: int = 0, priority: Optional[str] = None) -> None:
+        """``acquire``의 비동기 버전입니다. 기다리는 동안 이벤트 루프를 막지 않습니다."""
+        priority = priority or current_priority()
+        wait = self._try_acquire(tokens, priority)
+        if wait <= 0:
+            return
+        with self._waiting(priority):
+            while wait > 0:
+                await asyncio.sleep(min(wait, 0.25) if priority == BATCH else wait)
+                wait = self._try_acquire(tokens, priority)
+
+    def pause(self, seconds: float) -> None:
+        """429 응답을 받았을 때 ``seconds`` 동안 모든 호출자의 새 요청을 멈춥니다."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(kind: str) -> RateLimiter:
+    """배포 종류(CHAT, EMBED)별로 프로세스에서 하나만 만드는 제한기를 반환합니다."""
+    with _limiters_lock:
+        limiter = _limiters.get(kind)
+        if limiter is None:
+            rpm, tpm = (config.LLM_RPM, config.LLM_TPM) if kind == CHAT else (config.EMBED_RPM, config.EMBED_TPM)
+            limiter = _limiters[kind] = RateLimiter(rpm, tpm, reserve=config.RATE_LIMIT_INTERACTIVE_RESERVE)
+        return limiter
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Azure/OpenAI의 429 (요청 한도 초과) 오류인지 확인합니다."""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    return type(exc).__name__ == "RateLimitError"
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """다시 보내면 성공할 수 있는 오류(429, 5xx, 연결 끊김/시간 초과)인지 확인합니다."""
+    if is_rate_limit_error(exc):
+        return True
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in (408, 409) or status >= 500
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def retry_after(headers) -> Optional[float]:
+    """응답 헤더(``retry-after-ms``/``retry-after``)가 알려주는 대기 시간(초)을 반환합니다. 없으면 None."""
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name) if headers else None
+        if value is None:
+            continue
+        try:
+            return float(value) * scale
+        except ValueError:
+            continue
+    return None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    return retry_after(getattr(response, "headers", None))
+
+
+def call_with_backoff(
+    func: Callable[[], T],
+    max_retries: int = 6,
+    base_delay: float = 1.0,
+    max_delay: float = 60.0,
+) -> T:
+    """429 등 일시적 오류가 나면 지수 백오프(지터 포함)로 ``func``를 다시 호출합니다.
+
+    서버가 ``retry-after`` 헤더를 주면 그 값을 우선합니다. 감싼 클라이언트는 ``max_retries=0``으로
+    만들어 SDK 재시도와 겹치지 않게 합니다 (겹치면 시도 횟수가 곱으로 늘어난다).
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as exc:  # pylint: disable=broad-except
+            if not is_transient_error(exc) or attempt >= max_retries:
+                raise
+            delay = _retry_after(exc)
+            if delay is None:
+                delay = min(max_delay, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+            attempt += 1
+            time.sleep(delay)
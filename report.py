@@ -0,0 +1,200 @@
+# 분석 리포트 생성: 파일별 섹션 캐시와 마크다운/PDF 파일 산출물
+import functools
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import config
+from analysis_cache import content_hash
+from atomic_file import atomic_write
+
+# 섹션 형식이 바뀌면 올려서 캐시된 섹션과 리포트를 무효화한다.
+REPORT_VERSION = 1
+REPORT_KEY = "report"  # 리포트 안내 메시지의 additional_kwargs 키 (산출물 경로)
+PDF_FONT = "HYSMyeongJo-Medium"  # reportlab 내장 한국어 CID 폰트
+
+
+@dataclass
+class ReportArtifact:
+    markdown_path: str  # 마크다운 리포트 파일 경로
+    pdf_path: Optional[str]  # PDF 리포트 파일 경로 (reportlab이 없으면 None)
+    sections: int  # 포함된 파일 섹션 수
+    rendered: int  # 이번에 새로 렌더링한 섹션 수
+
+    def as_dict(self) -> Dict:
+        return asdict(self)
+
+
+def render_section(entry: Dict) -> str:
+    """업로드 파일 하나의 리포트 섹션(마크다운)을 만듭니다."""
+    return (
+        f"## 파일명: {entry['name']}\n"
+        "### 분석 결과\n"
+        f"{entry.get('analysis', '분석 결과 없음')}\n\n"
+    )
+
+
+class ReportBuilder:
+    """파일별 섹션을 캐시하며 리포트를 파일로 만드는 빌더.
+
+    섹션은 (파일명, 내용 해시, 분석 결과)로 캐시되므로 바뀐 파일만 다시 렌더링하고,
+    같은 섹션 조합의 리포트는 이미 만든 파일을 그대로 돌려줍니다.
+    경로 전체 크기가 ``max_bytes``를 넘으면 최근에 쓰지 않은(수정 시각이 오래된) 파일부터 지웁니다.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = config.REPORT_PATH if path is None else path
+        self.max_bytes = config.REPORT_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+
+    def _section_file(self, key: str) -> str:
+        return os.path.join(self.path, "sections", key[:2], key + ".md")
+
+    @staticmethod
+    def section_key(entry: Dict) -> str:
+        return content_hash(f"{REPORT_VERSION}\0{entry['name']}\0{entry.get('hash', '')}\0{entry.get('analysis', '')}")
+
+    def _ensure_section(self, key: str, render) -> Tuple[str, bool]:
+        """섹션 캐시 파일 경로와 새로 렌더링했는지 여부를 반환합니다."""
+        target = self._section_file(key)
+        if _touch(target):
+            return target, False
+        atomic_write(target, render())
+        return target, True
+
+    def build(self, files: Sequence[Dict], pdf: bool = True, summary: Optional[str] = None) -> ReportArtifact:
+        """파일 목록으로 마크다운(과 PDF) 리포트 파일을 만들고 경로를 반환합니다.
+
+        ``summary``(프로젝트 요약 마크다운)가 있으면 파일 섹션 앞에 넣습니다.
+        """
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            sections: List[str] = []
+            rendered = 0
+            if summary:
+                section, _ = self._ensure_section(content_hash(f"{REPORT_VERSION}\0summary\0{summary}"), lambda: summary)
+                sections.append(section)
+            for entry in files:
+                section, fresh = self._ensure_section(self.section_key(entry), functools.partial(render_section, entry))
+                sections.append(section)
+                rendered += fresh
+            name = "report-" + content_hash("\0".join(sections))[:16]
+            markdown_path = os.path.join(self.path, name + ".md")
+            if not _touch(markdown_path):
+                # 캐시된 섹션 파일을 차례로 이어 붙여 메모리에 리포트 전체를 올리지 않는다
+                atomic_write(markdown_path, self._markdown_chunks(sections))
+            pdf_path = None
+            if pdf:
+                pdf_path = os.path.join(self.path, name + ".pdf")
+                if not _touch(pdf_path):
+                    pdf_path = self._write_pdf(markdown_path, pdf_path)
+            self._prune({markdown_path, pdf_path, *sections})
+            return ReportArtifact(markdown_path, pdf_path, len(files), rendered)
+
+    def _prune(self, keep: Set[Optional[str]]) -> int:
+        """경로 전체 크기가 ``max_bytes``를 넘으면 ``keep``을 뺀 파일을 오래된 것부터 지우고 지운 수를 반환합니다."""
+        if self.max_bytes <= 0:
+            return 0
+        entries = []
+        total = 0
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue  # 다른 스레드/프로세스가 쓰는 중인 파일
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                total += st.st_size
+                entries.append((st.st_mtime, st.st_size, path))
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    @staticmethod
+    def _markdown_chunks(sections: Sequence[str]) -> Iterator[str]:
+        yield "# C 코드 분석 리포트\n\n"
+        for section in sections:
+            with open(section, "r", encoding="utf-8") as f:
+                yield from iter(lambda: f.read(64 * 1024), "")
+
+    @staticmethod
+    def _write_pdf(markdown_path: str, pdf_path: str) -> Optional[str]:
+        """마크다운 리포트를 한 줄씩 읽어 PDF로 씁니다. reportlab이 없으면 None을 반환합니다."""
+        try:
+            from reportlab.lib.pagesizes import A4  # pylint: disable=import-outside-toplevel
+            from reportlab.pdfbase import pdfmetrics  # pylint: disable=import-outside-toplevel
+            from reportlab.pdfbase.cidfonts import UnicodeCIDFont  # pylint: disable=import-outside-toplevel
+            from reportlab.pdfgen import canvas  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            return None
+        if PDF_FONT not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(UnicodeCIDFont(PDF_FONT))
+
+        width, height = A4
+        margin = 50
+        widths: Dict[str, float] = {}
+
+        def wrap(text: str, size: float) -> Iterator[str]:
+            # 글자 폭을 누적해 페이지 폭에 맞춰 줄을 나눈다
+            limit = width - 2 * margin
+            line, used = [], 0.0
+            for ch in text:
+                w = widths.get(ch)
+                if w is None:
+                    w = widths[ch] = pdfmetrics.stringWidth(ch, PDF_FONT, 1)
+                if used + w * size > limit and line:
+                    yield "".join(line)
+                    line, used = [], 0.0
+                line.append(ch)
+                used += w * size
+            yield "".join(line)
+
+        def draw(out) -> None:
+            pdf = canvas.Canvas(out, pagesize=A4)
+            y = height - margin
+            with open(markdown_path, "r", encoding="utf-8") as f:
+                for raw in f:
+                    text = raw.rstrip("\n").expandtabs(4)
+                    level = len(text) - len(text.lstrip("#"))
+                    size = {1: 16, 2: 13, 3: 11}.get(level, 9) if level else 9
+                    if level:
+                        text = text[level:].strip()
+                    for line in wrap(text, size):
+                        if y < margin + size:
+                            pdf.showPage()
+                            y = height - margin
+                        pdf.setFont(PDF_FONT, size)
+                        pdf.drawString(margin, y, line)
+                        y -= size * 1.4
+            pdf.save()
+
+        atomic_write(pdf_path, draw, "wb")
+        return pdf_path
+
+
+def _touch(path: str) -> bool:
+    """파일이 있으면 수정 시각을 지금으로 바꿔(최근 사용 표시) True를, 없으면 False를 반환합니다."""
+    try:
+        os.utime(path)
+    except OSError:
+        return False
+    return True
+
+
+def read_artifact(path: str) -> bytes:
+    """다운로드 버튼이 눌렸을 때 산출물 파일을 읽습니다."""
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,167 @@
+# supervisor 일반 대화 응답 캐시: 정확 일치(정규화한 질문 + 코드 문맥)와 의미 유사도 두 단계
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import config
+from analysis_cache import content_hash
+from rate_limit import BATCH, request_priority
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+    from vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    prompt: str  # 정규화한 질문
+    context: str  # 코드 문맥 해시
+    content: str  # LLM 응답
+    created: float  # 저장 시각
+    doc_id: Optional[str] = None  # 유사도 단계 벡터스토어 문서 ID
+
+
+def normalize_prompt(text: str) -> str:
+    """대소문자, 전각/반각, 공백, 끝의 문장부호 차이를 없앤 질문을 반환합니다."""
+    text = " ".join(unicodedata.normalize("NFKC", text).lower().split())
+    return text.rstrip(" ?!.~")
+
+
+def strip_bypass(text: str) -> Tuple[str, bool]:
+    """질문이 캐시 우회 키워드로 시작하면 키워드를 뗀 질문과 True를 반환합니다."""
+    keyword = config.RESPONSE_CACHE_BYPASS
+    stripped = text.strip()
+    if keyword and stripped.startswith(keyword):
+        return stripped[len(keyword):].strip(), True
+    return text, False
+
+
+class ResponseCache:
+    """LLM 일반 대화 응답을 프로세스 전체에서 공유하는 캐시.
+
+    1단계는 (정규화한 질문, 코드 문맥 해시) 키의 정확 일치이고, 2단계는 같은 코드 문맥에서
+    질문 임베딩이 충분히 가까운(코사인 유사도 ``similarity`` 이상) 이전 질문의 응답을 씁니다.
+    항목은 ``ttl``초가 지나면 만료되고 ``max_entries``를 넘으면 오래 쓰지 않은 것부터 버립니다.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        similarity: Optional[float] = None,
+        embedding_model: Optional["Embeddings"] = None,
+    ):
+        self.max_entries = config.RESPONSE_CACHE_SIZE if max_entries is None else max_entries
+        self.ttl = config.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.similarity = config.RESPONSE_CACHE_SIMILARITY if similarity is None else similarity
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._contexts: Dict[str, int] = {}  # 코드 문맥별 항목 수 (유사도 검색이 필요한지 판단)
+        self._lock = threading.Lock()
+        self._embedding_model = embedding_model  # 없으면 프로세스 공용 캐시 임베딩 모델
+        self._vectors: Optional["VectorStore"] = None
+        # 유사도 단계의 질문 임베딩은 응답을 돌려준 뒤 백그라운드에서 색인한다
+        self._indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="response-cache")
+        self.stats = {"exact": 0, "similar": 0, "miss": 0}
+
+    def _key(self, prompt: str, context: str) -> str:
+        return content_hash(f"{config.AOAI_DEPLOY_GPT4O}\0{context}\0{prompt}")
+
+    def _vector_store(self) -> "VectorStore":
+        with self._lock:
+            if self._vectors is None:
+                from embeddings import get_cached_embedding_model  # pylint: disable=import-outside-toplevel
+                from vector_store import VectorStore  # pylint: disable=import-outside-toplevel
+
+                # 경로 없이 메모리에만 두고, 임베딩 캐시는 프로세스 공용 인스턴스를 함께 쓴다
+                # (같은 캐시 파일을 두 인스턴스가 따로 고쳐 쓰면 슬롯이 엇갈린다)
+                self._vectors = VectorStore(embedding_model=self._embedding_model or get_cached_embedding_model())
+            return self._vectors
+
+    def _evict(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._contexts[entry.context] -= 1
+        if not self._contexts[entry.context]:
+            del self._contexts[entry.context]
+        if entry.doc_id is not None and self._vectors is not None:
+            self._vectors.delete([entry.doc_id])
+
+    def _live(self, key: str) -> Optional[CachedResponse]:
+        """만료되지 않은 항목을 최근 사용으로 표시하고 반환합니다."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.created > self.ttl:
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, prompt: str, context: str = "") -> Optional[str]:
+        """캐시된 응답을 반환합니다. 없으면 None."""
+        prompt = normalize_prompt(prompt)
+        with self._lock:
+            entry = self._live(self._key(prompt, context))
+            if entry is not None:
+                self.stats["exact"] += 1
+                return entry.content
+            searchable = self.similarity > 0 and context in self._contexts
+        if searchable:
+            from vector_store import cosine_similarity  # pylint: disable=import-outside-toplevel
+
+            try:
+                found = self._vector_store().vector_search_with_distance(prompt, k=1, filter={"file": context})
+            except Exception:  # pylint: disable=broad-except
+                logger.warning("응답 캐시 유사도 검색 실패", exc_info=True)
+                found = []
+            for doc, distance in found:
+                if cosine_similarity(distance) < self.similarity:
+                    continue
+                with self._lock:
+                    entry = self._live(doc.metadata["function"])
+                    if entry is not None:
+                        self.stats["similar"] += 1
+                        return entry.content
+        with self._lock:
+            self.stats["miss"] += 1
+        return None
+
+    def put(self, prompt: str, context: str, content: str) -> None:
+        """응답을 저장합니다. 유사도 단계 색인은 백그라운드에서 수행합니다."""
+        prompt = normalize_prompt(prompt)
+        key = self._key(prompt, context)
+        with self._lock:
+            self._evict(key)
+            entry = self._entries[key] = CachedResponse(prompt, context, content, time.time())
+            self._contexts[context] = self._contexts.get(context, 0) + 1
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+        if self.similarity > 0:
+            self._indexer.submit(self._index, key, entry)
+
+    def _index(self, key: str, entry: CachedResponse) -> None:
+        from langchain_core.documents import Document  # pylint: disable=import-outside-toplevel
+        from vector_store import document_id  # pylint: disable=import-outside-toplevel
+
+        try:
+            # 문서의 file/function 자리에 코드 문맥과 캐시 키를 넣어 같은 문맥으로 걸러 찾는다
+            with request_priority(BATCH):
+                self._vector_store().upsert([Document(page_content=entry.prompt, metadata={"file": entry.context, "function": key})])
+        except Exception:  # pylint: disable=broad-except
+            logger.warning("응답 캐시 색인 실패", exc_info=True)
+            return
+        doc_id = document_id(entry.context, key, content_hash(entry.prompt))
+        with self._lock:
+            if self._entries.get(key) is entry:
+                entry.doc_id = doc_id
+                return
+        # 색인하는 사이에 항목이 버려졌으면 문서도 지운다
+        self._vectors.delete([doc_id])
@@ -13,17 +13,19 @@ that the flow can be analysed later.
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import TypedDict, Literal, List
+import sqlite3
+import threading
+from typing import Literal, List, Optional, Tuple
 
 from langchain_core.messages import AIMessage, HumanMessage, BaseMessage
-from langgraph.graph import StateGraph, START, END, MessagesState
+from langgraph.graph import StateGraph, END, MessagesState
 from langgraph.types import Command
 
 import os
 from langchain_openai import AzureChatOpenAI
 import time
-import json
 
 AOAI_ENDPOINT=os.getenv("AOAI_ENDPOINT")
 AOAI_API_KEY=os.getenv("AOAI_API_KEY")
@@ -93,27 +95,21 @@ def company_info_node(state: State) -> Command[Literal["supervisor"]]:
 # 각 서브 에이전트를 호출하고 최종 보고서를 만드는 감독 에이전트
 def supervisor_node(state: State) -> Command[Literal["trump_vance_news", "company_info", "__end__"]]:
     last: BaseMessage = state["messages"][-1]
-    memory = load_memory()
-    thread_id = getattr(state, "thread_id", "default")
-    user_question = ""
-    for m in reversed(state["messages"]):
-        if isinstance(m, HumanMessage):
-            user_question = m.content.strip()
-            break
+    thread_id = state.get("thread_id", "default")
+    questions = [m.content.strip() for m in state["messages"] if isinstance(m, HumanMessage)]
+    user_question = questions[-1] if questions else ""
     now = time.time()
-    # Check memory for similar question
-    for q, v in memory.get(thread_id, {}).items():
-        if q == user_question:
-            ago = int((now - v["ts"]) // 3600)
-            answer = v["answer"]
-            msg = f"You asked this {ago} hour(s) ago. My answer was:\n{answer}\nIf you want a new search, say 'search again'."
-            return Command(update={"messages": [AIMessage(content=msg)]}, goto=END)
-    if user_question.lower().strip() == "search again":
-        # Remove last question from memory to force new search
-        for q in list(memory.get(thread_id, {})):
-            if q == user_question:
-                del memory[thread_id][q]
-        save_memory(memory)
+    # Check memory for the same question (indexed lookup, independent of history size)
+    remembered = memory.get(thread_id, user_question)
+    if remembered is not None:
+        answer, ts = remembered
+        ago = int((now - ts) // 3600)
+        msg = f"You asked this {ago} hour(s) ago. My answer was:\n{answer}\nIf you want a new search, say 'search again'."
+        return Command(update={"messages": [AIMessage(content=msg)]}, goto=END)
+    if user_question.lower() == "search again":
+        # Forget the previous question so asking it again triggers a new search
+        if len(questions) > 1:
+            memory.forget(thread_id, questions[-2])
         return Command(update={"messages": [AIMessage(content="Okay, I'll search again. Please ask your question.")]}, goto=END)
     if isinstance(last, HumanMessage) and last.content.strip().upper() == "FINISH":
         logger.info("User requested conversation end.")
@@ -144,10 +140,7 @@ def supervisor_node(state: State) -> Command[Literal["trump_vance_news", "compan
         summary_prompt = f"Summarize the following information for the user.\nTrump/Vance: {trump_news}\nCompany: {company_info}"
         summary = llm.invoke([HumanMessage(content=summary_prompt)])
         # Save answer to memory
-        if thread_id not in memory:
-            memory[thread_id] = {}
-        memory[thread_id][user_question] = {"answer": summary.content, "ts": now}
-        save_memory(memory)
+        memory.put(thread_id, user_question, summary.content, now)
         return Command(update={"messages": [AIMessage(content=summary.content)]}, goto=END)
 
 
@@ -162,16 +155,69 @@ def log_history(messages: List[BaseMessage]) -> None:
             f.write(f"{role}: {m.content}\n")
         f.write("-" * 20 + "\n")
 
-MEMORY_FILE = "memory_saver.json"
-def load_memory():
-    try:
-        with open(MEMORY_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-def save_memory(memory):
-    with open(MEMORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(memory, f, ensure_ascii=False, indent=2)
+MEMORY_DB = os.getenv("MEMORY_DB", "memory_saver.sqlite")
+MEMORY_TTL = float(os.getenv("MEMORY_TTL", str(24 * 3600)))  # seconds an answer is reused
+
+
+# 스레드별 질문-답변을 SQLite에 저장하는 메모리 (질문 해시 인덱스로 조회, 오래된 답변은 만료)
+class AnswerMemory:
+    """Answers keyed by ``(thread_id, sha256(question))``.
+
+    Each lookup or write touches a single indexed row, so the cost does not grow
+    with the history size, and SQLite (WAL mode) keeps concurrent writers from
+    corrupting the store. Answers older than ``ttl`` seconds are ignored and
+    pruned on the next write.
+    """
+
+    def __init__(self, path: str = MEMORY_DB, ttl: float = MEMORY_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS answers (
+                    thread_id TEXT NOT NULL,
+                    question_hash TEXT NOT NULL,
+                    question TEXT NOT NULL,
+                    answer TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    PRIMARY KEY (thread_id, question_hash)
+                ) WITHOUT ROWID"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS answers_ts ON answers (ts)")
+
+    @staticmethod
+    def _key(question: str) -> str:
+        return hashlib.sha256(question.strip().encode("utf-8")).hexdigest()
+
+    def get(self, thread_id: str, question: str) -> Optional[Tuple[str, float]]:
+        """Return ``(answer, timestamp)`` for a question asked within the TTL, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, ts FROM answers WHERE thread_id = ? AND question_hash = ? AND ts >= ?",
+                (thread_id, self._key(question), time.time() - self.ttl),
+            ).fetchone()
+        return row
+
+    def put(self, thread_id: str, question: str, answer: str, ts: Optional[float] = None) -> None:
+        ts = time.time() if ts is None else ts
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?)",
+                (thread_id, self._key(question), question.strip(), answer, ts),
+            )
+            self._conn.execute("DELETE FROM answers WHERE ts < ?", (ts - self.ttl,))
+
+    def forget(self, thread_id: str, question: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM answers WHERE thread_id = ? AND question_hash = ?",
+                (thread_id, self._key(question)),
+            )
+
+
+memory = AnswerMemory()
 
 
 # --- Entry point ---------------------------------------------------------------
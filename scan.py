@@ -0,0 +1,115 @@
+# 디렉터리 전체 C 소스 일괄 분석 CLI (프로세스 풀 + JSONL 출력)
+#
+# 사용 예: python scan.py firmware/ -o scan.jsonl --workers 8
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Sequence
+
+import config
+from analysis import analyze_static, detect_anti_patterns
+from analysis_cache import AnalysisCache, content_hash, entry_to_dict
+
+DEFAULT_EXTENSIONS = (".c", ".h")
+
+# 작업 프로세스마다 하나씩 여는 분석 캐시 (풀 initializer에서 설정)
+_cache: Optional[AnalysisCache] = None
+
+
+def iter_sources(root: str, extensions: Sequence[str] = DEFAULT_EXTENSIONS) -> Iterator[str]:
+    """``root`` 아래의 소스 파일 경로를 정렬된 순서로 나열합니다 (숨김 디렉터리 제외)."""
+    if os.path.isfile(root):
+        yield root
+        return
+    for current, dirs, names in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(names):
+            if name.lower().endswith(tuple(extensions)):
+                yield os.path.join(current, name)
+
+
+def _init_worker(cache_path: str) -> None:
+    global _cache  # pylint: disable=global-statement
+    # 작업 프로세스는 결과를 바로 내보내므로 메모리 LRU는 작게 둔다
+    _cache = AnalysisCache(path=cache_path, max_entries=16)
+
+
+def scan_file(path: str) -> dict:
+    """파일 하나를 분석해 JSONL 레코드를 만듭니다. 같은 내용을 이미 분석했다면 캐시에서 읽습니다."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return {"path": path, "error": str(e)}
+    code = data.decode("utf-8", errors="replace")
+    digest = content_hash(code)
+    entry = _cache.get(digest) if _cache is not None else None
+    cached = entry is not None
+    if entry is None:
+        entry = (analyze_static(code), detect_anti_patterns(code))
+        if _cache is not None:
+            _cache.put(digest, entry)
+    record = {"path": path, "hash": digest, "bytes": len(data), "cached": cached}
+    record.update(entry_to_dict(entry))
+    return record
+
+
+def run_scan(paths: List[str], out, workers: int, cache_path: str, chunksize: int = 8, progress: bool = False) -> dict:
+    """파일들을 프로세스 풀에서 분석하며 결과를 JSONL로 바로 써 나가고 처리량 통계를 반환합니다."""
+    start = time.perf_counter()
+    stats = {"files": 0, "bytes": 0, "cached": 0, "errors": 0}
+    last_report = start
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache_path,)) as pool:
+        # map은 입력 순서대로 결과를 내주므로 출력 순서가 재현 가능하다
+        for record in pool.map(scan_file, paths, chunksize=chunksize):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            stats["files"] += 1
+            stats["bytes"] += record.get("bytes", 0)
+            stats["cached"] += bool(record.get("cached"))
+            stats["errors"] += "error" in record
+            now = time.perf_counter()
+            if progress and now - last_report >= 5:
+                last_report = now
+                print(f"{stats['files']}/{len(paths)} files", file=sys.stderr)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    stats["seconds"] = elapsed
+    stats["files_per_sec"] = stats["files"] / elapsed
+    stats["mb_per_sec"] = stats["bytes"] / (1024 * 1024) / elapsed
+    return stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="디렉터리의 C 소스를 일괄 정적 분석해 JSONL로 출력합니다.")
+    parser.add_argument("root", help="분석할 디렉터리 또는 파일")
+    parser.add_argument("-o", "--output", default="-", help="JSONL 출력 파일 (기본: 표준 출력)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="작업 프로세스 수")
+    parser.add_argument("--cache", default=config.ANALYSIS_CACHE_PATH, help="분석 캐시 경로 (재실행 시 이어서 처리)")
+    parser.add_argument("--no-cache", action="store_true", help="캐시를 사용하지 않음")
+    parser.add_argument("--ext", default=",".join(DEFAULT_EXTENSIONS), help="분석할 확장자 (쉼표 구분)")
+    parser.add_argument("--chunksize", type=int, default=8, help="작업 프로세스에 한 번에 넘길 파일 수")
+    parser.add_argument("--progress", action="store_true", help="진행 상황을 표준 에러로 출력")
+    args = parser.parse_args(argv)
+
+    extensions = [e if e.startswith(".") else "." + e for e in args.ext.split(",") if e]
+    paths = list(iter_sources(args.root, extensions))
+    cache_path = "" if args.no_cache else args.cache
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        stats = run_scan(paths, out, max(1, args.workers), cache_path, max(1, args.chunksize), args.progress)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(
+        f"{stats['files']} files, {stats['bytes'] / (1024 * 1024):.1f} MB in {stats['seconds']:.2f}s "
+        f"({stats['files_per_sec']:.1f} files/s, {stats['mb_per_sec']:.2f} MB/s), "
+        f"cached {stats['cached']}, errors {stats['errors']}",
+        file=sys.stderr,
+    )
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# 벡터스토어 변경분을 기록하는 추가 전용 세그먼트 로그
+import json
+import os
+import struct
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# 레코드 = [헤더 길이(uint32), 벡터 바이트 수(uint32)] + JSON 헤더 + float32 벡터
+_PREFIX = struct.Struct("<II")
+
+Record = Tuple[dict, Optional[np.ndarray]]
+
+
+def append_records(path: str, records: List[Record]) -> int:
+    """레코드를 로그 끝에 추가하고 기록한 바이트 수를 반환합니다."""
+    chunks = []
+    for header, vector in records:
+        head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        body = b"" if vector is None else np.asarray(vector, dtype=np.float32).tobytes()
+        chunks.append(_PREFIX.pack(len(head), len(body)) + head + body)
+    data = b"".join(chunks)
+    with open(path, "ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return len(data)
+
+
+def read_records(path: str) -> Tuple[List[Record], int]:
+    """로그의 레코드를 기록 순서대로 읽고, 온전한 레코드가 끝나는 위치를 함께 반환합니다.
+
+    기록 도중 중단되어 잘린 마지막 레코드는 제외됩니다.
+    """
+    records: List[Record] = []
+    valid = 0
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return records, valid
+    with f:
+        while True:
+            prefix = f.read(_PREFIX.size)
+            if len(prefix) < _PREFIX.size:
+                break
+            head_len, body_len = _PREFIX.unpack(prefix)
+            head = f.read(head_len)
+            body = f.read(body_len)
+            if len(head) < head_len or len(body) < body_len:
+                break
+            vector = np.frombuffer(body, dtype=np.float32) if body_len else None
+            records.append((json.loads(head.decode("utf-8")), vector))
+            valid = f.tell()
+    return records, valid
+
+
+def truncate(path: str, length: int = 0) -> None:
+    """로그를 ``length`` 바이트로 자릅니다 (잘린 레코드 제거 또는 압축 후 비우기)."""
+    with open(path, "ab") as f:
+        f.truncate(length)
@@ -0,0 +1,5 @@
+# 테스트 공용 설정: 저장소 루트의 평면 모듈을 import 할 수 있게 한다
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,65 @@
+# AnalysisCache 테스트 (디스크 왕복, 버전 무효화, LRU)
+import json
+
+import analysis_cache
+from analysis_cache import AnalysisCache, content_hash, entry_from_dict, entry_to_dict
+
+CODE = "int g;\nint f(int a) {\n  if (a > 3) { g = a * 42; }\n  return g;\n}\nint h(void) { return g + 42; }\n"
+
+
+def test_round_trip_through_disk(tmp_path):
+    cache = AnalysisCache(str(tmp_path), max_entries=4)
+    digest, analysis, anti = cache.analyze(CODE)
+    assert digest == content_hash(CODE)
+    assert (tmp_path / digest[:2] / f"{digest}.json").exists()
+
+    fresh = AnalysisCache(str(tmp_path), max_entries=4)
+    cached = fresh.get(digest)
+    assert cached == (analysis, anti)
+    assert [f.name for f in cached[0].functions] == ["f", "h"]
+    assert any(a.type == "Global Variable Misuse" for a in cached[1])
+
+
+def test_analyze_reuses_cached_entry(tmp_path, monkeypatch):
+    cache = AnalysisCache(str(tmp_path), max_entries=4)
+    cache.analyze(CODE)
+    monkeypatch.setattr(analysis_cache, "analyze_static", lambda code: (_ for _ in ()).throw(AssertionError("재분석")))
+    assert cache.analyze(CODE)[0] == content_hash(CODE)
+    assert AnalysisCache(str(tmp_path), max_entries=4).analyze(CODE)[0] == content_hash(CODE)
+
+
+def test_version_change_invalidates_disk_entries(tmp_path, monkeypatch):
+    digest, analysis, anti = AnalysisCache(str(tmp_path), max_entries=4).analyze(CODE)
+    monkeypatch.setattr(analysis_cache, "ANALYSIS_VERSION", analysis_cache.ANALYSIS_VERSION + 1)
+    cache = AnalysisCache(str(tmp_path), max_entries=4)
+    assert cache.get(digest) is None
+    # 다시 분석하면 새 버전으로 덮어쓴다
+    assert cache.analyze(CODE)[1:] == (analysis, anti)
+    with open(tmp_path / digest[:2] / f"{digest}.json", encoding="utf-8") as f:
+        assert json.load(f)["version"] == analysis_cache.ANALYSIS_VERSION
+
+
+def test_corrupt_file_is_a_miss(tmp_path):
+    cache = AnalysisCache(str(tmp_path), max_entries=4)
+    digest = cache.analyze(CODE)[0]
+    (tmp_path / digest[:2] / f"{digest}.json").write_text("{not json", encoding="utf-8")
+    assert AnalysisCache(str(tmp_path), max_entries=4).get(digest) is None
+
+
+def test_memory_only_cache_is_bounded():
+    cache = AnalysisCache("", max_entries=2)
+    for i in range(3):
+        cache.put(f"d{i}", i)
+    assert cache.get("d0") is None
+    assert cache.get("d1") == 1 and cache.get("d2") == 2
+
+
+def test_custom_codec(tmp_path):
+    cache = AnalysisCache(str(tmp_path), max_entries=2, encode=dict, decode=dict)
+    cache.put("k", {"function": "f", "result": [1, 2]})
+    assert AnalysisCache(str(tmp_path), max_entries=2, encode=dict, decode=dict).get("k") == {"function": "f", "result": [1, 2]}
+
+
+def test_entry_dict_round_trip():
+    entry = AnalysisCache("", max_entries=1).analyze(CODE)[1:]
+    assert entry_from_dict(json.loads(json.dumps(entry_to_dict(entry)))) == entry
@@ -0,0 +1,100 @@
+# c_lexer 토크나이저 / 스코프 추적기 테스트
+from c_lexer import (
+    CHAR,
+    FUNCTION_END,
+    FUNCTION_START,
+    IDENT,
+    NUMBER,
+    PREPROC,
+    PUNCT,
+    STRING,
+    DeclarationTracker,
+    ScopeTracker,
+    tokenize,
+)
+
+
+def _events(code):
+    scope = ScopeTracker()
+    events = []
+    for tok in tokenize(code):
+        event = scope.feed(tok)
+        if event is not None:
+            events.append((event, scope.function, tok.line))
+    return events, scope
+
+
+def test_token_kinds_and_lines():
+    code = 'int x = 0x1F; // comment\nchar *s = "a\\"b";\nchar c = \'\\n\';\n/* multi\nline */ x += 1.5e-3;'
+    tokens = list(tokenize(code))
+    assert tokens[:5] == [(IDENT, "int", 1), (IDENT, "x", 1), (PUNCT, "=", 1), (NUMBER, "0x1F", 1), (PUNCT, ";", 1)]
+    assert (STRING, '"a\\"b"', 2) in tokens
+    assert (CHAR, "'\\n'", 3) in tokens
+    assert tokens[-4:] == [(IDENT, "x", 5), (PUNCT, "+=", 5), (NUMBER, "1.5e-3", 5), (PUNCT, ";", 5)]
+
+
+def test_preprocessor_lines_are_skipped_unless_requested():
+    code = "#define MAX(a, b) \\\n  ((a) > (b) ? (a) : (b))\nint y;\n"
+    assert list(tokenize(code)) == [(IDENT, "int", 3), (IDENT, "y", 3), (PUNCT, ";", 3)]
+    kept = list(tokenize(code, keep_preprocessor=True))
+    assert kept[0].kind == PREPROC and kept[0].line == 1
+    assert kept[1] == (IDENT, "int", 3)
+
+
+def test_multi_char_operators():
+    values = [t.value for t in tokenize("a->b <<= c && d || e++ ... f != g")]
+    assert values == ["a", "->", "b", "<<=", "c", "&&", "d", "||", "e", "++", "...", "f", "!=", "g"]
+
+
+def test_unterminated_comment_and_string_do_not_hang():
+    assert [t.value for t in tokenize("int a; /* never closed")] == ["int", "a", ";"]
+    assert list(tokenize('"open'))[0].kind == STRING
+
+
+def test_function_boundaries():
+    code = "int g;\nint f(int a) {\n  return a;\n}\nstatic void h(void)\n{\n}\n"
+    events, scope = _events(code)
+    assert events == [
+        (FUNCTION_START, "f", 2),
+        (FUNCTION_END, "f", 4),
+        (FUNCTION_START, "h", 6),
+        (FUNCTION_END, "h", 7),
+    ]
+    assert scope.brace_depth == 0
+
+
+def test_prototypes_and_initializers_are_not_functions():
+    code = "int f(int a);\nint table[] = { 1, 2 };\nstruct s { int x; };\n"
+    events, _ = _events(code)
+    assert events == []
+
+
+def test_function_line_and_control_nesting():
+    scope = ScopeTracker()
+    deepest = 0
+    for tok in tokenize("void f(int a)\n{\n  if (a) { while (a) { a--; } }\n  { a++; }\n}\n"):
+        scope.feed(tok)
+        deepest = max(deepest, scope.nesting)
+        if tok.value == "a" and tok.line == 4:
+            assert scope.function == "f" and scope.function_line == 1 and scope.nesting == 0
+    assert deepest == 2
+    assert scope.nesting == 0
+
+
+def test_unbalanced_closing_brace_is_ignored():
+    events, scope = _events("}\nint f(void) { return 0; }\n")
+    assert [e[0] for e in events] == [FUNCTION_START, FUNCTION_END]
+    assert scope.brace_depth == 0
+
+
+def test_declaration_tracker():
+    scope = ScopeTracker()
+    declarations = DeclarationTracker()
+    found = []
+    code = "const int k = 3;\nint a = 1, b[4], *p;\nint f(int param) { for (int i = 0; i < 3; i++) {} return 0; }\n"
+    for tok in tokenize(code):
+        scope.feed(tok)
+        name = declarations.feed(tok, scope)
+        if name is not None:
+            found.append((name.value, declarations.const))
+    assert found == [("k", True), ("a", False), ("b", False), ("p", False), ("i", False)]
@@ -0,0 +1,101 @@
+# DeltaSqliteSaver 테스트 (put/get_tuple/list, 메시지 중복 저장 방지, 비동기 경로)
+import asyncio
+import sqlite3
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import START, MessagesState, StateGraph
+
+from checkpoint_store import DeltaSqliteSaver, open_checkpointer
+
+
+def _echo(state: MessagesState):
+    return {"messages": [AIMessage(content=f"echo: {state['messages'][-1].content}")]}
+
+
+def _graph(saver):
+    builder = StateGraph(MessagesState)
+    builder.add_node("echo", _echo)
+    builder.add_edge(START, "echo")
+    return builder.compile(checkpointer=saver)
+
+
+def _config(thread_id="t1"):
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "graph.sqlite")
+
+
+def test_put_and_get_tuple_restore_channel_values(path):
+    graph = _graph(open_checkpointer(path))
+    graph.invoke({"messages": [HumanMessage(content="hi")]}, _config())
+    graph.invoke({"messages": [HumanMessage(content="again")]}, _config())
+
+    # 새 연결로 열어도 채널 값이 채워진다
+    saver = open_checkpointer(path)
+    tup = saver.get_tuple(_config())
+    assert [m.content for m in tup.checkpoint["channel_values"]["messages"]] == ["hi", "echo: hi", "again", "echo: again"]
+    assert _graph(saver).get_state(_config()).values["messages"][-1].content == "echo: again"
+
+
+def test_messages_are_stored_once_per_thread(path):
+    graph = _graph(open_checkpointer(path))
+    for i in range(5):
+        graph.invoke({"messages": [HumanMessage(content=f"q{i}")]}, _config())
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM thread_messages").fetchone()[0] == 10
+    # 체크포인트 행에는 채널 값을 다시 쓰지 않는다
+    stored = conn.execute("SELECT checkpoint FROM checkpoints").fetchall()
+    assert all(b"q0" not in bytes(row[0]) for row in stored)
+
+
+def test_list_returns_history_with_values(path):
+    saver = open_checkpointer(path)
+    graph = _graph(saver)
+    graph.invoke({"messages": [HumanMessage(content="one")]}, _config())
+    graph.invoke({"messages": [HumanMessage(content="two")]}, _config())
+    history = list(saver.list(_config()))
+    assert len(history) >= 4
+    lengths = [len(t.checkpoint["channel_values"].get("messages", [])) for t in history]
+    assert lengths == sorted(lengths, reverse=True)
+    assert lengths[0] == 4
+    assert len(list(saver.list(_config(), limit=2))) == 2
+
+
+def test_threads_are_isolated_and_deletable(path):
+    saver = open_checkpointer(path)
+    graph = _graph(saver)
+    graph.invoke({"messages": [HumanMessage(content="a")]}, _config("a"))
+    graph.invoke({"messages": [HumanMessage(content="b")]}, _config("b"))
+    assert [m.content for m in graph.get_state(_config("b")).values["messages"]] == ["b", "echo: b"]
+    saver.delete_thread("a")
+    assert saver.get_tuple(_config("a")) is None
+    assert saver.get_tuple(_config("b")) is not None
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM channel_values WHERE thread_id = 'a'").fetchone()[0] == 0
+
+
+def test_async_methods(path):
+    saver = open_checkpointer(path)
+    graph = _graph(saver)
+
+    async def run():
+        await graph.ainvoke({"messages": [HumanMessage(content="async")]}, _config())
+        tup = await saver.aget_tuple(_config())
+        listed = [t async for t in saver.alist(_config(), limit=1)]
+        await saver.adelete_thread("t1")
+        return tup, listed, await saver.aget_tuple(_config())
+
+    tup, listed, deleted = asyncio.run(run())
+    assert [m.content for m in tup.checkpoint["channel_values"]["messages"]] == ["async", "echo: async"]
+    assert len(listed) == 1 and listed[0].checkpoint["channel_values"]["messages"][-1].content == "echo: async"
+    assert deleted is None
+
+
+def test_open_checkpointer_uses_wal(path):
+    saver = open_checkpointer(path)
+    assert isinstance(saver, DeltaSqliteSaver)
+    assert saver.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
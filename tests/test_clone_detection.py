@@ -0,0 +1,113 @@
+# CloneIndex 테스트 (서명, 질의, 저장/읽기)
+import numpy as np
+
+import clone_detection
+from analysis import analyze_static
+from clone_detection import CLONE_TYPE, FILE_KEY_PREFIX, CloneIndex, find_clones
+
+ORIGINAL = """
+int checksum(const unsigned char *data, int length) {
+    int sum = 0;
+    for (int i = 0; i < length; i++) {
+        if (data[i] > 127) {
+            sum += data[i] * 3;
+        } else {
+            sum -= data[i] / 2;
+        }
+    }
+    while (sum > 65535) {
+        sum = (sum & 65535) + (sum >> 16);
+    }
+    return sum;
+}
+"""
+
+# 이름과 리터럴만 바꾼 복사본
+RENAMED = ORIGINAL.replace("checksum", "crc_like").replace("sum", "acc").replace("127", "100")
+
+UNRELATED = """
+void copy_strings(char **dst, char **src, unsigned count) {
+    unsigned n = 0;
+    while (n < count) {
+        dst[n] = strdup(src[n]);
+        if (!dst[n]) {
+            abort();
+        }
+        n++;
+    }
+    qsort(dst, count, sizeof(char *), compare_names);
+}
+"""
+
+
+def _index(path=""):
+    return CloneIndex(path=path, num_perm=64, bands=16)
+
+
+def test_short_code_has_no_signature():
+    assert _index().signature("int f(void) { return 0; }") is None
+
+
+def test_renamed_copy_is_found_and_unrelated_code_is_not():
+    index = _index()
+    index.add("a", "a.c", "checksum", index.signature(ORIGINAL))
+    index.add("c", "c.c", "copy_strings", index.signature(UNRELATED))
+    matches = index.query(index.signature(RENAMED), threshold=0.8)
+    assert [(m.key, m.file, m.function) for m in matches] == [("a", "a.c", "checksum")]
+    assert matches[0].similarity == 1.0
+    assert index.query(index.signature(RENAMED), exclude_file="a.c") == []
+
+
+def test_whole_file_and_indexed_filters():
+    index = _index()
+    sig = index.signature(ORIGINAL)
+    index.add(FILE_KEY_PREFIX + "a.c", "a.c", "", sig)
+    index.add("alias", "b.c", "checksum", sig, indexed=False)
+    assert [m.key for m in index.query(sig, whole_file=True)] == [FILE_KEY_PREFIX + "a.c"]
+    assert [m.key for m in index.query(sig)] == ["alias"]
+    assert index.query(sig, indexed_only=True) == []
+
+
+def test_replace_and_remove_keep_buckets_consistent():
+    index = _index()
+    index.add("k", "a.c", "f", index.signature(ORIGINAL))
+    index.add("k", "a.c", "f", index.signature(UNRELATED))
+    assert len(index) == 1
+    assert index.query(index.signature(ORIGINAL)) == []
+    index.remove(["k"])
+    assert len(index) == 0 and index.keys("a.c") == []
+    assert index.query(index.signature(UNRELATED)) == []
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "clones.npz")
+    index = _index(path)
+    index.add("a", "a.c", "checksum", index.signature(ORIGINAL))
+    index.add("b", "b.c", "copy_strings", index.signature(UNRELATED), indexed=False)
+    index.save()
+
+    loaded = _index(path)
+    assert len(loaded) == 2
+    assert sorted(loaded.keys("a.c") + loaded.keys("b.c")) == ["a", "b"]
+    assert [m.key for m in loaded.query(loaded.signature(RENAMED))] == ["a"]
+    assert loaded.query(loaded.signature(UNRELATED), indexed_only=True) == []
+    assert np.array_equal(loaded.signature(ORIGINAL), index.signature(ORIGINAL))
+
+
+def test_load_rejects_other_versions(tmp_path, monkeypatch):
+    path = str(tmp_path / "clones.npz")
+    index = _index(path)
+    index.add("a", "a.c", "checksum", index.signature(ORIGINAL))
+    index.save()
+    assert len(CloneIndex(path=path, num_perm=128, bands=32)) == 0
+    monkeypatch.setattr(clone_detection, "CLONE_VERSION", clone_detection.CLONE_VERSION + 1)
+    assert len(_index(path)) == 0
+
+
+def test_find_clones_reports_functions_in_other_files():
+    index = _index()
+    index.add("a", "a.c", "checksum", index.signature(ORIGINAL))
+    found = find_clones(index, "b.c", RENAMED, analyze_static(RENAMED))
+    assert [(p.type, p.function) for p in found] == [(CLONE_TYPE, "crc_like")]
+    assert "a.c" in found[0].details
+    assert find_clones(index, "a.c", ORIGINAL, analyze_static(ORIGINAL)) == []
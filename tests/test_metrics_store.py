@@ -0,0 +1,118 @@
+# MetricsStore 질의와 세그먼트 로그 저장 테스트
+import os
+
+import pytest
+
+import metrics_store
+from analysis import analyze_static, detect_anti_patterns
+from metrics_store import MetricsStore, format_summary
+
+SIMPLE = "int add(int a, int b) {\n  return a + b;\n}\n"
+BRANCHY = (
+    "int g;\n"
+    "int pick(int a) {\n"
+    "  if (a > 10) { return 42; }\n"
+    "  if (a > 5 && a < 8) { return 42; }\n"
+    "  for (int i = 0; i < a; i++) { g += i; }\n"
+    "  return g;\n"
+    "}\n"
+    "void bump(void) { g++; }\n"
+)
+
+
+def _record(store, name, code, digest=None):
+    return store.record(name, digest or str(hash(code)), analyze_static(code), detect_anti_patterns(code))
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = MetricsStore(str(tmp_path / "metrics.npz"))
+    _record(s, "a.c", SIMPLE)
+    _record(s, "b.c", BRANCHY)
+    return s
+
+
+def test_aggregate(store):
+    stats = store.aggregate()
+    assert stats["files"] == 2
+    assert stats["functions"] == 3
+    assert stats["total_lines"] == SIMPLE.count("\n") + BRANCHY.count("\n")
+    assert stats["max_function_complexity"] == analyze_static(BRANCHY).functions[0].cyclomatic_complexity
+    assert stats["anti_patterns"]["Magic Numbers"] == 4  # 42, 10, 5, 8
+    assert store.aggregate(files=["a.c"])["anti_patterns"] == {}
+
+
+def test_top_functions_and_filters(store):
+    top = store.top_functions(2)
+    assert [(t["file"], t["function"]) for t in top] == [("b.c", "pick"), ("a.c", "add")]
+    assert top[0]["complexity"] > top[1]["complexity"]
+    by_lines = store.top_functions(1, key="lines")
+    assert by_lines[0]["function"] == "pick" and by_lines[0]["lines"] == 6
+    assert [t["function"] for t in store.top_functions(5, files=["a.c"])] == ["add"]
+    with pytest.raises(ValueError):
+        store.top_functions(1, key="name")
+
+
+def test_find_and_files_over(store):
+    assert {f["type"] for f in store.find(file="b.c")} == {"Magic Numbers", "Global Variable Misuse"}
+    assert sorted(f["line"] for f in store.find(type="Magic Numbers")) == [3, 3, 4, 4]
+    assert store.find(type="Unknown") == []
+    assert [f["file"] for f in store.files_over(2)] == ["b.c"]
+
+
+def test_rerecording_keeps_trend_and_replaces_current_rows(store):
+    assert not _record(store, "a.c", SIMPLE)
+    assert _record(store, "a.c", BRANCHY, digest="v2")
+    assert store.aggregate()["functions"] == 4
+    trend = store.trend("a.c")
+    assert len(trend) == 2 and trend[-1]["hash"] == "v2"
+    assert trend[0]["complexity"] < trend[1]["complexity"]
+
+
+def test_save_appends_only_new_records(tmp_path, store):
+    store.save()
+    log = store._log_path()  # pylint: disable=protected-access
+    size = os.path.getsize(log)
+    store.save()
+    assert os.path.getsize(log) == size
+    _record(store, "c.c", SIMPLE, digest="c")
+    store.save()
+    grown = os.path.getsize(log) - size
+    assert 0 < grown < size
+    assert not os.path.exists(tmp_path / "metrics.npz")
+
+    reopened = MetricsStore(str(tmp_path / "metrics.npz"))
+    assert reopened.aggregate() == store.aggregate()
+    assert reopened.top_functions(3) == store.top_functions(3)
+
+
+def test_compact_folds_the_log_into_the_snapshot(tmp_path, store, monkeypatch):
+    store.save()
+    _record(store, "a.c", BRANCHY, digest="v2")
+    monkeypatch.setattr(metrics_store.config, "METRICS_COMPACT_BYTES", 0)
+    store.save()
+    assert os.path.exists(tmp_path / "metrics.npz")
+    assert os.path.getsize(store._log_path()) == 0  # pylint: disable=protected-access
+
+    reopened = MetricsStore(str(tmp_path / "metrics.npz"))
+    assert reopened.aggregate() == store.aggregate()
+    assert [t["hash"] for t in reopened.trend("a.c")][-1] == "v2"
+    # 스냅샷 위에 로그가 다시 쌓여도 함께 읽는다
+    _record(reopened, "d.c", SIMPLE, digest="d")
+    reopened.save()
+    assert MetricsStore(str(tmp_path / "metrics.npz")).aggregate()["files"] == 3
+
+
+def test_torn_log_record_is_dropped(tmp_path, store):
+    store.save()
+    size = os.path.getsize(store._log_path())  # pylint: disable=protected-access
+    with open(store._log_path(), "ab") as f:  # pylint: disable=protected-access
+        f.write(b"\x07\x00")
+    reopened = MetricsStore(str(tmp_path / "metrics.npz"))
+    assert reopened.aggregate()["files"] == 2
+    assert os.path.getsize(store._log_path()) == size  # pylint: disable=protected-access
+
+
+def test_format_summary(store):
+    text = format_summary(store, n=1)
+    assert "파일 수: 2" in text and "pick" in text
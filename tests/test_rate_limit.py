@@ -0,0 +1,160 @@
+# RateLimiter 우선순위/예약분과 call_with_backoff 테스트 (가짜 시계 사용)
+import asyncio
+
+import pytest
+
+import rate_limit
+from rate_limit import BATCH, INTERACTIVE, RateLimiter, call_with_backoff, current_priority, request_priority
+
+
+class FakeTime:
+    """sleep이 실제로 기다리지 않고 시계만 앞으로 돌리는 time 모듈 대체."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    monkeypatch.setattr(rate_limit.random, "uniform", lambda a, b: b)
+    return fake
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code=429):
+        super().__init__(status_code)
+        self.status_code = status_code
+        self.response = None
+
+
+def test_requests_per_minute(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(60):
+        limiter.acquire()
+    assert clock.slept == []
+    limiter.acquire()
+    assert sum(clock.slept) == pytest.approx(1.0)
+
+
+def test_tokens_per_minute_and_oversized_requests(clock):
+    limiter = RateLimiter(tokens_per_minute=600)
+    limiter.acquire(500)
+    limiter.acquire(200)
+    assert sum(clock.slept) == pytest.approx(10.0)
+    # 한도보다 큰 요청도 버킷이 가득 차면 통과한다
+    clock.now += 60
+    limiter.acquire(5000)
+    assert sum(clock.slept) == pytest.approx(10.0)
+
+
+def test_batch_leaves_the_reserve_for_interactive(clock):
+    limiter = RateLimiter(requests_per_minute=10, reserve=0.2)
+    for _ in range(8):
+        limiter.acquire(priority=BATCH)
+    assert clock.slept == []
+    # 남은 2건은 batch에게는 없는 예산이다
+    assert limiter._try_acquire(0, BATCH) > 0  # pylint: disable=protected-access
+    limiter.acquire(priority=INTERACTIVE)
+    limiter.acquire(priority=INTERACTIVE)
+    assert clock.slept == []
+    limiter.acquire(priority=INTERACTIVE)
+    assert clock.slept and sum(clock.slept) == pytest.approx(6.0)
+
+
+def test_batch_yields_while_interactive_is_waiting(clock):
+    limiter = RateLimiter(requests_per_minute=100)
+    assert limiter._try_acquire(0, BATCH) == 0  # pylint: disable=protected-access
+    limiter._interactive_waiting = 1  # pylint: disable=protected-access
+    assert limiter._try_acquire(0, BATCH) >= 0.05  # pylint: disable=protected-access
+    assert limiter._try_acquire(0, INTERACTIVE) == 0  # pylint: disable=protected-access
+
+
+def test_priority_comes_from_context(clock):
+    limiter = RateLimiter(requests_per_minute=10, reserve=0.5)
+    assert current_priority() == INTERACTIVE
+    with request_priority(BATCH):
+        assert current_priority() == BATCH
+        for _ in range(5):
+            limiter.acquire()
+        assert limiter._try_acquire(0, current_priority()) > 0  # pylint: disable=protected-access
+    assert current_priority() == INTERACTIVE
+    limiter.acquire()
+    assert clock.slept == []
+
+
+def test_pause_stops_every_priority(clock):
+    limiter = RateLimiter()
+    limiter.pause(3.0)
+    limiter.acquire(priority=INTERACTIVE)
+    assert sum(clock.slept) == pytest.approx(3.0)
+
+
+def test_unlimited_limiter_never_waits(clock):
+    limiter = RateLimiter()
+    for _ in range(1000):
+        limiter.acquire(10 ** 6, priority=BATCH)
+    assert clock.slept == []
+
+
+def test_async_acquire_waits_without_blocking(clock, monkeypatch):
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake_sleep)
+    limiter = RateLimiter(requests_per_minute=60)
+
+    async def run():
+        for _ in range(61):
+            await limiter.aacquire()
+
+    asyncio.run(run())
+    assert sum(slept) == pytest.approx(1.0)
+    assert clock.slept == []
+
+
+def test_call_with_backoff_retries_transient_errors(clock):
+    errors = [APIStatusError(429), APIStatusError(503)]
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert call_with_backoff(flaky, base_delay=1.0) == "ok"
+    assert clock.slept == [1.0, 2.0]
+
+
+def test_call_with_backoff_gives_up(clock):
+    def always():
+        raise APIStatusError(429)
+
+    with pytest.raises(APIStatusError):
+        call_with_backoff(always, max_retries=2)
+    assert len(clock.slept) == 2
+
+    def bad_request():
+        raise APIStatusError(400)
+
+    with pytest.raises(APIStatusError):
+        call_with_backoff(bad_request)
+    assert len(clock.slept) == 2
+
+
+def test_retry_after_headers():
+    assert rate_limit.retry_after({"retry-after-ms": "250"}) == pytest.approx(0.25)
+    assert rate_limit.retry_after({"retry-after": "3"}) == 3.0
+    assert rate_limit.retry_after({"retry-after": "soon"}) is None
+    assert rate_limit.retry_after(None) is None
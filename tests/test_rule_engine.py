@@ -0,0 +1,102 @@
+# RuleEngine / 기본 안티패턴 규칙 테스트
+import pytest
+
+from analysis import (
+    DECLARATION,
+    END,
+    DeepNestingRule,
+    GlobalVariableRule,
+    LongFunctionRule,
+    MagicNumberRule,
+    Rule,
+    RuleEngine,
+    detect_anti_patterns,
+)
+from c_lexer import FUNCTION_END, FUNCTION_START, IDENT, NUMBER
+
+
+class RecordingRule(Rule):
+    name = "recording"
+
+    def __init__(self):
+        self.reset()
+
+    def register(self, engine):
+        engine.on_kind(NUMBER, lambda tok, e: self.seen.append(("kind", tok.value)))
+        engine.on_value("number", lambda tok, e: self.seen.append(("value", tok.value)))
+        engine.on_event(FUNCTION_START, lambda tok, e: self.seen.append(("start", e.scope.function)))
+        engine.on_event(FUNCTION_END, lambda tok, e: self.seen.append(("end", e.scope.function)))
+        engine.on_event(DECLARATION, lambda tok, e: self.seen.append(("decl", tok.value)))
+        engine.on_event(END, lambda tok, e: self.seen.append(("eof", tok.value)))
+
+    def reset(self):
+        self.seen = []
+
+
+def test_rule_requires_register():
+    with pytest.raises(TypeError):
+        Rule()  # pylint: disable=abstract-class-instantiated
+
+
+def test_identifier_named_like_token_kind_does_not_fire_kind_handlers():
+    code = "int read_all(int number){ int end = number; return end + number; }"
+    assert detect_anti_patterns(code) == []
+
+
+def test_kind_value_and_event_handlers_are_separate():
+    rule = RecordingRule()
+    RuleEngine([rule]).run("int f(int number){ int x = number + 7; return x; }")
+    assert ("kind", "7") in rule.seen
+    assert ("kind", "number") not in rule.seen
+    assert rule.seen.count(("value", "number")) == 2
+    assert ("start", "f") in rule.seen and ("end", "f") in rule.seen
+    assert ("decl", "x") in rule.seen
+    assert rule.seen[-1] == ("eof", "}")
+
+
+def test_magic_numbers_are_grouped_by_value():
+    found = detect_anti_patterns("int f(int x){ return x * 42 + 42 + 1; }")
+    assert [(p.type, p.details, p.function) for p in found] == [
+        ("Magic Numbers", "Magic number `42` used 2 time(s).", "f"),
+    ]
+
+
+def test_const_declarations_are_not_magic():
+    assert detect_anti_patterns("int f(void){ const int limit = 42; return limit; }") == []
+
+
+def test_global_used_by_several_functions():
+    code = "int counter;\nvoid a(void){ counter++; }\nvoid b(void){ counter--; }\nvoid c(void){ int counter = 0; counter++; }\n"
+    found = RuleEngine([GlobalVariableRule()]).run(code)
+    assert len(found) == 1
+    assert found[0].line == 1
+    assert "used in 2 functions (a, b)" in found[0].details
+
+
+def test_deep_nesting():
+    code = "void f(int a){\n if(a){\n  if(a){\n   if(a){\n    if(a){ a++; }\n   }\n  }\n }\n}\n"
+    found = RuleEngine([DeepNestingRule(max_depth=3)]).run(code)
+    assert [(p.type, p.line, p.function) for p in found] == [("Deeply Nested Conditionals", 5, "f")]
+    assert RuleEngine([DeepNestingRule(max_depth=4)]).run(code) == []
+
+
+def test_long_function():
+    code = "void f(void){\n" + "x++;\n" * 10 + "}\n"
+    found = RuleEngine([LongFunctionRule(max_lines=5)]).run(code)
+    assert found[0].function == "f" and "spans 12 lines" in found[0].details
+
+
+def test_engine_reuse_resets_rule_state():
+    engine = RuleEngine([MagicNumberRule()])
+    engine.run("int f(void){ return 42; }")
+    found = engine.run("int g(void){ return 42; }")
+    assert [p.details for p in found] == ["Magic number `42` used 1 time(s)."]
+    assert set(engine.timings) == {"Magic Numbers"}
+
+
+def test_ident_handler_sees_every_word_token():
+    seen = []
+    engine = RuleEngine([])
+    engine.on_kind(IDENT, lambda tok, e: seen.append(tok.value))
+    engine.run("int f(int a){ return a; }")
+    assert seen == ["int", "f", "int", "a", "return", "a"]
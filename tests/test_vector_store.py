@@ -0,0 +1,165 @@
+# VectorStore 테스트 (upsert, delete, 세그먼트 로그 저장/재생, compact, 다시 열기)
+import hashlib
+import os
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from vector_store import SEGMENT_FILE, VectorStore, cosine_similarity
+
+DIM = 32
+
+
+class WordHashEmbeddings(Embeddings):
+    """단어를 해시해 만든 정규화 벡터 (같은 단어가 많을수록 가깝다). 호출 수를 센다."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def _embed(self, text):
+        v = np.zeros(DIM)
+        for word in text.replace("(", " ").replace(")", " ").split():
+            v[int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1
+        return (v / (np.linalg.norm(v) or 1)).tolist()
+
+    def embed_documents(self, texts):
+        self.calls += len(texts)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def _doc(file, function, text):
+    return Document(page_content=text, metadata={"file": file, "function": function})
+
+
+DOCS = [
+    _doc("a.c", "read_config", "int read_config ( const char * path ) { return parse_file ( path ) ; }"),
+    _doc("a.c", "write_log", "void write_log ( const char * msg ) { fputs ( msg , log_file ) ; }"),
+    _doc("b.c", "sum_values", "int sum_values ( int * values , int n ) { int s = 0 ; return s ; }"),
+]
+
+
+@pytest.fixture
+def model():
+    return WordHashEmbeddings()
+
+
+def _functions(store):
+    return sorted(store._metadata[doc_id]["function"] for doc_id in store.ids())  # pylint: disable=protected-access
+
+
+def _store(model, path=None):
+    return VectorStore(embedding_model=model, path=None if path is None else str(path), index_mode="flat", fp16=False)
+
+
+def test_upsert_is_idempotent_and_replaces_old_versions(model):
+    store = _store(model)
+    assert store.upsert(DOCS) == 3
+    assert store.upsert(DOCS) == 0
+    assert model.calls == 3
+    changed = _doc("a.c", "write_log", "void write_log ( const char * msg ) { puts ( msg ) ; }")
+    assert store.upsert([changed]) == 1
+    assert len(store.ids(where={"file": "a.c"})) == 2
+    contents = [doc.page_content for doc in store.similarity_search("write_log", k=3)]
+    assert changed.page_content in contents
+    assert DOCS[1].page_content not in contents
+
+
+def test_delete_and_delete_where(model):
+    store = _store(model)
+    store.upsert(DOCS)
+    first = store.ids(where={"function": "read_config"})
+    assert store.delete(first) == 1
+    assert store.delete(first) == 0
+    assert store.delete_where({"file": "b.c"}) == 1
+    assert [d.metadata["function"] for d in store.similarity_search("int values", k=5)] == ["write_log"]
+
+
+def test_identifier_query_uses_lexical_index_only(model):
+    store = _store(model)
+    store.upsert(DOCS)
+    found = store.similarity_search("sum_values", k=1)
+    assert found[0].metadata["function"] == "sum_values"
+
+
+def test_vector_distance_is_a_usable_similarity(model):
+    store = _store(model)
+    store.upsert(DOCS)
+    doc, distance = store.vector_search_with_distance(DOCS[2].page_content, k=1)[0]
+    assert doc.metadata["function"] == "sum_values"
+    assert cosine_similarity(distance) == pytest.approx(1.0, abs=1e-5)
+
+
+def test_save_appends_segments_and_reload_replays_them(model, tmp_path):
+    store = _store(model, tmp_path)
+    store.upsert(DOCS[:2])
+    store.save()
+    assert os.path.getsize(tmp_path / SEGMENT_FILE) > 0
+    store.delete(store.ids(where={"function": "write_log"}))
+    store.upsert(DOCS[2:])
+    store.save()
+
+    calls = model.calls
+    reopened = _store(model, tmp_path)
+    assert _functions(reopened) == ["read_config", "sum_values"]
+    assert reopened.similarity_search("read_config", k=1)[0].metadata["function"] == "read_config"
+    assert model.calls == calls  # 재생은 임베딩을 다시 호출하지 않는다
+
+
+def test_compact_writes_snapshot_and_empties_log(model, tmp_path):
+    store = _store(model, tmp_path)
+    store.upsert(DOCS)
+    store.save()
+    store.delete(store.ids(where={"file": "b.c"}))
+    store.compact()
+    assert os.path.getsize(tmp_path / SEGMENT_FILE) == 0
+
+    reopened = _store(model, tmp_path)
+    assert reopened.base is not None
+    assert _functions(reopened) == ["read_config", "write_log"]
+    # 스냅샷 위에 추가/삭제하고 다시 열어도 같은 상태
+    reopened.upsert(DOCS[2:])
+    reopened.delete(reopened.ids(where={"function": "read_config"}))
+    reopened.save()
+    again = _store(model, tmp_path)
+    assert _functions(again) == ["sum_values", "write_log"]
+    assert "read_config" not in [d.metadata["function"] for d in again.similarity_search("read_config parse_file", k=5)]
+
+
+def test_compact_after_deleting_everything_removes_snapshot(model, tmp_path):
+    store = _store(model, tmp_path)
+    store.upsert(DOCS)
+    store.compact()
+    store.delete(store.ids())
+    store.compact()
+    reopened = _store(model, tmp_path)
+    assert reopened.ids() == [] and reopened.base is None
+    assert reopened.similarity_search("read_config", k=2) == []
+
+
+def test_torn_segment_record_is_dropped(model, tmp_path):
+    store = _store(model, tmp_path)
+    store.upsert(DOCS[:1])
+    store.save()
+    size = os.path.getsize(tmp_path / SEGMENT_FILE)
+    with open(tmp_path / SEGMENT_FILE, "ab") as f:
+        f.write(b"\x10\x00\x00")
+    reopened = _store(model, tmp_path)
+    assert len(reopened.ids()) == 1
+    assert os.path.getsize(tmp_path / SEGMENT_FILE) == size
+
+
+def test_aliases_reuse_stored_vectors(model):
+    store = _store(model)
+    store.upsert(DOCS[:1])
+    source = store.ids()[0]
+    calls = model.calls
+    copy = _doc("c.c", "read_config", DOCS[0].page_content + " ")
+    assert store.upsert_aliases([(copy, source)]) == 1
+    assert model.calls == calls
+    store.delete([source])
+    assert store.similarity_search("read_config", k=1)[0].metadata["file"] == "c.c"
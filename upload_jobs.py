@@ -0,0 +1,104 @@
+# 업로드 파일의 분석/인덱싱을 백그라운드 작업 풀에서 처리
+import io
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+import config
+from rate_limit import BATCH, request_priority
+
+SOURCE_EXTENSIONS = (".c", ".h")
+
+# 작업 상태
+QUEUED = "queued"
+ANALYZING = "analyzing"
+INDEXING = "indexing"
+DONE = "done"
+FAILED = "failed"
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+@dataclass
+class UploadJob:
+    name: str  # 파일명 (zip 안의 파일은 "압축파일/경로")
+    hash: str  # 내용 해시 (blob 저장소 키)
+    status: str = QUEUED  # 진행 단계
+    progress: float = 0.0  # 0.0 ~ 1.0
+    analysis: Optional[str] = None  # 정적 분석 결과 문자열
+    detail: str = ""  # 인덱싱 결과 또는 오류 메시지
+    started: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """프로세스에서 공유하는 업로드 작업 풀을 반환합니다."""
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=config.UPLOAD_WORKERS, thread_name_prefix="upload")
+    return _executor
+
+
+def iter_upload_sources(name: str, data: bytes) -> Iterator[Tuple[str, str]]:
+    """업로드된 파일에서 (파일명, 소스코드)를 꺼냅니다. zip이면 안의 .c/.h 파일을 하나씩 읽습니다."""
+    if not name.lower().endswith(".zip"):
+        yield name, data.decode("utf-8", errors="replace")
+        return
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for info in archive.infolist():
+            member = info.filename
+            if info.is_dir() or member.startswith("__MACOSX/") or not member.lower().endswith(SOURCE_EXTENSIONS):
+                continue
+            # 압축 폭탄 방지: 풀었을 때 너무 큰 파일은 건너뛴다
+            if info.file_size > config.UPLOAD_MAX_FILE_BYTES:
+                continue
+            with archive.open(info) as f:
+                yield f"{name}/{member}", f.read().decode("utf-8", errors="replace")
+
+
+def _run(job: UploadJob, code: str) -> None:
+    # 순환 import를 피하려고 공유 리소스 접근자는 실행 시점에 가져온다
+    from agents import format_analysis, get_clone_index, get_vector_store, record_metrics, static_analysis  # pylint: disable=import-outside-toplevel
+    from chunking import index_source  # pylint: disable=import-outside-toplevel
+
+    # 백그라운드 작업이므로 사용자 요청보다 뒤에 한도를 받는다
+    with request_priority(BATCH):
+        try:
+            job.status = ANALYZING
+            _, analysis, anti = static_analysis(code, job.name)
+            record_metrics(job.name, job.hash, analysis, anti)
+            job.analysis = format_analysis(analysis, anti)
+            job.status, job.progress = INDEXING, 0.5
+
+            def on_progress(done: int, total: int) -> None:
+                job.progress = 0.5 + 0.5 * done / max(total, 1)
+
+            store, clones = get_vector_store(), get_clone_index()
+            added, removed = index_source(store, job.name, code, on_progress=on_progress, clones=clones)
+            store.save()
+            clones.save()
+            job.detail = f"청크 {added}개 추가, {removed}개 삭제"
+            job.status, job.progress = DONE, 1.0
+        except Exception as e:  # pylint: disable=broad-except
+            job.detail = str(e)
+            job.status = FAILED
+
+
+def submit(name: str, digest: str, code: str) -> UploadJob:
+    """파일 하나의 분석과 인덱싱을 작업 풀에 넣고 진행 상황을 담은 작업 객체를 반환합니다."""
+    job = UploadJob(name=name, hash=digest)
+    _get_executor().submit(_run, job, code)
+    return job
+
+
+def pending(jobs: List[UploadJob]) -> int:
+    return sum(not job.finished for job in jobs)
@@ -1,39 +1,570 @@
 # 코드 검색을 위한 벡터스토어 클래스 정의
+import functools
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
-from langchain.docstore.document import Document
-from embeddings import get_embedding_model
+from langchain_core.documents import Document
+from analysis_cache import content_hash
+from embeddings import get_cached_embedding_model
+from rate_limit import RateLimiter, call_with_backoff, current_priority, estimate_tokens, request_priority
 import config
+import segment_log
+from index_modes import FLAT, build_index, configure_search, effective_mode, recall_report
+from lexical_index import BM25Index, is_code_identifier, reciprocal_rank_fusion, term_counts
+
+INDEX_FILE = "index.faiss"  # 스냅샷 인덱스
+DOCSTORE_FILE = "docstore.json"  # 스냅샷 문서 저장소
+SEGMENT_FILE = "segments.log"  # 스냅샷 이후 변경분 로그
+VECTORS_FILE = "vectors.npy"  # 스냅샷 원본 벡터 (재학습/recall 측정용, 메모리 매핑으로만 읽음)
+LEXICAL_FILE = "lexical.json"  # 스냅샷 문서의 BM25 역색인 (시작할 때 원문을 다시 나누지 않도록)
+
+# 진행 상황 콜백: (완료된 문서 수, 전체 문서 수)
+ProgressCallback = Callable[[int, int], None]
+# 메타데이터 필터: 키-값 일치 dict 또는 메타데이터를 받는 판별 함수
+MetadataFilter = Union[Dict[str, Any], Callable[[dict], bool]]
+
+
+def document_id(file: str, function: str, digest: str) -> str:
+    """(파일명, 함수명, 내용 해시)로 정해지는 안정적인 문서 ID를 반환합니다."""
+    return hashlib.sha1(f"{file}\0{function}\0{digest}".encode("utf-8")).hexdigest()
+
+
+def cosine_similarity(distance: float) -> float:
+    """정규화된 임베딩 사이의 L2 거리 제곱 ``d``를 코사인 유사도(1 - d/2)로 바꿉니다."""
+    return 1.0 - float(distance) / 2.0
+
+
+def _snapshot_tag(ids: List[str]) -> str:
+    """스냅샷 문서 ID 목록의 해시 (어휘 색인 파일이 같은 스냅샷의 것인지 확인)."""
+    return content_hash("\n".join(ids))
+
+
+def _normalize(doc) -> Document:
+    """문자열이나 Document를 파일/함수/해시 메타데이터가 채워진 Document로 바꿉니다."""
+    if not isinstance(doc, Document):
+        doc = Document(page_content=doc)
+    metadata = dict(doc.metadata)
+    metadata.setdefault("file", "")
+    metadata.setdefault("function", "")
+    metadata["hash"] = content_hash(doc.page_content)
+    return Document(page_content=doc.page_content, metadata=metadata)
+
+
+def _matches(metadata: dict, where: Optional[MetadataFilter]) -> bool:
+    if where is None:
+        return True
+    if callable(where):
+        return bool(where(metadata))
+    for key, value in where.items():
+        actual = metadata.get(key)
+        if isinstance(value, (list, tuple, set)):
+            if actual not in value:
+                return False
+        elif actual != value:
+            return False
+    return True
+
+def _synchronized(method):
+    """인스턴스 락을 잡은 채로 메서드를 실행합니다."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 class VectorStore:
-    def __init__(self, embedding_model=None, **kwargs):
-        """간단한 FAISS 벡터스토어 래퍼"""
+    def __init__(self, embedding_model=None, rate_limiter: Optional[RateLimiter] = None, path: Optional[str] = None, **kwargs):
+        """간단한 FAISS 벡터스토어 래퍼
+
+        ``path``를 주면 그 아래의 스냅샷을 메모리 매핑으로 열고 변경분 로그를 재생합니다.
+        스냅샷 인덱스(``base``)는 읽기 전용이며, 이후 추가분은 메모리 인덱스
+        (``vectorstore``)에 쌓였다가 ``save``로 세그먼트 로그에, ``compact``로 스냅샷에 합쳐집니다.
+        여러 세션이 하나의 인스턴스를 공유할 수 있도록 인덱스 변경과 검색은 락으로 보호하며,
+        임베딩 API 호출은 락 밖에서 수행합니다.
+        """
 
         if embedding_model is None:
-            embedding_model = get_embedding_model()
+            # 같은 텍스트를 다시 임베딩하지 않도록 디스크 캐시 래퍼를 기본으로 사용
+            embedding_model = get_cached_embedding_model()
         self.embedding_model = embedding_model
+        # 분당 한도는 공유 HTTP 전송 계층이 프로세스 전체에서 지킨다 (따로 줄 때만 여기서도 적용)
+        self.rate_limiter = rate_limiter
+        self.batch_size = kwargs.get("batch_size", config.EMBED_BATCH_SIZE)
+        self.max_concurrency = kwargs.get("max_concurrency", config.EMBED_MAX_CONCURRENCY)
+        self.index_mode = kwargs.get("index_mode", config.VECTORSTORE_INDEX_MODE)
+        self.fp16 = kwargs.get("fp16", config.VECTORSTORE_FP16)
         # 초기에는 인덱스를 생성하지 않는다 (임베딩 호출 방지)
         self.vectorstore = None
+        self.base = None  # 스냅샷에서 메모리 매핑한 읽기 전용 인덱스
+        self.base_mode = FLAT  # 스냅샷 인덱스의 실제 모드
+        self._base_vectors: Optional[np.ndarray] = None  # 스냅샷 원본 벡터 (메모리 매핑)
+        self.path = path
+        self._pending: List[segment_log.Record] = []  # 로그에 아직 기록하지 않은 변경분
+        self._log_bytes = 0
+        self._metadata: Dict[str, dict] = {}  # 살아있는 문서 ID -> 메타데이터
+        self._keys: Dict[Tuple[str, str], str] = {}  # (파일, 함수) -> 현재 문서 ID
+        self._deleted: Set[str] = set()  # 스냅샷에서 삭제된 문서 ID (compact 전까지 검색에서 제외)
+        self.lexical = BM25Index()  # 식별자 어휘 색인 (하이브리드 검색용)
+        self._lock = threading.RLock()
+        if path is not None:
+            self.load(path)
+
+    def _embed_batch(self, texts: List[str], priority: str) -> List[List[float]]:
+        """호출한 쪽의 우선순위로 배치를 임베딩합니다 (429 시 백오프 재시도)."""
+        with request_priority(priority):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(sum(estimate_tokens(t) for t in texts))
+            return call_with_backoff(
+                lambda: self.embedding_model.embed_documents(texts),
+                max_retries=config.EMBED_MAX_RETRIES,
+            )
 
-    def add_documents(self, documents):
-        """문서 리스트를 벡터스토어에 추가합니다."""
-        docs = [Document(page_content=doc) for doc in documents]
+    def _embed_query(self, query: str) -> List[float]:
+        """검색 쿼리를 임베딩합니다. 사용자가 기다리는 요청이라 재시도 횟수를 짧게 둡니다."""
+        return call_with_backoff(
+            lambda: self.embedding_model.embed_query(query),
+            max_retries=config.EMBED_QUERY_MAX_RETRIES,
+        )
+
+    def _track(self, doc_id: str, metadata: dict) -> None:
+        self._metadata[doc_id] = metadata
+        if metadata.get("file"):
+            self._keys[(metadata["file"], metadata.get("function", ""))] = doc_id
+
+    @_synchronized
+    def _add_embeddings(
+        self,
+        docs: List[Document],
+        vectors: List[List[float]],
+        ids: List[str],
+        log: bool = True,
+        terms: Optional[List[Optional[Dict[str, int]]]] = None,
+    ) -> int:
+        """이미 계산된 임베딩을 메모리 인덱스에 추가하고 추가한 수를 반환합니다."""
+        # 다른 세션이 같은 문서를 먼저 추가했으면 건너뛴다
+        keep = [i for i, doc_id in enumerate(ids) if doc_id not in self._metadata]
+        if len(keep) < len(ids):
+            docs, vectors, ids = [docs[i] for i in keep], [vectors[i] for i in keep], [ids[i] for i in keep]
+            if terms is not None:
+                terms = [terms[i] for i in keep]
+        if not ids:
+            return 0
+        pairs = [(d.page_content, v) for d, v in zip(docs, vectors)]
+        metadatas = [d.metadata for d in docs]
         if self.vectorstore is None:
             # 첫 추가 시점에 인덱스 생성
-            self.vectorstore = FAISS.from_documents(docs, self.embedding_model)
+            self.vectorstore = FAISS.from_embeddings(pairs, self.embedding_model, metadatas=metadatas, ids=ids)
         else:
-            self.vectorstore.add_documents(docs)
+            self.vectorstore.add_embeddings(pairs, metadatas=metadatas, ids=ids)
+        if terms is None:
+            terms = [term_counts(doc.page_content) for doc in docs]
+        for doc_id, doc, counts in zip(ids, docs, terms):
+            self._track(doc_id, doc.metadata)
+            self.lexical.add(doc_id, doc.page_content, counts)
+        if log and self.path is not None:
+            for doc_id, doc, vector, counts in zip(ids, docs, vectors, terms):
+                # 색인어 빈도도 함께 기록해 로그를 재생할 때 원문을 다시 나누지 않는다
+                header = {"op": "add", "id": doc_id, "text": doc.page_content, "metadata": doc.metadata, "terms": counts}
+                self._pending.append((header, np.asarray(vector, dtype=np.float32)))
+        return len(ids)
 
-    def similarity_search(self, query, k=4):
-        """쿼리와 유사한 문서를 검색합니다."""
-        if self.vectorstore is None:
+    def upsert(self, documents, on_progress: Optional[ProgressCallback] = None) -> int:
+        """문서를 (파일, 함수, 내용 해시) ID로 추가하거나 갱신합니다.
+
+        이미 같은 ID가 있으면 건너뛰고, 같은 (파일, 함수)의 이전 버전은 삭제합니다.
+        새 문서만 배치로 나누어 동시에 임베딩하며, 끝나는 배치부터 인덱스에 추가합니다.
+        동시 요청 수는 ``max_concurrency``, 요청/토큰 속도는 공유 제한기로 제한되며
+        ``on_progress(완료 수, 전체 수)``로 진행 상황을 알립니다. 새로 임베딩한 문서 수를 반환합니다.
+        """
+        docs: List[Document] = []
+        ids: List[str] = []
+        stale: List[str] = []
+        with self._lock:
+            for doc in map(_normalize, documents):
+                meta = doc.metadata
+                doc_id = document_id(meta["file"], meta["function"], meta["hash"])
+                if doc_id in self._metadata or doc_id in ids:
+                    continue
+                previous = self._keys.get((meta["file"], meta["function"])) if meta["file"] else None
+                if previous is not None and previous != doc_id:
+                    stale.append(previous)
+                docs.append(doc)
+                ids.append(doc_id)
+            if stale:
+                self.delete(stale)
+        total = len(docs)
+        if not total:
+            return 0
+        starts = range(0, total, self.batch_size)
+        done = added = 0
+        workers = max(1, min(self.max_concurrency, len(starts)))
+        # 작업 스레드에는 문맥 변수가 넘어가지 않으므로 우선순위를 직접 넘긴다
+        priority = current_priority()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(self._embed_batch, [d.page_content for d in docs[i:i + self.batch_size]], priority): i
+                for i in starts
+            }
+            # FAISS 인덱스 추가는 스레드 안전하지 않으므로 호출 스레드에서 락을 잡고 수행
+            for future in as_completed(futures):
+                i = futures[future]
+                batch = docs[i:i + self.batch_size]
+                added += self._add_embeddings(batch, future.result(), ids[i:i + self.batch_size])
+                done += len(batch)
+                if on_progress is not None:
+                    on_progress(done, total)
+        return added
+
+    def upsert_aliases(self, aliases: List[Tuple[Any, str]]) -> int:
+        """(문서, 원본 문서 ID) 쌍의 문서를 원본의 저장된 벡터로 추가하고 추가한 수를 반환합니다.
+
+        근사 중복 청크를 임베딩 API 호출 없이 색인하는 데 씁니다. 문서는 자기 벡터 사본을 가지므로
+        원본이 바뀌거나 삭제되어도 검색에서 사라지지 않습니다. 원본 벡터를 찾지 못한 문서는 ``upsert``로 임베딩합니다.
+        """
+        fallback: List[Document] = []
+        with self._lock:
+            positions = self._positions()
+            docs: List[Document] = []
+            ids: List[str] = []
+            vectors: List[np.ndarray] = []
+            stale: List[str] = []
+            for doc, source in aliases:
+                doc = _normalize(doc)
+                meta = doc.metadata
+                doc_id = document_id(meta["file"], meta["function"], meta["hash"])
+                if doc_id in self._metadata or doc_id in ids:
+                    continue
+                vector = self._stored_vector(*positions[source]) if source in positions else None
+                if vector is None:
+                    fallback.append(doc)
+                    continue
+                previous = self._keys.get((meta["file"], meta["function"])) if meta["file"] else None
+                if previous is not None and previous != doc_id:
+                    stale.append(previous)
+                docs.append(doc)
+                ids.append(doc_id)
+                vectors.append(vector)
+            if stale:
+                self.delete(stale)
+            added = self._add_embeddings(docs, vectors, ids) if docs else 0
+        return added + self.upsert(fallback)
+
+    def _positions(self) -> Dict[str, Tuple[FAISS, int]]:
+        """살아있는 문서 ID -> (인덱스, 위치)."""
+        positions = {}
+        for store in (self.base, self.vectorstore):
+            if store is None:
+                continue
+            for pos, doc_id in store.index_to_docstore_id.items():
+                if doc_id in self._metadata:
+                    positions[doc_id] = (store, pos)
+        return positions
+
+    def _stored_vector(self, store: FAISS, pos: int) -> Optional[np.ndarray]:
+        if store is self.base and self._base_vectors is not None:
+            # 양자화된 인덱스에서 복원하지 않고 원본 벡터를 쓴다
+            return np.asarray(self._base_vectors[pos], dtype=np.float32)
+        try:
+            return store.index.reconstruct(pos)
+        except RuntimeError:
+            # 복원을 지원하지 않는 인덱스 (직접 매핑이 없는 IVF 등)
+            return None
+
+    def add_documents(self, documents, on_progress: Optional[ProgressCallback] = None) -> int:
+        """문서 리스트를 벡터스토어에 추가합니다 (``upsert``와 같습니다)."""
+        return self.upsert(documents, on_progress=on_progress)
+
+    @_synchronized
+    def delete(self, ids, log: bool = True) -> int:
+        """문서 ID 목록을 삭제하고 실제로 삭제된 수를 반환합니다."""
+        ids = [doc_id for doc_id in dict.fromkeys(ids) if doc_id in self._metadata]
+        if not ids:
+            return 0
+        in_memory = []
+        for doc_id in ids:
+            doc = self._get_document(doc_id)
+            if doc is not None:
+                self.lexical.remove(doc_id, doc.page_content)
+            metadata = self._metadata.pop(doc_id)
+            key = (metadata.get("file", ""), metadata.get("function", ""))
+            if self._keys.get(key) == doc_id:
+                del self._keys[key]
+            if self.vectorstore is not None and doc_id in self.vectorstore.docstore._dict:  # pylint: disable=protected-access
+                in_memory.append(doc_id)
+            else:
+                # 읽기 전용 스냅샷에서는 표시만 해 두고 compact 때 제거한다
+                self._deleted.add(doc_id)
+        if in_memory:
+            self.vectorstore.delete(in_memory)
+        if log and self.path is not None:
+            self._pending.append(({"op": "delete", "ids": ids}, None))
+        return len(ids)
+
+    @_synchronized
+    def delete_where(self, where: MetadataFilter) -> int:
+        """메타데이터 필터와 일치하는 문서를 모두 삭제합니다 (예: ``{"file": "a.c"}``)."""
+        return self.delete([doc_id for doc_id, meta in self._metadata.items() if _matches(meta, where)])
+
+    @_synchronized
+    def ids(self, where: Optional[MetadataFilter] = None) -> List[str]:
+        """필터와 일치하는 살아있는 문서 ID 목록을 반환합니다."""
+        return [doc_id for doc_id, meta in self._metadata.items() if _matches(meta, where)]
+
+    def similarity_search(self, query, k=4, filter: Optional[MetadataFilter] = None):  # pylint: disable=redefined-builtin
+        """쿼리와 유사한 문서를 검색합니다. ``filter``로 메타데이터 조건을 줄 수 있습니다."""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, filter=filter)]
+
+    def similarity_search_with_score(self, query, k=4, filter: Optional[MetadataFilter] = None) -> List[Tuple[Document, float]]:  # pylint: disable=redefined-builtin
+        """식별자 BM25 검색과 벡터 검색 결과를 RRF로 합쳐 (문서, 점수)를 반환합니다.
+
+        점수는 클수록 유사합니다. ``global_count``처럼 코드 식별자로만 이루어진 쿼리가
+        어휘 색인에서 찾아지면 임베딩 호출 없이 어휘 검색 결과만 사용합니다.
+        """
+        fetch_k = max(20, 4 * k)
+        allow = None if filter is None else (lambda doc_id: _matches(self._metadata.get(doc_id, {}), filter))
+        with self._lock:
+            lexical = [doc_id for doc_id, _ in self.lexical.search(query, k=fetch_k, allow=allow)]
+            lexical_only = bool(lexical) and self._is_identifier_query(query)
+            indexed = self.base is not None or self.vectorstore is not None
+        rankings = [lexical]
+        if not lexical_only and indexed:
+            embedding = self._embed_query(query)
+            with self._lock:
+                rankings.append([doc.id for doc, _ in self._vector_search(embedding, fetch_k, filter)])
+        with self._lock:
+            results = [(self._get_document(doc_id), score) for doc_id, score in reciprocal_rank_fusion(rankings)]
+        # 검색 도중 다른 세션이 삭제한 문서는 제외
+        return [pair for pair in results if pair[0] is not None][:k]
+
+    def vector_search_with_distance(self, query: str, k: int = 4, filter: Optional[MetadataFilter] = None) -> List[Tuple[Document, float]]:  # pylint: disable=redefined-builtin
+        """어휘 검색 없이 벡터 검색만 수행해 (문서, L2 거리 제곱)을 가까운 순으로 반환합니다.
+
+        RRF 점수(순위 융합 값)와 달리 거리는 쿼리와 무관한 절대 기준이므로 임계값 비교나
+        유사도 보고(``cosine_similarity``)에 쓸 수 있습니다.
+        """
+        with self._lock:
+            if self.base is None and self.vectorstore is None:
+                return []
+        embedding = self._embed_query(query)
+        with self._lock:
+            return self._vector_search(embedding, k, filter)
+
+    def _is_identifier_query(self, query: str) -> bool:
+        tokens = [t.strip(".,;:?!()[]{}'\"`") for t in query.split()]
+        tokens = [t for t in tokens if t]
+        return (
+            bool(tokens)
+            and any(is_code_identifier(t) for t in tokens)
+            and all(t in self.lexical for t in tokens)
+        )
+
+    def _get_document(self, doc_id: str) -> Optional[Document]:
+        for store in (self.vectorstore, self.base):
+            if store is not None:
+                doc = store.docstore._dict.get(doc_id)  # pylint: disable=protected-access
+                if doc is not None:
+                    return doc
+        return None
+
+    def _vector_search(self, embedding, k, filter: Optional[MetadataFilter] = None) -> List[Tuple[Document, float]]:  # pylint: disable=redefined-builtin
+        """쿼리 임베딩과 가까운 문서를 (문서, L2 거리) 쌍으로 스냅샷과 메모리 인덱스에서 함께 찾습니다."""
+        stores = [store for store in (self.base, self.vectorstore) if store is not None]
+        if not stores:
             return []
-        return self.vectorstore.similarity_search(query, k=k)
+        where = None if filter is None else (lambda meta: _matches(meta, filter))
+        results: List[Tuple[Document, float]] = []
+        for store in stores:
+            # 스냅샷의 삭제 표시 문서만큼 더 가져온 뒤 걸러낸다
+            extra = len(self._deleted) if store is self.base else 0
+            fetch_k = max(20, 4 * k) + extra
+            found = store.similarity_search_with_score_by_vector(embedding, k=k + extra, filter=where, fetch_k=fetch_k)
+            results.extend(pair for pair in found if pair[0].id not in self._deleted)
+        results.sort(key=lambda pair: pair[1])
+        return results[:k]
+
+    # --- 영속화: 메모리 매핑 스냅샷 + 추가 전용 세그먼트 로그 ---
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    @_synchronized
+    def save(self, path=None):
+        """스냅샷 이후 변경분만 세그먼트 로그 끝에 기록합니다 (변경량에 비례하는 비용).
+
+        로그가 스냅샷에 비해 커지거나, 코퍼스 크기가 바뀌어 설정된 인덱스 모드로
+        옮겨야 할 때 (예: IVF 학습 임계치 도달) ``compact``로 스냅샷에 합칩니다.
+        """
+        if path is not None and path != self.path:
+            # 다른 경로로 저장할 때는 전체 스냅샷을 새로 쓴다
+            self.path = path
+            self.compact()
+            return
+        if self.path is None:
+            raise ValueError("저장 경로가 지정되지 않았습니다.")
+        os.makedirs(self.path, exist_ok=True)
+        if self._pending:
+            self._log_bytes += segment_log.append_records(self._file(SEGMENT_FILE), self._pending)
+            self._pending = []
+        snapshot_bytes = os.path.getsize(self._file(INDEX_FILE)) if os.path.exists(self._file(INDEX_FILE)) else 0
+        threshold = max(config.VECTORSTORE_COMPACT_BYTES, snapshot_bytes * config.VECTORSTORE_COMPACT_RATIO)
+        target = effective_mode(self.index_mode, len(self._metadata))
+        current = self.base_mode if self.base is not None else FLAT
+        if self._log_bytes > threshold or (target != current and self._metadata):
+            self.compact()
 
-    def save(self, path):
-        """벡터스토어를 파일로 저장합니다."""
-        if self.vectorstore is not None:
-            self.vectorstore.save(path)
+    @_synchronized
+    def load(self, path=None):
+        """스냅샷 인덱스를 메모리 매핑으로 열고, 세그먼트 로그의 변경분을 재생합니다."""
+        if path is not None:
+            self.path = path
+        self.base = None
+        self.base_mode = FLAT
+        self._base_vectors = None
+        self.vectorstore = None
+        self._pending = []
+        self._metadata = {}
+        self._keys = {}
+        self._deleted = set()
+        self.lexical = BM25Index()
+        if os.path.exists(self._file(INDEX_FILE)) and os.path.exists(self._file(DOCSTORE_FILE)):
+            self.base = self._open_snapshot()
+            base_ids = list(self.base.index_to_docstore_id.values())
+            for doc_id in base_ids:
+                self._track(doc_id, self.base.docstore.search(doc_id).metadata)
+            # 스냅샷과 함께 저장한 역색인을 읽고, 없거나 다른 스냅샷의 것이면 원문에서 다시 만든다
+            lexical = BM25Index.load(self._file(LEXICAL_FILE), _snapshot_tag(base_ids))
+            if lexical is None:
+                lexical = BM25Index()
+                lexical.add_many((doc_id, self.base.docstore.search(doc_id).page_content) for doc_id in base_ids)
+            self.lexical = lexical
+        records, valid = segment_log.read_records(self._file(SEGMENT_FILE))
+        for header, vector in records:
+            if header.get("op") == "add":
+                doc = Document(page_content=header["text"], metadata=header.get("metadata") or {})
+                self._add_embeddings([doc], [vector.tolist()], ids=[header["id"]], log=False, terms=[header.get("terms")])
+            elif header.get("op") == "delete":
+                self.delete(header["ids"], log=False)
+        if os.path.exists(self._file(SEGMENT_FILE)):
+            # 기록 중 중단되어 잘린 레코드가 있으면 잘라내 이후 추가가 이어지도록 한다
+            segment_log.truncate(self._file(SEGMENT_FILE), valid)
+        self._log_bytes = valid
+
+    def _open_snapshot(self) -> FAISS:
+        """스냅샷을 읽기 전용 FAISS 래퍼로 엽니다 (가능하면 메모리 매핑)."""
+        flags = getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        try:
+            index = faiss.read_index(self._file(INDEX_FILE), flags)
+        except RuntimeError:
+            # 메모리 매핑을 지원하지 않는 인덱스 형식은 일반 읽기로 대체
+            index = faiss.read_index(self._file(INDEX_FILE))
+        configure_search(index)
+        with open(self._file(DOCSTORE_FILE), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.base_mode = data.get("index", {}).get("mode", FLAT)
+        if os.path.exists(self._file(VECTORS_FILE)):
+            self._base_vectors = np.load(self._file(VECTORS_FILE), mmap_mode="r")
+        docs = {
+            doc_id: Document(page_content=d["text"], metadata=d.get("metadata") or {}, id=doc_id)
+            for doc_id, d in zip(data["ids"], data["docs"])
+        }
+        return FAISS(
+            embedding_function=self.embedding_model,
+            index=index,
+            docstore=InMemoryDocstore(docs),
+            index_to_docstore_id=dict(enumerate(data["ids"])),
+        )
+
+    def _live_entries(self) -> Tuple[List[str], List[Document], Optional[np.ndarray]]:
+        """스냅샷과 메모리 인덱스의 모든 문서와 벡터를 인덱스 순서대로 모읍니다."""
+        ids: List[str] = []
+        docs: List[Document] = []
+        blocks = []
+        for store in (self.base, self.vectorstore):
+            if store is None or store.index.ntotal == 0:
+                continue
+            if store is self.base and self._base_vectors is not None:
+                # 양자화된 인덱스에서 복원하지 않고 원본 벡터를 쓴다
+                vectors = np.asarray(self._base_vectors, dtype=np.float32)
+            else:
+                vectors = store.index.reconstruct_n(0, store.index.ntotal)
+            keep = []
+            for i in range(store.index.ntotal):
+                doc_id = store.index_to_docstore_id[i]
+                if doc_id in self._deleted:
+                    continue
+                keep.append(i)
+                ids.append(doc_id)
+                docs.append(store.docstore.search(doc_id))
+            blocks.append(vectors[keep])
+        vectors = np.vstack(blocks) if blocks else None
+        return ids, docs, vectors
+
+    @_synchronized
+    def compact(self):
+        """스냅샷과 변경분을 합쳐 새 스냅샷을 쓰고 세그먼트 로그를 비웁니다."""
+        if self.path is None:
+            raise ValueError("저장 경로가 지정되지 않았습니다.")
+        os.makedirs(self.path, exist_ok=True)
+        ids, docs, vectors = self._live_entries()
+        if not ids:
+            # 모두 삭제된 경우 스냅샷 자체를 없앤다
+            for name in (INDEX_FILE, DOCSTORE_FILE, VECTORS_FILE, LEXICAL_FILE):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+            segment_log.truncate(self._file(SEGMENT_FILE))
+            self._log_bytes = 0
+            self._pending = []
+            self._deleted = set()
+            self.base = None
+            self.base_mode = FLAT
+            self._base_vectors = None
+            self.vectorstore = None
+            return
+        # 코퍼스 크기에 따라 flat에서 IVF 등으로 학습/이전한다
+        mode = effective_mode(self.index_mode, len(ids))
+        index = build_index(vectors, mode, self.fp16)
+        faiss.write_index(index, self._file(INDEX_FILE + ".tmp"))
+        with open(self._file(VECTORS_FILE + ".tmp"), "wb") as f:
+            np.save(f, vectors.astype(np.float16 if self.fp16 else np.float32))
+        with open(self._file(DOCSTORE_FILE + ".tmp"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "index": {"mode": mode, "fp16": self.fp16},
+                    "ids": ids,
+                    "docs": [{"text": d.page_content, "metadata": d.metadata} for d in docs],
+                },
+                f,
+                ensure_ascii=False,
+            )
+        # 메모리의 역색인은 살아있는 문서(= 새 스냅샷 문서)와 정확히 같다
+        self.lexical.save(self._file(LEXICAL_FILE + ".tmp"), _snapshot_tag(ids))
+        self._base_vectors = None
+        for name in (INDEX_FILE, VECTORS_FILE, LEXICAL_FILE, DOCSTORE_FILE):
+            os.replace(self._file(name + ".tmp"), self._file(name))
+        segment_log.truncate(self._file(SEGMENT_FILE))
+        self._log_bytes = 0
+        self._pending = []
+        self._deleted = set()
+        self.base = self._open_snapshot()
+        self.vectorstore = None
 
-    def load(self, path):
-        """벡터스토어를 파일에서 불러옵니다."""
-        self.vectorstore = FAISS.load(path, self.embedding_model.embed_query)
+    @_synchronized
+    def recall_report(self, k: int = 10, sample: int = 100) -> dict:
+        """스냅샷 인덱스의 recall@k와 지연시간을 정확한 검색과 비교해 보고합니다."""
+        if self.base is None or self._base_vectors is None:
+            return {"queries": 0, "k": k, "recall": 1.0, "exact_ms": 0.0, "approx_ms": 0.0, "mode": FLAT}
+        report = recall_report(self.base.index, self._base_vectors, k=k, sample=sample)
+        report["mode"] = self.base_mode
+        report["vectors"] = self.base.index.ntotal
+        report["index_bytes"] = os.path.getsize(self._file(INDEX_FILE))
+        return report